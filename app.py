@@ -4,6 +4,7 @@ Main Streamlit application for Student Success Predictor
 
 import streamlit as st
 
+from src.components.admin_components import render_metrics_panel, render_profiling_panel, render_shadow_panel
 from src.components.form_components import (
     render_preset_selector,
     render_personal_info_section,
@@ -15,6 +16,7 @@ from src.components.form_components import (
 )
 from src.components.prediction_components import (
     render_prediction_section,
+    render_whatif_section,
     render_model_info_sidebar,
     render_export_section,
     render_footer
@@ -22,7 +24,12 @@ from src.components.prediction_components import (
 from src.config.mappings import create_feature_mappings
 from src.config.theme import ROSE_PINE_THEME, PAGE_CONFIG, APP_TITLE, APP_SUBTITLE
 from src.utils.auth import require_auth, check_role_permission, render_admin_panel, check_session_timeout
+from src.utils.drift import observe_prediction
+from src.utils.metrics import timed
 from src.utils.models_utils import load_model_and_info
+from src.utils.prewarm import prewarm_heavy_modules
+from src.utils.profiling import profile_if_requested
+from src.utils.shadow import shadow_scorer
 
 
 def apply_theme():
@@ -36,6 +43,7 @@ def render_header():
     st.markdown(f'<p class="subtitle">{APP_SUBTITLE}</p>', unsafe_allow_html=True)
 
 
+@timed("form_render")
 def collect_user_input():
     """Collect all user input from the sidebar form"""
     feature_maps = create_feature_mappings()
@@ -76,11 +84,16 @@ def collect_user_input():
 
 
 @require_auth
+@profile_if_requested
+@timed("rerun")
 def main():
     """Main Streamlit application"""
     # Check session timeout (30 minutes)
     check_session_timeout(30)
 
+    # Past login: load pandas/plotly/sklearn in the background
+    prewarm_heavy_modules()
+
     # Apply theme
     apply_theme()
 
@@ -94,6 +107,9 @@ def main():
     if check_role_permission("admin"):
         with st.sidebar:
             render_admin_panel()
+            render_metrics_panel()
+            render_profiling_panel()
+            render_shadow_panel(preprocessing_info)
 
     # Collect user input
     user_input = collect_user_input()
@@ -110,11 +126,20 @@ def main():
                 unsafe_allow_html=True)
 
         # Render prediction section
-        render_prediction_section(model, preprocessing_info, user_input)
+        prediction = render_prediction_section(model, preprocessing_info, user_input)
+
+        # Already shown: count the student for drift, and let the shadow candidate
+        # (if any) score it in the background
+        if prediction is not None:
+            observe_prediction(preprocessing_info, user_input)
+            shadow_scorer.submit(user_input, preprocessing_info, prediction['probabilities'])
+
+        # Sensitivity of the prediction to one or two fields
+        render_whatif_section(model, preprocessing_info, user_input)
 
     with col2:
         # Render model info and validation
-        render_model_info_sidebar(user_input)
+        render_model_info_sidebar(user_input, preprocessing_info)
 
         # Render export section (role-based access)
         if check_role_permission("educator"):
@@ -125,7 +150,7 @@ def main():
                 unsafe_allow_html=True)
 
     # Render footer
-    render_footer()
+    render_footer(preprocessing_info)
 
 
 if __name__ == "__main__":
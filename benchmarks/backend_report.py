@@ -0,0 +1,95 @@
+"""
+Model Backend Comparison Report
+Fits both model backends on the notebook's train split of data.csv and compares them
+side by side:
+- random_forest: 100 trees on the one-hot encoded features
+- hist_gradient_boosting: the raw form fields, with native categorical splits on the
+  nominal codes
+It reports encode and fit time, single-student and full-dataset predict latency
+(preprocessing included, as the app serves), pickled artifact size, and held-out
+accuracy (uncalibrated). Nothing is saved or published.
+
+Usage (from the project root):
+    python benchmarks/backend_report.py [--repeat 20]
+"""
+
+import argparse
+import os
+import pickle
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+for path in (PROJECT_ROOT, PROJECT_ROOT / "models"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+from benchmarks.run_benchmarks import load_student_rows  # noqa: E402
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def median_seconds(func, repeat):
+    return statistics.median(timed_call(func)[1] for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per latency measurement (median)")
+    args = parser.parse_args()
+
+    import numpy as np
+    from train_and_save_model import build_classifier, encode_full_dataset, load_native_dataset
+    from src.utils.encoding import DEFAULT_CATEGORICAL_COLUMNS
+    from src.utils.models_utils import preprocess_batch, preprocess_input
+
+    os.chdir(PROJECT_ROOT)
+    rows = load_student_rows()
+    single = rows[:50]
+
+    datasets = {
+        'random_forest': lambda: encode_full_dataset()[:4],
+        'hist_gradient_boosting': load_native_dataset,
+    }
+    results = []
+    for backend, load in datasets.items():
+        (X, y, train_index, test_index), encode_seconds = timed_call(load)
+        model = build_classifier(backend)
+        _, fit_seconds = timed_call(lambda: model.fit(X.iloc[train_index], y.iloc[train_index]))
+
+        # The serving-side artifact interface: the same encoder, driven by preprocessing_info
+        info = {'feature_names': X.columns.tolist(),
+                'categorical_columns': list(DEFAULT_CATEGORICAL_COLUMNS) if backend == 'random_forest' else []}
+        single_seconds = statistics.median(
+            median_seconds(lambda: model.predict_proba(preprocess_input(row, info)), max(1, args.repeat // 10))
+            for row in single
+        )
+        batch_seconds = median_seconds(lambda: model.predict_proba(preprocess_batch(rows, info)), args.repeat)
+        probabilities = model.predict_proba(X.iloc[test_index])
+        results.append({
+            'backend': backend,
+            'features': X.shape[1],
+            'encode_s': encode_seconds,
+            'fit_s': fit_seconds,
+            'single_ms': single_seconds * 1000,
+            'batch_ms': batch_seconds * 1000,
+            'size_mb': len(pickle.dumps(model)) / 1e6,
+            'accuracy': float(np.mean(model.classes_[probabilities.argmax(axis=1)] == y.iloc[test_index].to_numpy())),
+        })
+
+    print(f"{len(rows)} students ({len(test_index)} held out)\n")
+    print(f"{'backend':24s} {'features':>8s} {'encode s':>9s} {'fit s':>7s} {'1 row ms':>9s} "
+          f"{f'{len(rows)} rows ms':>13s} {'size MB':>8s} {'accuracy':>9s}")
+    for r in results:
+        print(f"{r['backend']:24s} {r['features']:8d} {r['encode_s']:9.2f} {r['fit_s']:7.2f} {r['single_ms']:9.2f} "
+              f"{r['batch_ms']:13.1f} {r['size_mb']:8.2f} {r['accuracy']:9.4f}")
+
+
+if __name__ == "__main__":
+    main()
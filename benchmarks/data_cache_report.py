@@ -0,0 +1,125 @@
+"""
+Data Cache Report
+Replicates data/data.csv (100x by default) into a temporary directory and compares
+loading it from CSV with loading the typed columnar cache (src/utils/dataset.py).
+Every scenario runs in a fresh interpreter, so its RSS numbers are not affected by
+the others.
+
+Usage (from the project root):
+    python benchmarks/data_cache_report.py [--replicas 100] [--repeat 3]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DATA_PATH = PROJECT_ROOT / "data" / "data.csv"
+
+# Columns for the projection scenario (what a quick analysis typically needs)
+PROJECTED_COLUMNS = ['Course', 'Admission grade', 'Curricular units 1st sem (grade)',
+                     'Curricular units 2nd sem (grade)', 'Target']
+
+SCENARIO = """
+import gc, json, sys, time
+sys.path.insert(0, {root!r})
+import pandas as pd
+import pyarrow.feather
+from src.utils import dataset
+
+def rss_kb(field):
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field + ':'))
+
+csv_path, cache_path = {csv!r}, {cache!r}
+scenarios = {{
+    'csv': lambda: dataset.read_csv_cleaned(csv_path),
+    'build_cache': lambda: dataset.build_cache(csv_path, cache_path),
+    'cache_full': lambda: dataset.load_dataset(csv_path=csv_path, cache_path=cache_path),
+    'cache_projected': lambda: dataset.load_dataset({columns!r}, csv_path=csv_path, cache_path=cache_path),
+}}
+run = scenarios[{scenario!r}]
+
+gc.collect()
+before = rss_kb('VmRSS')
+timings = []
+for _ in range({repeat}):
+    result = None
+    gc.collect()
+    start = time.perf_counter()
+    result = run()
+    timings.append(time.perf_counter() - start)
+
+# Measured while the last result is still alive
+rss_delta = rss_kb('VmRSS') - before
+if {scenario!r} != 'build_cache':
+    shape = result.shape
+    memory = int(result.memory_usage(deep=True).sum())
+else:
+    shape, memory = None, None
+print(json.dumps({{
+    'seconds': min(timings),
+    'rss_delta_mb': rss_delta / 1024,
+    'peak_rss_mb': rss_kb('VmHWM') / 1024,
+    'baseline_rss_mb': before / 1024,
+    'shape': shape,
+    'frame_mb': memory / 2**20 if memory is not None else None,
+}}))
+"""
+
+
+def replicate_csv(target: Path, replicas: int) -> None:
+    """Write the CSV header once followed by the data rows `replicas` times"""
+    lines = DATA_PATH.read_bytes().splitlines(keepends=True)
+    header, rows = lines[0], b"".join(lines[1:])
+    if not rows.endswith(b"\n"):
+        rows += b"\n"
+    with open(target, "wb") as f:
+        f.write(header)
+        for _ in range(replicas):
+            f.write(rows)
+
+
+def run_scenario(scenario, csv_path, cache_path, repeat):
+    code = SCENARIO.format(root=str(PROJECT_ROOT), csv=str(csv_path), cache=str(cache_path),
+                           columns=PROJECTED_COLUMNS, scenario=scenario, repeat=repeat)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{scenario} failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicas", type=int, default=100, help="Copies of data.csv to concatenate")
+    parser.add_argument("--repeat", type=int, default=3, help="Loads per scenario (best time is reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(tmp) / "data.csv"
+        cache_path = Path(tmp) / "data.feather"
+        replicate_csv(csv_path, args.replicas)
+
+        # build_cache must run first; later scenarios then find a fresh cache
+        results = {scenario: run_scenario(scenario, csv_path, cache_path, args.repeat)
+                   for scenario in ("build_cache", "csv", "cache_full", "cache_projected")}
+
+        print(f"Dataset: {args.replicas}x data.csv, "
+              f"CSV {csv_path.stat().st_size / 2**20:.1f} MB, cache {cache_path.stat().st_size / 2**20:.1f} MB\n")
+
+    print(f"{'scenario':18s} {'load s':>8s} {'RSS +MB':>9s} {'peak MB':>9s} {'frame MB':>9s}  shape")
+    for scenario, r in results.items():
+        frame = f"{r['frame_mb']:9.1f}" if r['frame_mb'] is not None else f"{'-':>9s}"
+        print(f"{scenario:18s} {r['seconds']:8.3f} {r['rss_delta_mb']:9.1f} {r['peak_rss_mb']:9.1f} {frame}  "
+              f"{tuple(r['shape']) if r['shape'] else ''}")
+
+    speedup = results['csv']['seconds'] / results['cache_full']['seconds']
+    print(f"\nFull load from cache is {speedup:.1f}x faster than parsing the CSV; "
+          f"projection to {len(PROJECTED_COLUMNS)} columns takes {results['cache_projected']['seconds']:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Early-Exit Inference Report
+Scores every student in data.csv (optionally replicated) with the full forest and
+with early-exit inference (src/utils/early_exit.py). It reports the average number
+of trees evaluated, batch throughput, and label agreement. The labels must match
+exactly, both for the raw forest vote and for the calibrated prediction.
+
+Usage (from the project root):
+    python benchmarks/early_exit_report.py [--replicas 1] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.run_benchmarks import load_artifacts, load_student_rows  # noqa: E402
+
+
+def best_time(func, repeat):
+    timings, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return result, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicas", type=int, default=1, help="Copies of data.csv to score as one batch")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode (best time is reported)")
+    args = parser.parse_args()
+
+    import numpy as np
+    import pandas as pd
+    from src.utils.early_exit import get_early_exit_forest
+    from src.utils.models_utils import calibrate_probabilities, preprocess_batch
+
+    os.chdir(PROJECT_ROOT)
+    model, preprocessing_info, _ = load_artifacts()
+    rows = pd.DataFrame(load_student_rows())
+    processed = preprocess_batch(pd.concat([rows] * args.replicas, ignore_index=True), preprocessing_info)
+    n_rows = len(processed)
+    forest = get_early_exit_forest(model)
+    calibrator = preprocessing_info.get('calibrator')
+
+    raw, full_seconds = best_time(lambda: model.predict_proba(processed), args.repeat)
+    calibrated = calibrate_probabilities(preprocessing_info, raw)
+
+    print(f"{n_rows} students, {forest.n_trees} trees\n")
+    print(f"{'mode':22s} {'avg trees':>10s} {'partial':>8s} {'seconds':>8s} {'rows/s':>10s} {'labels':>8s}")
+    print(f"{'full predict_proba':22s} {forest.n_trees:10.1f} {'0.0%':>8s} {full_seconds:8.3f} "
+          f"{n_rows / full_seconds:10,.0f} {'-':>8s}")
+
+    for name, curve, expected in (("early exit (raw)", None, raw.argmax(axis=1)),
+                                  ("early exit (calibrated)", calibrator, calibrated.argmax(axis=1))):
+        if name.endswith("(calibrated)") and calibrator is None:
+            continue
+        result, seconds = best_time(lambda: forest.predict(processed, curve), args.repeat)
+        agree = np.mean(result['labels'] == model.classes_[expected])
+        print(f"{name:22s} {result['trees_evaluated'].mean():10.1f} {result['partial'].mean():8.1%} "
+              f"{seconds:8.3f} {n_rows / seconds:10,.0f} {agree:8.2%}")
+
+    quantiles = np.percentile(result['trees_evaluated'], [10, 50, 90])
+    print(f"\nTrees evaluated per student (last mode): p10 {quantiles[0]:.0f}, median {quantiles[1]:.0f}, "
+          f"p90 {quantiles[2]:.0f}")
+
+
+if __name__ == "__main__":
+    main()
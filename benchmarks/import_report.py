@@ -0,0 +1,81 @@
+"""
+Import-Time Report for app.py
+Runs `python -X importtime -c "import app"` in a fresh interpreter, prints the slowest
+modules, and checks that the login page renders without the heavy modules that are
+meant to load lazily (exit code 1 if any of them were imported).
+
+Usage (from the project root):
+    python benchmarks/import_report.py [--top 25]
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Must not be imported before a user is past the login page
+LAZY_MODULES = ("pandas", "plotly.express", "sklearn")
+
+LOGIN_PAGE_PROBE = f"""
+import json, logging, sys
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({str(PROJECT_ROOT / 'app.py')!r})
+at.run()
+rendered = any("login-header" in m.value for m in at.markdown)
+print(json.dumps({{
+    "rendered": rendered,
+    "exceptions": [e.message for e in at.exception],
+    "imported": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Return (module, self_us, cumulative_us) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top", type=int, default=25, help="Number of modules to list")
+    args = parser.parse_args()
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    rows = parse_importtime(result.stderr)
+    total = next((cumulative for name, _, cumulative in rows if name == "app"), 0)
+
+    print(f"import app: {total / 1000:.1f} ms total\n")
+    print(f"{'cumulative ms':>14s} {'self ms':>9s}  module")
+    for name, self_us, cumulative_us in sorted(rows, key=lambda row: row[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:14.1f} {self_us / 1000:9.1f}  {name}")
+
+    imported_at_startup = [m for m in LAZY_MODULES if any(name == m for name, _, _ in rows)]
+    print(f"\nLazy modules imported by `import app`: {imported_at_startup or 'none'}")
+
+    probe = subprocess.run([sys.executable, "-c", LOGIN_PAGE_PROBE], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    try:
+        login = json.loads(probe.stdout.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        print(f"Login page probe failed:\n{probe.stderr}")
+        sys.exit(1)
+
+    print(f"Login page rendered: {login['rendered']}; lazy modules imported: {login['imported'] or 'none'}")
+    if login['exceptions'] or not login['rendered'] or login['imported'] or imported_at_startup:
+        print("FAIL: login page must render without importing " + ", ".join(LAZY_MODULES))
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Incremental Re-scoring Report
+For students from data.csv, applies typical single-field edits and compares three
+ways of scoring the edited student:
+- full: preprocess_input + predict_proba (what predict_outcome did before)
+- walk all: every tree walked by the compiled forest
+- incremental: the session scorer, re-walking only trees whose cached path tested a
+  changed column
+It also checks that the incremental probabilities match predict_proba.
+
+Usage (from the project root):
+    python benchmarks/incremental_report.py [--students 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.run_benchmarks import load_artifacts, load_student_rows  # noqa: E402
+
+# field -> edit applied to the student's current value
+TYPICAL_EDITS = {
+    'Curricular units 1st sem (approved)': lambda v: v + 1,
+    'Curricular units 2nd sem (approved)': lambda v: v + 1,
+    'Curricular units 2nd sem (grade)': lambda v: min(v + 1, 20),
+    'Tuition fees up to date': lambda v: 1 - v,
+    'Scholarship holder': lambda v: 1 - v,
+    'Debtor': lambda v: 1 - v,
+    'Age at enrollment': lambda v: v + 1,
+    'Admission grade': lambda v: v + 5,
+}
+
+
+def timed_call(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=200, help="Students to edit")
+    args = parser.parse_args()
+
+    import numpy as np
+    from src.utils.incremental import IncrementalScorer
+    from src.utils.models_utils import preprocess_input
+
+    os.chdir(PROJECT_ROOT)
+    model, preprocessing_info, _ = load_artifacts()
+    rows = load_student_rows(args.students)
+
+    print(f"{'field':40s} {'trees':>6s} {'full ms':>8s} {'walk ms':>8s} {'incr ms':>8s} {'speedup':>8s}")
+    totals = {'full': [], 'walk': [], 'incremental': []}
+    max_error = 0.0
+    for field, edit in TYPICAL_EDITS.items():
+        timings = {'full': [], 'walk': [], 'incremental': []}
+        retraversed = []
+        for row in rows:
+            edited = {**row, field: edit(row[field])}
+
+            scorer = IncrementalScorer(model, preprocessing_info)
+            scorer.score(row)
+            incremental, seconds = timed_call(lambda: scorer.score(edited))
+            timings['incremental'].append(seconds)
+            retraversed.append(scorer.last_retraversed)
+
+            walker = IncrementalScorer(model, preprocessing_info)
+            _, seconds = timed_call(lambda: walker.score(edited))
+            timings['walk'].append(seconds)
+
+            full, seconds = timed_call(lambda: model.predict_proba(preprocess_input(edited, preprocessing_info))[0])
+            timings['full'].append(seconds)
+            max_error = max(max_error, float(np.abs(full - incremental).max()))
+
+        medians = {kind: statistics.median(values) * 1000 for kind, values in timings.items()}
+        for kind, values in timings.items():
+            totals[kind].extend(values)
+        print(f"{field:40s} {statistics.fmean(retraversed):6.1f} {medians['full']:8.3f} {medians['walk']:8.3f} "
+              f"{medians['incremental']:8.3f} {medians['full'] / medians['incremental']:7.1f}x")
+
+    overall = {kind: statistics.median(values) * 1000 for kind, values in totals.items()}
+    print(f"\nAll edits: full {overall['full']:.3f} ms, walk all {overall['walk']:.3f} ms, "
+          f"incremental {overall['incremental']:.3f} ms "
+          f"({overall['full'] / overall['incremental']:.1f}x faster than full re-scoring) "
+          f"over {model.n_estimators} trees")
+    print(f"Largest difference from predict_proba: {max_error:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+Benchmark Suite for the Student Success Predictor
+Times preprocessing, inference, model loading, auth and a headless Streamlit rerun,
+and saves the results as JSON so runs can be compared.
+
+Usage (from the project root):
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --only preprocess --compare benchmarks/results/<old>.json
+"""
+
+import argparse
+import functools
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+DATA_PATH = PROJECT_ROOT / "data" / "data.csv"
+
+BENCHMARKS = []
+
+
+def benchmark(name, repeat=50, warmup=3):
+    """Register a benchmark; the decorated function returns the callable to time
+    (or a (callable, teardown) pair)"""
+
+    def decorator(setup):
+        BENCHMARKS.append({'name': name, 'setup': setup, 'repeat': repeat, 'warmup': warmup})
+        return setup
+
+    return decorator
+
+
+def time_callable(func, repeat, warmup):
+    """Run func repeatedly and return per-call timings in seconds"""
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        'n': len(ordered),
+        'mean_ms': statistics.fmean(ordered) * 1000,
+        'median_ms': statistics.median(ordered) * 1000,
+        'p95_ms': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000,
+        'min_ms': ordered[0] * 1000,
+        'stdev_ms': (statistics.stdev(ordered) * 1000) if len(ordered) > 1 else 0.0,
+    }
+
+
+def load_student_rows(limit=None):
+    """Read data.csv as form-style user_input dicts (column names as the app uses them)"""
+    import pandas as pd
+
+    data = pd.read_csv(DATA_PATH, nrows=limit)
+    data.columns = [column.replace("'", "").strip() for column in data.columns]
+    data = data.rename(columns={'Nacionality': 'Nationality'}).drop(columns=['Target'])
+    return data.to_dict(orient='records')
+
+
+@functools.lru_cache(maxsize=1)
+def load_encoded_dataset():
+    """Encode the full dataset with the training pipeline, aligned to the model's features"""
+    import pandas as pd
+    from models.train_and_save_model import encode_target_variable, prepare_features_for_modeling
+
+    _, preprocessing_info, _ = load_artifacts()
+    data = pd.read_csv(DATA_PATH)
+    data.columns = [column.replace("'", "") for column in data.columns]
+    data = data.rename(columns={'Nacionality': 'Nationality'})
+    processed = prepare_features_for_modeling(encode_target_variable(data))
+    return processed.reindex(columns=preprocessing_info['feature_names'], fill_value=0)
+
+
+def load_artifacts():
+    from src.utils.models_utils import load_model_and_info
+    return load_model_and_info()
+
+
+# --------------------------------------------------------------------------- cases
+
+@benchmark("preprocess_input/single", repeat=200)
+def bench_preprocess_single():
+    from src.utils.models_utils import preprocess_input
+    _, preprocessing_info, _ = load_artifacts()
+    row = load_student_rows(1)[0]
+    return lambda: preprocess_input(row, preprocessing_info)
+
+
+@benchmark("preprocess_input/batch_100", repeat=20)
+def bench_preprocess_batch():
+    from src.utils.models_utils import preprocess_input
+    _, preprocessing_info, _ = load_artifacts()
+    rows = load_student_rows(100)
+    return lambda: [preprocess_input(row, preprocessing_info) for row in rows]
+
+
+@benchmark("preprocess_batch/100", repeat=50)
+def bench_preprocess_batch_vectorized():
+    from src.utils.models_utils import preprocess_batch
+    _, preprocessing_info, _ = load_artifacts()
+    rows = load_student_rows(100)
+    return lambda: preprocess_batch(rows, preprocessing_info)
+
+
+def _predict_proba_case(batch_size):
+    def setup():
+        model, _, _ = load_artifacts()
+        batch = load_encoded_dataset().iloc[:batch_size]
+        return lambda: model.predict_proba(batch)
+
+    return setup
+
+
+for _batch_size, _repeat in ((1, 100), (10, 100), (100, 50), (1000, 20), (4424, 5)):
+    benchmark(f"predict_proba/batch_{_batch_size}", repeat=_repeat)(_predict_proba_case(_batch_size))
+
+
+@benchmark("early_exit/batch_4424", repeat=5)
+def bench_early_exit():
+    from src.utils.early_exit import get_early_exit_forest
+    model, preprocessing_info, _ = load_artifacts()
+    batch = load_encoded_dataset()
+    forest = get_early_exit_forest(model)
+    return lambda: forest.predict(batch, preprocessing_info.get('calibrator'))
+
+
+@benchmark("calibrate/batch_1000", repeat=200)
+def bench_calibrate():
+    import numpy as np
+    from src.utils.calibration import apply_calibration
+    _, preprocessing_info, _ = load_artifacts()
+    calibrator = preprocessing_info.get('calibrator')
+    if calibrator is None:
+        raise RuntimeError("model artifact has no calibrator; retrain it")
+    probabilities = np.random.default_rng(0).dirichlet(np.ones(3), size=1000)
+    return lambda: apply_calibration(probabilities, calibrator)
+
+
+@benchmark("explain/single", repeat=100)
+def bench_explain_single():
+    from src.utils.explain import explain_prediction
+    model, preprocessing_info, _ = load_artifacts()
+    row = load_student_rows(1)[0]
+    return lambda: explain_prediction(model, preprocessing_info, row)
+
+
+@benchmark("explain/batch_1000", repeat=5)
+def bench_explain_batch():
+    from src.utils.explain import explain_batch
+    model, preprocessing_info, _ = load_artifacts()
+    rows = load_student_rows(1000)
+    return lambda: explain_batch(model, preprocessing_info, rows)
+
+
+@benchmark("predict_incremental/single_field_edit", repeat=200)
+def bench_incremental_edit():
+    import itertools
+    from src.utils.incremental import IncrementalScorer
+    model, preprocessing_info, _ = load_artifacts()
+    row = load_student_rows(1)[0]
+    # Alternate between the student and the student with the scholarship flag flipped
+    students = itertools.cycle([{**row, 'Scholarship holder': 1 - row['Scholarship holder']}, row])
+    scorer = IncrementalScorer(model, preprocessing_info)
+    scorer.score(row)
+    return lambda: scorer.score(next(students))
+
+
+@benchmark("whatif/grid_20x20", repeat=50)
+def bench_whatif_grid():
+    import numpy as np
+    from src.utils.whatif import run_sweep
+    model, preprocessing_info, _ = load_artifacts()
+    row = load_student_rows(1)[0]
+    grid = {'Curricular units 1st sem (grade)': np.arange(20.0), 'Admission grade': np.linspace(95, 190, 20)}
+    return lambda: run_sweep(model, preprocessing_info, row, grid)
+
+
+@benchmark("counterfactual/highest_risk", repeat=10, warmup=1)
+def bench_counterfactual():
+    from src.utils.counterfactual import find_interventions
+    from src.utils.models_utils import predict_batch
+    model, preprocessing_info, _ = load_artifacts()
+    rows = load_student_rows()
+    _, probabilities = predict_batch(model, preprocessing_info, rows)
+    row = rows[int(probabilities[:, 0].argmax())]
+    return lambda: find_interventions(model, preprocessing_info, row)
+
+
+@benchmark("shadow/submit", repeat=200)
+def bench_shadow_submit():
+    from src.utils.models_utils import predict_outcome
+    from src.utils.shadow import ShadowScorer
+    model, preprocessing_info, _ = load_artifacts()
+    row = load_student_rows(1)[0]
+    _, probabilities = predict_outcome(model, preprocessing_info, row)
+    # Request-path cost only: the served version shadows itself on the background thread
+    scorer = ShadowScorer(candidate_version=preprocessing_info.get('model_version'))
+    return lambda: scorer.submit(row, preprocessing_info, probabilities)
+
+
+def load_drift_monitor(rows):
+    import pandas as pd
+    from src.utils.drift import DriftMonitor, build_drift_reference
+    from src.utils.encoding import DEFAULT_CATEGORICAL_COLUMNS
+    _, preprocessing_info, _ = load_artifacts()
+    # Artifacts trained before the drift reference existed: bin against the rows themselves
+    reference = preprocessing_info.get('drift_reference') or build_drift_reference(pd.DataFrame(rows),
+                                                                                   DEFAULT_CATEGORICAL_COLUMNS)
+    return DriftMonitor(reference)
+
+
+@benchmark("drift/observe", repeat=200)
+def bench_drift_observe():
+    rows = load_student_rows()
+    monitor = load_drift_monitor(rows)
+    return lambda: monitor.observe(rows[0])
+
+
+@benchmark("drift/observe_batch_4424", repeat=20)
+def bench_drift_observe_batch():
+    import pandas as pd
+    rows = load_student_rows()
+    monitor = load_drift_monitor(rows)
+    frame = pd.DataFrame(rows)
+    return lambda: monitor.observe_batch(frame)
+
+
+@benchmark("drift/report", repeat=50)
+def bench_drift_report():
+    rows = load_student_rows()
+    monitor = load_drift_monitor(rows)
+    monitor.observe_batch(rows)
+    return monitor.report
+
+
+@functools.lru_cache(maxsize=1)
+def load_synthetic_model():
+    from src.utils.synthetic import fit_from_csv
+    return fit_from_csv(DATA_PATH)
+
+
+@benchmark("synthetic/sample_100k", repeat=5, warmup=1)
+def bench_synthetic_sample():
+    import numpy as np
+    model = load_synthetic_model()
+    return lambda: model.sample(100_000, np.random.default_rng(0))
+
+
+@benchmark("predict_batch/synthetic_100k", repeat=3, warmup=1)
+def bench_predict_batch_synthetic():
+    import numpy as np
+    from src.utils.models_utils import predict_batch
+    model, preprocessing_info, _ = load_artifacts()
+    rows = load_synthetic_model().sample(100_000, np.random.default_rng(0))
+    rows.columns = [column.replace("'", "").strip() for column in rows.columns]
+    rows = rows.rename(columns={'Nacionality': 'Nationality'}).drop(columns=['Target'])
+    return lambda: predict_batch(model, preprocessing_info, rows)
+
+
+@benchmark("load_model_and_info/cold", repeat=5, warmup=0)
+def bench_load_cold():
+    from src.utils import models_utils
+    from src.utils.model_registry import load_version, read_current_version
+
+    version = read_current_version()
+
+    def run():
+        if version is not None:
+            return load_version(version)
+        models_utils._load_model_artifacts.clear()
+        return models_utils.load_model_and_info()
+
+    return run
+
+
+@benchmark("load_model_and_info/warm", repeat=50)
+def bench_load_warm():
+    from src.utils import models_utils
+    models_utils.load_model_and_info()
+    return models_utils.load_model_and_info
+
+
+def _verify_credentials_case(user_count):
+    def setup():
+        from src.utils import auth
+        store = Path(tempfile.mkdtemp()) / "users.json"
+        users = {
+            f"user{i}": {"password_hash": auth.hash_password(f"pw{i}"), "role": "user", "name": f"User {i}"}
+            for i in range(user_count)
+        }
+        store.write_text(json.dumps(users))
+        original_store, auth.USERS_FILE = auth.USERS_FILE, store
+        last = f"user{user_count - 1}"
+
+        def teardown():
+            auth.USERS_FILE = original_store
+
+        return lambda: auth.verify_credentials(last, f"pw{user_count - 1}"), teardown
+
+    return setup
+
+
+for _user_count, _repeat in ((10, 200), (10_000, 20), (100_000, 5)):
+    benchmark(f"verify_credentials/users_{_user_count}", repeat=_repeat)(_verify_credentials_case(_user_count))
+
+
+@benchmark("create_feature_mappings", repeat=1000)
+def bench_feature_mappings():
+    from src.config.mappings import create_feature_mappings
+    return create_feature_mappings
+
+
+def _app_test(authenticated):
+    from streamlit.testing.v1 import AppTest
+
+    def run():
+        at = AppTest.from_file(str(PROJECT_ROOT / "app.py"), default_timeout=120)
+        if authenticated:
+            at.session_state.authenticated = True
+            at.session_state.username = "admin"
+            at.session_state.user_role = "admin"
+            at.session_state.user_name = "Administrator"
+        at.run()
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+        return at
+
+    return run
+
+
+@benchmark("apptest/login_page", repeat=5, warmup=1)
+def bench_app_login():
+    return _app_test(authenticated=False)
+
+
+@benchmark("apptest/authenticated_rerun", repeat=5, warmup=1)
+def bench_app_rerun():
+    return _app_test(authenticated=True)
+
+
+# --------------------------------------------------------------------------- runner
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    """Print median ratios against an earlier results file"""
+    baseline = json.loads(Path(baseline_path).read_text())['results']
+    print(f"\n{'benchmark':45s} {'old ms':>10s} {'new ms':>10s} {'ratio':>7s}")
+    for name, stats in results.items():
+        if name in baseline and 'median_ms' in baseline[name] and 'median_ms' in stats:
+            old, new = baseline[name]['median_ms'], stats['median_ms']
+            print(f"{name:45s} {old:10.3f} {new:10.3f} {new / old if old else float('nan'):7.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", default=[], help="Run benchmarks whose name contains this text")
+    parser.add_argument("--output", help="Results JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON to compare medians against")
+    args = parser.parse_args()
+
+    # The app resolves model and user files relative to the working directory
+    os.chdir(PROJECT_ROOT)
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    results = {}
+    for case in BENCHMARKS:
+        if args.only and not any(text in case['name'] for text in args.only):
+            continue
+        try:
+            func, teardown = case['setup'](), None
+            if isinstance(func, tuple):
+                func, teardown = func
+            try:
+                results[case['name']] = summarize(time_callable(func, case['repeat'], case['warmup']))
+            finally:
+                if teardown is not None:
+                    teardown()
+            print(f"{case['name']:45s} median {results[case['name']]['median_ms']:10.3f} ms")
+        except Exception as e:  # keep going so one broken case does not hide the rest
+            results[case['name']] = {'error': f"{type(e).__name__}: {e}"}
+            print(f"{case['name']:45s} ERROR {type(e).__name__}: {e}")
+
+    report = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nResults saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
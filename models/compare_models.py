@@ -0,0 +1,199 @@
+"""
+Model Comparison Harness
+Encodes data.csv once, both as the forest's one-hot matrix and as the raw form fields,
+and places the matrices in shared memory. Every (candidate, fold) pair of a stratified
+k-fold split then runs in a worker process. Workers attach to the shared arrays and
+never copy or re-encode them. Prints mean and standard deviation over the folds of
+accuracy, macro-F1, fit time and predict latency. Probabilities are uncalibrated.
+
+Candidates:
+- random_forest: the production forest (100 trees, one-hot features)
+- compressed_forest: that forest compressed to depth 14 (src/utils/compression.py)
+- hist_gradient_boosting: native categorical splits on the raw fields
+- logistic_regression: standardized one-hot features, multinomial logistic baseline
+
+Usage (from the models directory):
+    python compare_models.py [--folds 5] [--workers 4] [--candidates random_forest logistic_regression]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, Tuple
+
+import numpy as np
+from sklearn.model_selection import StratifiedKFold
+
+from train_and_save_model import PROJECT_ROOT, build_classifier, encode_full_dataset, load_native_dataset
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.evaluation import evaluate_predictions  # noqa: E402
+
+# name, shape, dtype of an array in shared memory
+ArrayDescriptor = Tuple[str, Tuple[int, ...], str]
+
+
+def fit_random_forest(X, y):
+    return build_classifier('random_forest').fit(X, y)
+
+
+def fit_compressed_forest(X, y):
+    from src.utils.compression import compress_forest
+    compressed, _ = compress_forest(fit_random_forest(X, y), X, y, max_depth=14)
+    return compressed
+
+
+def fit_hist_gradient_boosting(X, y):
+    return build_classifier('hist_gradient_boosting').fit(X, y)
+
+
+def fit_logistic_regression(X, y):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+    return make_pipeline(StandardScaler(), LogisticRegression(max_iter=2000)).fit(X, y)
+
+
+# candidate -> (feature matrix it trains on, fit function)
+CANDIDATES = {
+    'random_forest': ('onehot', fit_random_forest),
+    'compressed_forest': ('onehot', fit_compressed_forest),
+    'hist_gradient_boosting': ('raw', fit_hist_gradient_boosting),
+    'logistic_regression': ('onehot', fit_logistic_regression),
+}
+
+# Arrays attached by this worker process (the SharedMemory handles keep the buffers mapped)
+_shared: Dict[str, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+
+
+def share_array(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, ArrayDescriptor]:
+    """Copy an array into a new shared memory block (once, in the parent)"""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach_arrays(descriptors: Dict[str, ArrayDescriptor]) -> None:
+    """Worker initializer: map the parent's arrays without copying them"""
+    from threadpoolctl import threadpool_limits
+
+    # One thread per worker; parallelism comes from the processes
+    threadpool_limits(limits=1)
+    for key, (name, shape, dtype) in descriptors.items():
+        # The parent owns and unlinks the blocks
+        block = shared_memory.SharedMemory(name=name, track=False)
+        _shared[key] = (block, np.ndarray(shape, dtype=dtype, buffer=block.buf))
+
+
+def run_fold(candidate: str, fold: int, train_index: np.ndarray, test_index: np.ndarray) -> Dict[str, Any]:
+    """Fit one candidate on one fold and score it on the fold's held-out rows"""
+    features, fit = CANDIDATES[candidate]
+    X, y = _shared[features][1], _shared['y'][1]
+    X_train, y_train, X_test = X[train_index], y[train_index], X[test_index]
+
+    start = time.perf_counter()
+    model = fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    probabilities = model.predict_proba(X_test)
+    batch_seconds = time.perf_counter() - start
+
+    single = []
+    for i in range(min(20, len(X_test))):
+        start = time.perf_counter()
+        model.predict_proba(X_test[i:i + 1])
+        single.append(time.perf_counter() - start)
+
+    evaluation = evaluate_predictions(y[test_index], probabilities, model.classes_, ['Dropout', 'Enrolled', 'Graduate'])
+    return {
+        'candidate': candidate,
+        'fold': fold,
+        'accuracy': evaluation['accuracy'],
+        'macro_f1': evaluation['f1_score'],
+        'fit_s': fit_seconds,
+        'single_ms': statistics.median(single) * 1000,
+        'batch_ms_per_1k': batch_seconds * 1000 * 1000 / len(X_test),
+    }
+
+
+def compare_models(candidates=tuple(CANDIDATES), n_folds=5, workers=None):
+    """Cross-validate every candidate in parallel workers over shared-memory data"""
+    start = time.perf_counter()
+    X_onehot, y, _, _, _ = encode_full_dataset()
+    X_raw = load_native_dataset()[0]
+    arrays = {
+        'onehot': X_onehot.to_numpy(dtype=np.float32),
+        'raw': X_raw.to_numpy(dtype=np.float32),
+        'y': y.to_numpy(),
+    }
+    print(f"Encoded {len(y)} students once in {time.perf_counter() - start:.2f}s "
+          f"({arrays['onehot'].shape[1]} one-hot / {arrays['raw'].shape[1]} raw features, "
+          f"{sum(array.nbytes for array in arrays.values()) / 1e6:.1f} MB shared)")
+
+    folds = list(StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42).split(arrays['raw'], arrays['y']))
+    blocks, descriptors = [], {}
+    try:
+        for key, array in arrays.items():
+            block, descriptors[key] = share_array(array)
+            blocks.append(block)
+
+        workers = workers or os.cpu_count() or 1
+        print(f"Running {len(candidates)} candidates x {n_folds} folds on {workers} workers...")
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_arrays, initargs=(descriptors,)) as executor:
+            futures = [executor.submit(run_fold, candidate, fold, train_index, test_index)
+                       for candidate in candidates for fold, (train_index, test_index) in enumerate(folds)]
+            results = [future.result() for future in futures]
+        print(f"Done in {time.perf_counter() - start:.1f}s\n")
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+    return results
+
+
+def summarize(results):
+    """Mean and standard deviation per candidate and metric"""
+    summary = {}
+    for result in results:
+        summary.setdefault(result['candidate'], []).append(result)
+    metrics = ('accuracy', 'macro_f1', 'fit_s', 'single_ms', 'batch_ms_per_1k')
+    return {candidate: {metric: (statistics.fmean(r[metric] for r in rows),
+                                 statistics.pstdev(r[metric] for r in rows)) for metric in metrics}
+            for candidate, rows in summary.items()}
+
+
+def print_table(summary):
+    print(f"{'candidate':24s} {'accuracy':>15s} {'macro-F1':>15s} {'fit s':>12s} {'1 row ms':>12s} "
+          f"{'ms / 1k rows':>14s}")
+    for candidate, metrics in summary.items():
+        cells = [f"{mean:.4f} ± {std:.4f}" for mean, std in (metrics['accuracy'], metrics['macro_f1'])]
+        cells += [f"{mean:.2f} ± {std:.2f}" for mean, std in (metrics['fit_s'], metrics['single_ms'])]
+        mean, std = metrics['batch_ms_per_1k']
+        print(f"{candidate:24s} {cells[0]:>15s} {cells[1]:>15s} {cells[2]:>12s} {cells[3]:>12s} "
+              f"{f'{mean:.1f} ± {std:.1f}':>14s}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-validate candidate models on shared-memory data")
+    parser.add_argument("--candidates", nargs="+", choices=CANDIDATES, default=list(CANDIDATES),
+                        help="Candidates to compare (default: all)")
+    parser.add_argument("--folds", type=int, default=5, help="Stratified folds (default: 5)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--json", metavar="PATH", help="Also write the per-fold results as JSON")
+    args = parser.parse_args()
+
+    results = compare_models(args.candidates, n_folds=args.folds, workers=args.workers)
+    print_table(summarize(results))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,131 @@
+"""
+Model Compression Script
+Compresses a published model version (src/utils/compression.py) and publishes the
+result as a new, non-current registry version, printing the size, latency and
+accuracy trade-off. Trees are selected on out-of-bag training rows, so the reported
+held-out accuracy is untouched by the selection. The version must have been fully
+trained on the current encoded data.csv (not grown with --add-trees).
+
+Usage (from the models directory):
+    python compress_model.py                              # compress CURRENT, 0.5 point tolerance
+    python compress_model.py --max-depth 14 --tolerance 0.01
+    python compress_model.py --dry-run                    # report only, publish nothing
+
+Serve the compressed version with:
+    python -m src.utils.model_registry promote <version>
+"""
+
+import argparse
+import pickle
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from train_and_save_model import PROJECT_ROOT, REGISTRY_DIR, load_encoded_dataset
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.calibration import apply_calibration  # noqa: E402
+from src.utils.compression import compress_forest  # noqa: E402
+from src.utils.evaluation import evaluate_predictions  # noqa: E402
+from src.utils.model_registry import load_version, publish_version, read_current_version  # noqa: E402
+
+
+def median_seconds(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def describe(name, model, X, X_test, y_test, calibrator):
+    """One row of the trade-off table"""
+    # Both forests were fitted on the named columns; float32 is what predict_proba converts to anyway
+    X = X.astype(np.float32)
+    probabilities = apply_calibration(model.predict_proba(X_test.astype(np.float32)), calibrator)
+    return {
+        'name': name,
+        'trees': len(model.estimators_),
+        'nodes': sum(estimator.tree_.node_count for estimator in model.estimators_),
+        'max_depth': max(estimator.tree_.max_depth for estimator in model.estimators_),
+        'size_mb': len(pickle.dumps(model)) / 1e6,
+        'single_ms': median_seconds(lambda: model.predict_proba(X.iloc[:1]), 50) * 1000,
+        'batch_ms': median_seconds(lambda: model.predict_proba(X), 5) * 1000,
+        'accuracy': float(np.mean(model.classes_[probabilities.argmax(axis=1)] == y_test.to_numpy())),
+    }
+
+
+def compress_model(version=None, tolerance=0.005, max_depth=None, dry_run=False):
+    """Compress a registry version and publish it alongside (not instead of) the original"""
+    version = version or read_current_version(str(REGISTRY_DIR))
+    if version is None:
+        sys.exit("No published model version; train one first.")
+    bundle = load_version(version, str(REGISTRY_DIR))
+    model, preprocessing_info = bundle.model, dict(bundle.preprocessing_info)
+    if preprocessing_info.get('model_backend', 'random_forest') != 'random_forest':
+        sys.exit(f"Version {version} is not a Random Forest; only forests can be compressed.")
+    calibrator = preprocessing_info.get('calibrator')
+
+    X, y, train_index, test_index = load_encoded_dataset(incremental=True)
+    if X.columns.tolist() != bundle.feature_names:
+        sys.exit(f"Version {version} was trained on a different feature layout than data.csv.")
+    X_test, y_test = X.iloc[test_index], y.iloc[test_index]
+    training_data = preprocessing_info.get('training_data')
+    if training_data is None:
+        sys.exit(f"Version {version} does not record the rows it was trained on; retrain it before compressing.")
+
+    print(f"Compressing version {version} ({len(model.estimators_)} trees, tolerance {tolerance:.3f}, "
+          f"max depth {max_depth or 'unlimited'})...")
+    try:
+        compressed, selection = compress_forest(model, X.iloc[train_index], y.iloc[train_index],
+                                                tolerance=tolerance, max_depth=max_depth, calibrator=calibrator,
+                                                training_data=training_data)
+    except ValueError as e:
+        sys.exit(f"Cannot compress version {version}: {e}")
+    print(f"Selected {selection['n_selected']} trees: out-of-bag accuracy "
+          f"{selection['accuracies'][selection['n_selected'] - 1]:.4f} vs {selection['full_accuracy']:.4f} "
+          f"for the full forest\n")
+
+    rows = [describe("original", model, X, X_test, y_test, calibrator),
+            describe("compressed", compressed, X, X_test, y_test, calibrator)]
+    print(f"{'model':12s} {'trees':>6s} {'nodes':>8s} {'depth':>6s} {'size MB':>8s} {'1 row ms':>9s} "
+          f"{f'{len(X)} rows ms':>13s} {'accuracy':>9s}")
+    for row in rows:
+        print(f"{row['name']:12s} {row['trees']:6d} {row['nodes']:8d} {row['max_depth']:6d} {row['size_mb']:8.2f} "
+              f"{row['single_ms']:9.2f} {row['batch_ms']:13.1f} {row['accuracy']:9.4f}")
+    print(f"(calibrated accuracy on the {len(test_index)} held-out rows)")
+
+    if dry_run:
+        return compressed, None
+
+    # Metrics shown in the app describe the compressed model
+    preprocessing_info.pop('model_version', None)
+    preprocessing_info['evaluation'] = evaluate_predictions(
+        y_test, apply_calibration(compressed.predict_proba(X_test), calibrator), compressed.classes_,
+        ['Dropout', 'Enrolled', 'Graduate']
+    )
+    compressed_version = publish_version(
+        compressed, preprocessing_info, bundle.feature_names, registry_dir=str(REGISTRY_DIR),
+        version=f"{version}-compressed-{time.strftime('%H%M%S')}", make_current=False,
+        extra_manifest={'test_accuracy': rows[1]['accuracy'], 'compressed_from': version,
+                        'n_trees': rows[1]['trees'], 'max_depth': max_depth, 'tolerance': tolerance}
+    )
+    print(f"\nPublished registry/{compressed_version}/ (CURRENT is unchanged)")
+    return compressed, compressed_version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compress a published model and report the trade-off")
+    parser.add_argument("--version", help="Registry version to compress (default: CURRENT)")
+    parser.add_argument("--tolerance", type=float, default=0.005,
+                        help="Allowed out-of-bag accuracy loss versus the full forest (default: 0.005)")
+    parser.add_argument("--max-depth", type=int, default=None, metavar="D",
+                        help="Cut every tree at depth D (default: keep full depth)")
+    parser.add_argument("--dry-run", action="store_true", help="Print the report without publishing")
+    args = parser.parse_args()
+    compress_model(version=args.version, tolerance=args.tolerance, max_depth=args.max_depth, dry_run=args.dry_run)
@@ -1,44 +1,101 @@
 """
 Model Training and Pickle Export Script
 This script recreates the Random Forest model training process and saves the model and preprocessing pipeline.
+
+Usage (from the models directory):
+    python train_and_save_model.py                  # full retrain
+    python train_and_save_model.py --incremental    # encode only rows appended to data.csv
+    python train_and_save_model.py --add-trees 20   # also grow the existing forest instead of refitting
+    python train_and_save_model.py --data ../data/synthetic.csv   # train on another CSV (e.g. synthetic rows)
+    python train_and_save_model.py --backend hist_gradient_boosting   # raw fields, native categoricals
 """
 
+import argparse
+import hashlib
+import io
+import json
 import pickle
+import sys
+import time
+from pathlib import Path
 
+import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
-
-
-def load_and_preprocess_data():
+from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+from sklearn.model_selection import cross_val_predict, train_test_split
+
+MODELS_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = MODELS_DIR.parent
+DATA_PATH = PROJECT_ROOT / "data" / "data.csv"
+REGISTRY_DIR = MODELS_DIR / "registry"
+
+# Encoded training matrix from the last run, reused by --incremental
+CACHE_DIR = MODELS_DIR / "cache"
+CACHE_MANIFEST = CACHE_DIR / "encoded.json"
+
+# The form fields, in data.csv order (the HistGradientBoosting backend's features)
+ORIGINAL_COLUMNS = [
+    'Marital status', 'Application mode', 'Application order', 'Course',
+    'Daytime/evening attendance', 'Previous qualification',
+    'Previous qualification (grade)', 'Nationality', 'Mothers qualification',
+    'Fathers qualification', 'Mothers occupation', 'Fathers occupation',
+    'Admission grade', 'Displaced', 'Educational special needs', 'Debtor',
+    'Tuition fees up to date', 'Gender', 'Scholarship holder',
+    'Age at enrollment', 'International', 'Curricular units 1st sem (credited)',
+    'Curricular units 1st sem (enrolled)', 'Curricular units 1st sem (evaluations)',
+    'Curricular units 1st sem (approved)', 'Curricular units 1st sem (grade)',
+    'Curricular units 1st sem (without evaluations)',
+    'Curricular units 2nd sem (credited)', 'Curricular units 2nd sem (enrolled)',
+    'Curricular units 2nd sem (evaluations)', 'Curricular units 2nd sem (approved)',
+    'Curricular units 2nd sem (grade)', 'Curricular units 2nd sem (without evaluations)',
+    'Unemployment rate', 'Inflation rate', 'GDP'
+]
+
+# Nominal codes the HistGradientBoosting backend splits on as categories (binary flags stay numeric)
+NATIVE_CATEGORICAL_COLUMNS = [
+    'Marital status', 'Application mode', 'Course', 'Daytime/evening attendance',
+    'Previous qualification', 'Nationality', 'Mothers qualification',
+    'Fathers qualification', 'Mothers occupation', 'Fathers occupation'
+]
+
+BACKENDS = ('random_forest', 'hist_gradient_boosting')
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.calibration import apply_calibration, fit_isotonic_calibrator  # noqa: E402
+from src.utils.compression import training_fingerprint  # noqa: E402
+from src.utils.dataset import clean_column_names, load_dataset  # noqa: E402
+from src.utils.drift import build_drift_reference  # noqa: E402
+from src.utils.encoding import DEFAULT_CATEGORICAL_COLUMNS  # noqa: E402
+from src.utils.evaluation import evaluate_predictions  # noqa: E402
+from src.utils.importance import permutation_importance_by_field  # noqa: E402
+from src.utils.model_registry import publish_version  # noqa: E402
+
+
+def load_and_preprocess_data(source=DATA_PATH):
     """Load and preprocess the data exactly as done in the notebook"""
-    # Load data
-    data_file_name_path = "../../../data/data.csv"
-    master_raw_data = pd.read_csv(data_file_name_path)
-    data = master_raw_data.copy()
-
-    # Fix column name typo
-    data.rename(columns={'Nacionality': 'Nationality'}, inplace=True)
+    # A path loads through the typed columnar cache (parsed and cleaned once)
+    if isinstance(source, (str, Path)):
+        return load_dataset(csv_path=source)
 
-    # Remove apostrophes from column names
-    for column_name in data.columns:
-        if "'" in column_name:
-            new_column_name = column_name.replace("'", "")
-            data.rename(columns={column_name: new_column_name}, inplace=True)
+    # An in-memory CSV buffer (e.g. rows appended since the last incremental run)
+    data = pd.read_csv(source)
 
-    return data
+    # Fix column name typo and remove apostrophes from column names
+    return data.rename(columns=clean_column_names(data.columns))
 
 
 def encode_target_variable(data):
     """Encode the target variable as done in the notebook"""
     # Label mapping from the notebook analysis
     target_mapping = {'Dropout': 0, 'Enrolled': 1, 'Graduate': 2}
-    data['Target_encoded'] = data['Target'].map(target_mapping)
+    data['Target_encoded'] = data['Target'].map(target_mapping).astype('int64')
     return data
 
 
-def prepare_features_for_modeling(data):
-    """Prepare features exactly as done in the notebook"""
+def infer_categorical_columns(data):
+    """Columns to one-hot encode, as decided in the notebook"""
     # Get all categorical columns that need one-hot encoding
     categorical_columns = [
         'Marital status', 'Application mode', 'Course', 'Daytime/evening attendance',
@@ -56,6 +113,15 @@ def prepare_features_for_modeling(data):
             if unique_vals <= 20 and col not in ['Age at enrollment']:
                 categorical_columns.append(col)
 
+    return categorical_columns
+
+
+def prepare_features_for_modeling(data, categorical_columns=None):
+    """Prepare features exactly as done in the notebook"""
+    # Infer from the data unless a fixed list is given (incremental runs reuse the cached list)
+    if categorical_columns is None:
+        categorical_columns = infer_categorical_columns(data)
+
     # Create a copy for processing
     processed_data = data.copy()
 
@@ -75,48 +141,216 @@ def prepare_features_for_modeling(data):
     return processed_data
 
 
-def train_and_save_model():
-    """Train the Random Forest model and save both model and preprocessing info"""
-
-    # Load and preprocess data
-    print("Loading and preprocessing data...")
-    data = load_and_preprocess_data()
-
-    # Encode target variable
-    data = encode_target_variable(data)
-
-    # Prepare features
-    processed_data = prepare_features_for_modeling(data)
+def encode_full_dataset(data_path=DATA_PATH):
+    """Encode every row of the CSV and make the notebook's train/test split"""
+    data = encode_target_variable(load_and_preprocess_data(data_path))
+    categorical_columns = infer_categorical_columns(data)
+    processed_data = prepare_features_for_modeling(data, categorical_columns)
 
-    # Separate features and target
     X = processed_data.drop('Target_encoded', axis=1)
     y = processed_data['Target_encoded']
 
-    print(f"Final dataset shape: {X.shape}")
-    print(f"Features: {X.columns.tolist()}")
+    # Split data (using 30% test size as in the notebook); row positions are kept so
+    # later incremental runs extend the same split instead of reshuffling it
+    train_index, test_index = train_test_split(np.arange(len(X)), test_size=0.30, random_state=42)
+    return X, y, train_index, test_index, categorical_columns
+
+
+def load_native_dataset(data_path=DATA_PATH):
+    """The raw form fields (no one-hot encoding) with the same train/test split as encode_full_dataset"""
+    data = encode_target_variable(load_and_preprocess_data(data_path))
+    # The CSV header carries a stray tab after the attendance column; the form field has none
+    data = data.rename(columns=str.strip)
+
+    X = data[ORIGINAL_COLUMNS].astype(np.float32)
+    y = data['Target_encoded']
+    train_index, test_index = train_test_split(np.arange(len(X)), test_size=0.30, random_state=42)
+    return X, y, train_index, test_index
+
+
+def build_classifier(backend='random_forest'):
+    """An unfitted model for the chosen backend"""
+    if backend == 'hist_gradient_boosting':
+        return HistGradientBoostingClassifier(
+            categorical_features=[column in NATIVE_CATEGORICAL_COLUMNS for column in ORIGINAL_COLUMNS],
+            random_state=42
+        )
+    return RandomForestClassifier(n_estimators=100, random_state=42)
+
+
+def read_encoded_cache(raw):
+    """Load the cached encoded matrix if data.csv starts with the bytes it was built from"""
+    if not CACHE_MANIFEST.exists():
+        return None
+    manifest = json.loads(CACHE_MANIFEST.read_text())
+
+    n_bytes = manifest['n_bytes']
+    prefix = raw[:n_bytes]
+    if len(prefix) < n_bytes or hashlib.sha256(prefix).hexdigest() != manifest['sha256']:
+        print("Cached encoding does not match the start of data.csv (rows edited?), re-encoding everything")
+        return None
+    if len(raw) > n_bytes and not prefix.endswith(b'\n'):
+        print("Cached encoding ends mid-line, re-encoding everything")
+        return None
+
+    arrays = np.load(CACHE_DIR / manifest['matrix_file'])
+    X = pd.DataFrame(arrays['X'], columns=manifest['columns'])
+    y = pd.Series(arrays['y'], name='Target_encoded')
+    return manifest, X, y, arrays['train_index'], arrays['test_index']
+
+
+def write_encoded_cache(raw, X, y, train_index, test_index, categorical_columns):
+    """Store the encoded matrix keyed by the SHA-256 of the CSV bytes it covers"""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    digest = hashlib.sha256(raw).hexdigest()
+    matrix_file = f"encoded-{digest[:16]}.npz"
+
+    # float32 is what the trees train on anyway
+    np.savez(CACHE_DIR / matrix_file, X=X.to_numpy(dtype=np.float32), y=y.to_numpy(),
+             train_index=train_index, test_index=test_index)
+    manifest = {
+        'sha256': digest,
+        'n_bytes': len(raw),
+        'n_rows': len(X),
+        'columns': X.columns.tolist(),
+        'categorical_columns': categorical_columns,
+        'matrix_file': matrix_file,
+    }
+    CACHE_MANIFEST.write_text(json.dumps(manifest, indent=2))
+
+    for stale in CACHE_DIR.glob("encoded-*.npz"):
+        if stale.name != matrix_file:
+            stale.unlink()
+
+
+def load_encoded_dataset(incremental=False, data_path=DATA_PATH):
+    """Return (X, y, train_index, test_index), encoding only new rows when incremental"""
+    raw = Path(data_path).read_bytes()
+    cached = read_encoded_cache(raw) if incremental else None
+
+    if cached is not None:
+        manifest, X, y, train_index, test_index = cached
+        new_bytes = raw[manifest['n_bytes']:]
+        if not new_bytes.strip():
+            print(f"No new rows since the cached encoding ({len(X)} rows)")
+            return X, y, train_index, test_index
+
+        # Parse and encode only the appended rows, with the cached column layout
+        header = raw[:raw.index(b'\n') + 1]
+        delta = encode_target_variable(load_and_preprocess_data(io.BytesIO(header + new_bytes)))
+        processed_delta = prepare_features_for_modeling(delta, manifest['categorical_columns'])
+        unseen = set(processed_delta.columns) - set(manifest['columns']) - {'Target_encoded'}
+
+        if unseen:
+            # A new category means new one-hot columns; the cached layout no longer fits
+            print(f"New rows add {len(unseen)} unseen categories, re-encoding everything")
+        else:
+            X_new = processed_delta.drop('Target_encoded', axis=1).reindex(columns=manifest['columns'],
+                                                                          fill_value=0)
+            new_positions = np.arange(len(X), len(X) + len(X_new))
+            if len(new_positions) < 2:
+                # Too few rows to split (train_test_split would leave train empty): train on them
+                new_train, new_test = new_positions, new_positions[:0]
+            else:
+                new_train, new_test = train_test_split(new_positions, test_size=0.30, random_state=42)
+
+            X = pd.concat([X, X_new.astype(np.float32)], ignore_index=True)
+            y = pd.concat([y, processed_delta['Target_encoded']], ignore_index=True)
+            train_index = np.concatenate([train_index, new_train])
+            test_index = np.concatenate([test_index, new_test])
+            write_encoded_cache(raw, X, y, train_index, test_index, manifest['categorical_columns'])
+            print(f"Encoded {len(X_new)} new rows on top of {manifest['n_rows']} cached rows")
+            return X, y, train_index, test_index
+
+    X, y, train_index, test_index, categorical_columns = encode_full_dataset(data_path)
+    write_encoded_cache(raw, X, y, train_index, test_index, categorical_columns)
+    return X, y, train_index, test_index
+
+
+def load_previous_artifacts():
+    """The model and preprocessing info from the last run in this directory"""
+    with open(MODELS_DIR / 'random_forest_model.pkl', 'rb') as f:
+        model = pickle.load(f)
+    with open(MODELS_DIR / 'preprocessing_info.pkl', 'rb') as f:
+        preprocessing_info = pickle.load(f)
+    return model, preprocessing_info
+
+
+def train_and_save_model(incremental=False, add_trees=0, recalibrate=False, recompute_importance=False,
+                         data_path=DATA_PATH, backend='random_forest'):
+    """Train the model (Random Forest unless another backend is chosen) and save both model and preprocessing info"""
+    if backend != 'random_forest' and (incremental or add_trees > 0):
+        sys.exit("--incremental and --add-trees only apply to the random_forest backend.")
 
-    # Split data (using 30% test size as in the notebook)
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.30, random_state=42)
+    # Load and preprocess data
+    print("Loading and preprocessing data...")
+    start = time.perf_counter()
+    if backend == 'hist_gradient_boosting':
+        X, y, train_index, test_index = load_native_dataset(data_path)
+    else:
+        X, y, train_index, test_index = load_encoded_dataset(incremental=incremental or add_trees > 0,
+                                                             data_path=data_path)
+    print(f"Data ready in {time.perf_counter() - start:.2f}s")
 
-    # Train Random Forest model
-    print("Training Random Forest model...")
-    rf_classifier = RandomForestClassifier(n_estimators=100, random_state=42)
-    rf_classifier.fit(X_train, y_train)
+    print(f"Final dataset shape: {X.shape}")
+    print(f"Features: {X.columns.tolist()}")
 
-    # Evaluate model
+    X_train, X_test = X.iloc[train_index], X.iloc[test_index]
+    y_train, y_test = y.iloc[train_index], y.iloc[test_index]
+
+    calibrator = None
+    feature_importance = None
+    if add_trees > 0:
+        # Grow the existing forest: only the new trees are fitted
+        rf_classifier, previous_info = load_previous_artifacts()
+        if list(getattr(rf_classifier, 'feature_names_in_', [])) != X.columns.tolist():
+            sys.exit("The saved model was trained on a different feature layout; run a full retrain instead.")
+        print(f"Growing the forest from {rf_classifier.n_estimators} to {rf_classifier.n_estimators + add_trees} trees...")
+        rf_classifier.set_params(warm_start=True, n_estimators=rf_classifier.n_estimators + add_trees)
+        rf_classifier.fit(X_train, y_train)
+        rf_classifier.set_params(warm_start=False)
+        # The slow derived artifacts carry over unless asked for; the added trees shift them little
+        if not recalibrate:
+            calibrator = previous_info.get('calibrator')
+        if not recompute_importance:
+            feature_importance = previous_info.get('feature_importance')
+    else:
+        print(f"Training {backend} model...")
+        start = time.perf_counter()
+        rf_classifier = build_classifier(backend)
+        rf_classifier.fit(X_train, y_train)
+        print(f"Fitted in {time.perf_counter() - start:.2f}s")
+
+    if calibrator is None:
+        # Calibrate on out-of-fold predictions (in-sample forest votes are overconfident)
+        print("Fitting probability calibrator...")
+        oof_probabilities = cross_val_predict(build_classifier(backend), X_train, y_train, cv=5,
+                                              method='predict_proba', n_jobs=-1)
+        calibrator = fit_isotonic_calibrator(oof_probabilities, y_train, rf_classifier.classes_)
+
+    # Evaluate model (all held-out metrics come from one predict_proba pass,
+    # calibrated exactly as the app serves it)
     train_accuracy = rf_classifier.score(X_train, y_train)
-    test_accuracy = rf_classifier.score(X_test, y_test)
+    raw_test_probabilities = rf_classifier.predict_proba(X_test)
+    test_probabilities = apply_calibration(raw_test_probabilities, calibrator)
+    evaluation = evaluate_predictions(y_test, test_probabilities, rf_classifier.classes_,
+                                      ['Dropout', 'Enrolled', 'Graduate'])
+    evaluation['train_accuracy'] = train_accuracy
+    test_accuracy = evaluation['accuracy']
 
     print(f"Training Accuracy: {train_accuracy:.4f}")
     print(f"Test Accuracy: {test_accuracy:.4f}")
+    raw_brier = evaluate_predictions(y_test, raw_test_probabilities, rf_classifier.classes_,
+                                     ['Dropout', 'Enrolled', 'Graduate'])['brier_score']
+    print(f"Test Brier score: {evaluation['brier_score']:.4f} calibrated, {raw_brier:.4f} raw")
 
     # Save the trained model
-    with open('random_forest_model.pkl', 'wb') as f:
+    with open(MODELS_DIR / 'random_forest_model.pkl', 'wb') as f:
         pickle.dump(rf_classifier, f)
 
     # Save feature names for consistency
     feature_names = X.columns.tolist()
-    with open('feature_names.pkl', 'wb') as f:
+    with open(MODELS_DIR / 'feature_names.pkl', 'wb') as f:
         pickle.dump(feature_names, f)
 
     # Save preprocessing information
@@ -132,35 +366,76 @@ def train_and_save_model():
             'Application order'  # Adding this based on notebook analysis
         ],
         'feature_names': feature_names,
-        'original_columns': [
-            'Marital status', 'Application mode', 'Application order', 'Course',
-            'Daytime/evening attendance', 'Previous qualification',
-            'Previous qualification (grade)', 'Nationality', 'Mothers qualification',
-            'Fathers qualification', 'Mothers occupation', 'Fathers occupation',
-            'Admission grade', 'Displaced', 'Educational special needs', 'Debtor',
-            'Tuition fees up to date', 'Gender', 'Scholarship holder',
-            'Age at enrollment', 'International', 'Curricular units 1st sem (credited)',
-            'Curricular units 1st sem (enrolled)', 'Curricular units 1st sem (evaluations)',
-            'Curricular units 1st sem (approved)', 'Curricular units 1st sem (grade)',
-            'Curricular units 1st sem (without evaluations)',
-            'Curricular units 2nd sem (credited)', 'Curricular units 2nd sem (enrolled)',
-            'Curricular units 2nd sem (evaluations)', 'Curricular units 2nd sem (approved)',
-            'Curricular units 2nd sem (grade)', 'Curricular units 2nd sem (without evaluations)',
-            'Unemployment rate', 'Inflation rate', 'GDP'
-        ]
+        'original_columns': list(ORIGINAL_COLUMNS),
+        'model_backend': backend,
+    }
+
+    if backend == 'hist_gradient_boosting':
+        # Codes seen in training, for the app's what-if sweeps (no one-hot columns to list them)
+        preprocessing_info['category_values'] = {
+            column: sorted(float(value) for value in X_train[column].unique())
+            for column in preprocessing_info['categorical_columns']
+        }
+        # Features are the raw fields: with no one-hot columns the app's encoder copies
+        # every field straight through, and the model splits on the codes natively
+        preprocessing_info['categorical_columns'] = []
+
+    # Which rows the model was fitted on (compression recovers out-of-bag rows from them)
+    preprocessing_info['training_data'] = {
+        'sha256': training_fingerprint(X_train, y_train),
+        'n_rows': len(X_train),
+        'warm_started': add_trees > 0,
     }
 
-    with open('preprocessing_info.pkl', 'wb') as f:
+    # Training distribution of every form field, for the app's drift monitor
+    raw_train = X_train if backend == 'hist_gradient_boosting' else load_native_dataset(data_path)[0].iloc[train_index]
+    preprocessing_info['drift_reference'] = build_drift_reference(raw_train, DEFAULT_CATEGORICAL_COLUMNS)
+
+    # Held-out metrics shown in the app, stored with the model they describe
+    preprocessing_info['calibrator'] = calibrator
+    preprocessing_info['evaluation'] = evaluation
+
+    # Global feature importance, stored with the model so the app never recomputes it
+    if feature_importance is None:
+        print("Computing feature importance...")
+        feature_importance = permutation_importance_by_field(
+            rf_classifier, X_test, y_test, feature_names, preprocessing_info['original_columns'],
+            calibrator=calibrator
+        )
+    preprocessing_info['feature_importance'] = feature_importance
+
+    with open(MODELS_DIR / 'preprocessing_info.pkl', 'wb') as f:
         pickle.dump(preprocessing_info, f)
 
+    # Publish a versioned copy; running apps hot-swap to it without a restart
+    version = publish_version(rf_classifier, preprocessing_info, feature_names, registry_dir=str(REGISTRY_DIR),
+                              extra_manifest={'test_accuracy': test_accuracy})
+
     print("Model and preprocessing info saved successfully!")
     print("Files created:")
     print("- random_forest_model.pkl")
     print("- feature_names.pkl")
     print("- preprocessing_info.pkl")
+    print(f"- registry/{version}/ (now CURRENT)")
 
     return rf_classifier, preprocessing_info
 
 
 if __name__ == "__main__":
-    train_and_save_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the model and save its artifacts")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse the cached encoded matrix and encode only rows appended to data.csv")
+    parser.add_argument("--add-trees", type=int, default=0, metavar="N",
+                        help="Grow the saved forest by N trees (warm_start) instead of refitting; implies --incremental")
+    parser.add_argument("--recalibrate", action="store_true",
+                        help="With --add-trees, also refit the calibrator (5 extra forest fits)")
+    parser.add_argument("--recompute-importance", action="store_true",
+                        help="With --add-trees, also recompute permutation importance")
+    parser.add_argument("--data", type=Path, default=DATA_PATH, metavar="CSV",
+                        help="Training CSV with data.csv's columns (default: data/data.csv)")
+    parser.add_argument("--backend", choices=BACKENDS, default='random_forest',
+                        help="random_forest on one-hot features (default), or hist_gradient_boosting on the "
+                             "raw fields with native categorical splits")
+    args = parser.parse_args()
+    train_and_save_model(incremental=args.incremental, add_trees=args.add_trees, recalibrate=args.recalibrate,
+                         recompute_importance=args.recompute_importance, data_path=args.data, backend=args.backend)
\ No newline at end of file
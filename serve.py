@@ -0,0 +1,29 @@
+"""
+Production launcher for the Student Success Predictor
+Warms up the model in this process, then starts the Streamlit server. The app script
+runs in the same interpreter, so it reuses the already-loaded model and caches.
+
+Usage:
+    python serve.py [streamlit run options, e.g. --server.port 8501]
+"""
+
+import logging
+import sys
+
+from streamlit.web import cli as streamlit_cli
+
+from src.utils.warmup import warm_up
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # Finishes before the server starts listening (and reports itself ready)
+    warm_up()
+
+    sys.argv = ["streamlit", "run", "app.py", *sys.argv[1:]]
+    sys.exit(streamlit_cli.main())
+
+
+if __name__ == "__main__":
+    main()
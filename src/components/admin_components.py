@@ -0,0 +1,163 @@
+"""
+Admin-only diagnostics components
+"""
+
+from typing import Any, Dict
+
+import streamlit as st
+
+from ..utils.auth import check_role_permission
+from ..utils.metrics import metrics
+from ..utils.model_registry import list_versions
+from ..utils.prediction_cache import prediction_cache
+from ..utils.profiling import request_profile
+from ..utils.shadow import shadow_scorer
+
+
+def render_metrics_panel() -> None:
+    """Render per-stage latency stats and Prometheus export for admins"""
+    if not check_role_permission("admin"):
+        return
+
+    with st.expander("⏱️ Performance Metrics"):
+        metrics.enabled = st.toggle("Record stage timings", value=metrics.enabled,
+                                    help="Timing hooks are near-free when disabled")
+
+        rows = metrics.summary()
+        if rows:
+            st.dataframe(
+                [{k: (round(v, 3) if isinstance(v, float) else v) for k, v in row.items()} for row in rows],
+                hide_index=True,
+                use_container_width=True
+            )
+        else:
+            st.caption("No timings recorded yet.")
+
+        cache_stats = prediction_cache.stats()
+        st.caption(
+            f"Prediction cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+            f"({cache_stats['hit_rate']:.0%}), {cache_stats['size']}/{cache_stats['maxsize']} entries"
+        )
+
+        # Imported here so the login page does not pay for numpy
+        from ..utils.encoding import unseen_category_counts
+        unseen = {field: count for field, count in unseen_category_counts().items() if count}
+        if unseen:
+            st.caption("Served rows with a category unseen in training: "
+                       + ", ".join(f"{field} {count}" for field, count in sorted(unseen.items())))
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            if st.button("💾 Export", key="metrics_export", help="Write Prometheus text file"):
+                path = metrics.write_prometheus_file()
+                st.success(f"✅ Written to {path}")
+        with col2:
+            st.download_button(
+                label="📁 .prom",
+                data=metrics.export_prometheus(),
+                file_name="metrics.prom",
+                mime="text/plain",
+                key="metrics_download"
+            )
+        with col3:
+            if st.button("♻️ Reset", key="metrics_reset"):
+                metrics.reset()
+                st.rerun()
+
+
+def render_profiling_panel() -> None:
+    """Render the single-rerun profiler controls and last report for admins"""
+    if not check_role_permission("admin"):
+        return
+
+    with st.expander("🔬 Profiling"):
+        if st.button("🎯 Profile next rerun", key="profile_arm",
+                     help="Only this session's script thread is sampled"):
+            request_profile()
+        if st.session_state.get('profile_next_run'):
+            st.info("Armed: the next interaction in this session will be profiled.")
+
+        profile = st.session_state.get('last_profile')
+        if not profile:
+            st.caption("No profile captured yet.")
+            return
+
+        st.caption(f"Captured {profile['timestamp']} - {profile['duration'] * 1000:.0f} ms, "
+                   f"{profile['samples']} samples")
+        st.dataframe(
+            [{k: (round(v, 1) if isinstance(v, float) else v) for k, v in row.items()}
+             for row in profile['top_functions']],
+            hide_index=True,
+            use_container_width=True
+        )
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("📁 .pstats", data=profile['pstats'], file_name="rerun.pstats",
+                               mime="application/octet-stream", key="profile_pstats")
+        with col2:
+            st.download_button("🔥 Flamegraph", data=profile['folded'], file_name="rerun.folded",
+                               mime="text/plain", key="profile_folded",
+                               help="Collapsed stacks for flamegraph.pl or speedscope")
+
+
+def render_shadow_panel(preprocessing_info: Dict[str, Any]) -> None:
+    """Render shadow-mode controls and the candidate's agreement with production for admins"""
+    if not check_role_permission("admin"):
+        return
+
+    with st.expander("🕶️ Shadow Scoring"):
+        serving = preprocessing_info.get('model_version')
+        options = [None] + [manifest['version'] for manifest in list_versions() if manifest['version'] != serving]
+        current = shadow_scorer.candidate_version
+        if current not in options:
+            options.append(current)
+        candidate = st.selectbox("Candidate version", options, index=options.index(current),
+                                 format_func=lambda version: "Off" if version is None else version,
+                                 key="shadow_candidate",
+                                 help="Scores every served prediction again with this registry version "
+                                      "in the background; users only ever see production")
+        if candidate != current:
+            shadow_scorer.set_candidate(candidate)
+
+        if shadow_scorer.last_error:
+            st.error(f"❌ Shadow scoring failed: {shadow_scorer.last_error}")
+
+        stats = shadow_scorer.stats()
+        if not shadow_scorer.enabled:
+            st.caption("Shadow mode is off.")
+            return
+        if stats is None:
+            st.caption(f"Waiting for predictions ({shadow_scorer.pending} queued).")
+            return
+
+        st.metric("Label agreement", f"{stats['agreement']:.1%}",
+                  help=f"{stats['production_version']} (production) vs {stats['candidate_version']}")
+        st.caption(f"{stats['scored']} scored, {shadow_scorer.pending} queued, {shadow_scorer.dropped} dropped "
+                   f"on a full queue. Largest probability change: {stats['max_abs_delta']:.1%}")
+
+        st.dataframe(
+            [{'Outcome': outcome, 'Mean Δ': round(mean, 4), 'Mean |Δ|': round(mean_abs, 4)}
+             for outcome, mean, mean_abs in zip(stats['classes'], stats['mean_delta'], stats['mean_abs_delta'])],
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption("Students by largest probability change: " + ", ".join(
+            f"≤{edge:.0%}: {count}" for edge, count in stats['delta_histogram']))
+
+        st.markdown("**Production → candidate labels**")
+        st.dataframe(
+            [{'Production': outcome, **dict(zip(stats['classes'], row))}
+             for outcome, row in zip(stats['classes'], stats['confusion'])],
+            hide_index=True,
+            use_container_width=True
+        )
+
+        if stats['recent_disagreements']:
+            st.markdown("**Recent disagreements**")
+            st.dataframe(
+                [{k: (round(v, 3) if isinstance(v, float) else v) for k, v in row.items()}
+                 for row in reversed(stats['recent_disagreements'])],
+                hide_index=True,
+                use_container_width=True
+            )
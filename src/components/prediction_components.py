@@ -3,17 +3,20 @@ Prediction and results display components
 """
 
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
 import time
 import json
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Optional
 
-from src.utils.models_utils import preprocess_input, generate_recommendations, validate_input
+from src.config.settings import DRIFT_MIN_OBSERVATIONS, EXPLANATION_TOP_K
+from src.utils.audit_log import log_prediction
+from src.utils.drift import get_drift_monitor
+from src.utils.metrics import timed
+from src.utils.models_utils import (MODEL_BACKEND_LABELS, generate_recommendations, model_backend, predict_outcome,
+                                    unseen_categories, uses_forest, validate_input)
 
 
-def render_prediction_section(model, preprocessing_info, user_input: Dict[str, Any]) -> None:
-    """Render the prediction section with enhanced animations"""
+def render_prediction_section(model, preprocessing_info, user_input: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Render the prediction section with enhanced animations; returns the prediction made in this rerun, if any"""
 
 
     # Prediction button with enhanced styling
@@ -42,16 +45,17 @@ def render_prediction_section(model, preprocessing_info, user_input: Dict[str, A
         progress_bar.empty()
         status_text.empty()
 
-        # Preprocess input
-        processed_input = preprocess_input(user_input, preprocessing_info)
+        # Preprocess input and make prediction (cached for identical inputs); the session's
+        # scorer only re-walks the trees affected by fields edited since the last analysis
+        scorer = None
+        if uses_forest(preprocessing_info):
+            from src.utils.incremental import get_session_scorer
+            scorer = get_session_scorer(model, preprocessing_info, st.session_state)
+        predicted_outcome, prediction_proba = predict_outcome(model, preprocessing_info, user_input, scorer=scorer)
 
-        # Make prediction
-        prediction = model.predict(processed_input)[0]
-        prediction_proba = model.predict_proba(processed_input)[0]
-
-        # Get prediction label
-        target_reverse_mapping = preprocessing_info['target_reverse_mapping']
-        predicted_outcome = target_reverse_mapping[prediction]
+        # Queue for the audit log (written in the background)
+        log_prediction(st.session_state.get('username'), user_input,
+                       preprocessing_info.get('model_version', 'unversioned'), predicted_outcome, prediction_proba)
 
         # Store in session state for export
         st.session_state['last_prediction'] = {
@@ -85,9 +89,21 @@ def render_prediction_section(model, preprocessing_info, user_input: Dict[str, A
         # Add personalized recommendations
         render_recommendations(predicted_outcome, user_input)
 
+        # Model-backed interventions for students at risk
+        if predicted_outcome == "Dropout":
+            st.session_state['last_prediction']['interventions'] = render_interventions(
+                model, preprocessing_info, user_input)
+
+        # Show which fields drove this prediction
+        st.session_state['last_prediction']['top_factors'] = render_feature_contributions(
+            model, preprocessing_info, user_input, predicted_outcome)
+
         # Display probability charts
         render_probability_charts(prediction_proba)
 
+        return st.session_state['last_prediction']
+    return None
+
 
 def render_recommendations(predicted_outcome: str, user_input: Dict[str, Any]) -> None:
     """Render personalized recommendations section"""
@@ -112,12 +128,185 @@ def render_recommendations(predicted_outcome: str, user_input: Dict[str, Any]) -
             unsafe_allow_html=True)
 
 
+@timed("counterfactual")
+def render_interventions(model, preprocessing_info, user_input: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Render the smallest actionable changes the model says would lower dropout risk"""
+    from src.config.mappings import create_feature_mappings
+    from src.utils.counterfactual import find_interventions
+    from src.utils.whatif import format_value
+
+    st.markdown("### 🧪 Suggested Interventions")
+
+    result = find_interventions(model, preprocessing_info, user_input, outcome="Dropout")
+    if not result['interventions']:
+        st.caption("No combination of actionable changes lowers this student's dropout risk.")
+        return []
+
+    feature_maps = create_feature_mappings()
+    lines = []
+    for intervention in result['interventions']:
+        changes = ' and '.join(
+            f"**{change['field']}** goes {format_value(change['field'], change['from'], feature_maps)} → "
+            f"{format_value(change['field'], change['to'], feature_maps)}"
+            for change in intervention['changes']
+        )
+        lines.append(f"If {changes}, P(Dropout) drops from {result['base_risk']:.0%} to {intervention['risk']:.0%}.")
+
+    if result['reached']:
+        heading = f"Smallest changes that bring dropout risk to {result['target_risk']:.0%} or below:"
+    else:
+        heading = f"{result['target_risk']:.0%} dropout risk is out of reach; the largest reduction found:"
+    box = "success-box" if result['reached'] else "info-box"
+    st.markdown(f'<div class="{box}">🎯 <strong>{heading}</strong></div>', unsafe_allow_html=True)
+    for line in lines:
+        st.markdown(f"- {line}")
+    st.caption("Only fees, scholarship, debt, approved units and grades are changed; "
+               f"{result['n_scored']} variants scored by the model.")
+
+    return result['interventions']
+
+
+@timed("explain")
+def render_feature_contributions(model, preprocessing_info, user_input: Dict[str, Any],
+                                 predicted_outcome: str) -> List[Tuple[str, float]]:
+    """Render the top fields pushing towards or away from the predicted outcome"""
+    import plotly.graph_objects as go
+    from src.utils.explain import explain_prediction, get_explainer, top_contributions
+
+    st.markdown("### 🧭 Key Factors")
+
+    if not uses_forest(preprocessing_info):
+        st.caption("Per-student factors are only available for Random Forest models.")
+        return []
+
+    explainer = get_explainer(model, preprocessing_info)
+    contributions = explain_prediction(model, preprocessing_info, user_input)
+    class_index = list(explainer.classes).index(preprocessing_info['target_mapping'][predicted_outcome])
+    factors = top_contributions(contributions, explainer.columns, class_index, k=EXPLANATION_TOP_K)
+
+    if not factors:
+        st.caption("No single field stands out for this prediction.")
+        return factors
+
+    # Largest at the top of the horizontal bar chart
+    names = [name for name, _ in reversed(factors)]
+    values = [value for _, value in reversed(factors)]
+
+    fig = go.Figure(go.Bar(
+        x=values,
+        y=names,
+        orientation='h',
+        marker_color=['#9ccfd8' if value > 0 else '#eb6f92' for value in values],  # Rose Pine foam / love
+        hovertemplate='%{y}: %{x:+.1%}<extra></extra>'
+    ))
+    fig.update_layout(
+        title=f"Contribution to the {predicted_outcome} probability",
+        xaxis_tickformat='+.0%',
+        height=60 + 35 * len(factors),
+        margin=dict(l=10, r=10, t=40, b=10),
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    )
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"Starting from the average student ({explainer.bias[class_index]:.1%}), "
+               "blue fields raise and red fields lower the forest's vote share (before calibration).")
+
+    return factors
+
+
+@timed("whatif")
+def render_whatif_section(model, preprocessing_info, user_input: Dict[str, Any]) -> None:
+    """Render how the predicted probabilities respond to one or two fields"""
+    import plotly.graph_objects as go
+    from src.config.mappings import create_feature_mappings
+    from src.utils.whatif import NUMERIC_SWEEP_RANGES, format_value, run_sweep, sweep_values, sweepable_fields
+
+    st.markdown("### 🔮 What-if Analysis")
+
+    fields = st.multiselect(
+        "Fields to vary",
+        sweepable_fields(preprocessing_info),
+        max_selections=2,
+        key="whatif_fields",
+        help="Everything else stays as entered in the sidebar. One field draws response curves, two draw a heatmap."
+    )
+    if not fields:
+        st.caption("Pick a field (e.g. Curricular units 1st sem (approved)) to see how the prediction would change.")
+        return
+
+    feature_maps = create_feature_mappings()
+    result = run_sweep(model, preprocessing_info, user_input,
+                       {field: sweep_values(field, preprocessing_info) for field in fields})
+    probabilities = result['probabilities']
+    class_colors = {'Graduate': '#9ccfd8', 'Dropout': '#eb6f92', 'Enrolled': '#f6c177'}  # Rose Pine
+
+    def axis_values(i):
+        # Numeric fields keep a numeric axis; coded fields use their labels
+        field, values = fields[i], result['values'][i]
+        if field in NUMERIC_SWEEP_RANGES:
+            return values
+        return [format_value(field, value, feature_maps) for value in values]
+
+    if len(fields) == 1:
+        fig = go.Figure()
+        for c, name in enumerate(result['class_names']):
+            fig.add_trace(go.Scatter(
+                x=axis_values(0),
+                y=probabilities[:, c],
+                mode='lines+markers',
+                name=name,
+                line_color=class_colors.get(name),
+                hovertemplate=f'{name}: %{{y:.1%}}<extra></extra>'
+            ))
+        if fields[0] in NUMERIC_SWEEP_RANGES:
+            fig.add_vline(x=user_input[fields[0]], line_dash='dot', line_color='#908caa',
+                          annotation_text="current", annotation_font_color='#908caa')
+        fig.update_layout(
+            xaxis_title=fields[0],
+            yaxis_title="Probability",
+            yaxis_tickformat='.0%',
+            hovermode='x unified',
+            height=360,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+    else:
+        outcome = st.selectbox("Outcome", result['class_names'], key="whatif_outcome",
+                               index=result['class_names'].index('Dropout') if 'Dropout' in result['class_names'] else 0)
+        c = result['class_names'].index(outcome)
+        fig = go.Figure(go.Heatmap(
+            z=probabilities[:, :, c].T,
+            x=axis_values(0),
+            y=axis_values(1),
+            zmin=0,
+            zmax=1,
+            colorscale=[[0, '#1f1d2e'], [1, class_colors.get(outcome, '#c4a7e7')]],
+            colorbar=dict(tickformat='.0%'),
+            hovertemplate=f'{fields[0]}: %{{x}}<br>{fields[1]}: %{{y}}<br>{outcome}: %{{z:.1%}}<extra></extra>'
+        ))
+        fig.update_layout(
+            title=f"{outcome} probability",
+            xaxis_title=fields[0],
+            yaxis_title=fields[1],
+            height=420,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f"{probabilities[..., 0].size} variants scored in one batch (calibrated probabilities).")
+
+
+@timed("chart_render")
 def render_probability_charts(prediction_proba: List[float]) -> None:
     """Render prediction probability charts and metrics"""
     st.markdown("### 📊 Prediction Confidence")
 
-    # Create probability dataframe
+    # Heavy plotting/data modules load on first use, not at app start
     import pandas as pd
+    import plotly.express as px
+
+    # Create probability dataframe
     prob_df = pd.DataFrame({
         'Outcome': ['Dropout', 'Enrolled', 'Graduate'],
         'Probability': prediction_proba
@@ -171,27 +360,36 @@ def render_probability_charts(prediction_proba: List[float]) -> None:
         """, unsafe_allow_html=True)
 
 
-def render_model_info_sidebar(user_input: Dict[str, Any]) -> None:
+def render_model_info_sidebar(user_input: Dict[str, Any], preprocessing_info: Dict[str, Any]) -> None:
     """Render model information and validation in sidebar"""
-    from ..config.theme import MODEL_METRICS
+    import plotly.graph_objects as go
+
+    # Held-out metrics computed when the model was trained (empty for older artifacts)
+    evaluation = preprocessing_info.get('evaluation', {})
+    n_features = len(preprocessing_info.get('original_columns', preprocessing_info['feature_names']))
 
     st.markdown('<h2 class="sub-header">📊 Model Insights</h2>', unsafe_allow_html=True)
 
     # Model information
     st.markdown('<div class="info-box">', unsafe_allow_html=True)
+    if evaluation:
+        accuracy_lines = f"""
+    - **Training Accuracy:** {evaluation['train_accuracy']:.2%}
+    - **Test Accuracy:** {evaluation['accuracy']:.2%} ({evaluation['n_samples']} held-out students)"""
+    else:
+        accuracy_lines = """
+    - **Accuracy:** not recorded for this model (retrain to compute)"""
     st.markdown(f"""
     **🤖 Model Details:**
-    - **Algorithm:** Random Forest Classifier
-    - **Features:** 36 student characteristics  
-    - **Training Accuracy:** 100%
-    - **Test Accuracy:** {MODEL_METRICS['accuracy']}%
+    - **Algorithm:** {MODEL_BACKEND_LABELS[model_backend(preprocessing_info)]} Classifier
+    - **Features:** {n_features} student characteristics{accuracy_lines}
     - **Classes:** Graduate, Dropout, Enrolled
     """)
     st.markdown('</div>', unsafe_allow_html=True)
 
     # Input validation feedback
     st.markdown("### 🔍 Input Validation")
-    validation_issues = validate_input(user_input)
+    validation_issues = validate_input(user_input) + unseen_categories(user_input, preprocessing_info)
 
     if validation_issues:
         for issue in validation_issues:
@@ -202,31 +400,183 @@ def render_model_info_sidebar(user_input: Dict[str, Any]) -> None:
     # Model performance visualization
     st.markdown("### Model Performance")
 
-    metrics = ['Accuracy', 'Precision', 'Recall', 'F1-Score']
-    values = [MODEL_METRICS['accuracy'], MODEL_METRICS['precision'],
-              MODEL_METRICS['recall'], MODEL_METRICS['f1_score']]
+    if not evaluation:
+        st.caption("Retrain the model to compute held-out performance metrics.")
+    else:
+        metrics = ['Accuracy', 'Precision', 'Recall', 'F1-Score']
+        values = [evaluation['accuracy'] * 100, evaluation['precision'] * 100,
+                  evaluation['recall'] * 100, evaluation['f1_score'] * 100]
+
+        fig_perf = go.Figure(data=go.Scatterpolar(
+            r=values,
+            theta=metrics,
+            fill='toself',
+            line_color='#c4a7e7'  # Rose Pine iris
+        ))
+
+        fig_perf.update_layout(
+            polar=dict(
+                radialaxis=dict(
+                    visible=True,
+                    range=[0, 100]
+                )),
+            showlegend=False,
+            title="Model Performance Metrics (macro average)",
+            height=300,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
 
-    fig_perf = go.Figure(data=go.Scatterpolar(
-        r=values,
-        theta=metrics,
-        fill='toself',
-        line_color='#c4a7e7'  # Rose Pine iris
-    ))
+        st.plotly_chart(fig_perf, use_container_width=True)
 
-    fig_perf.update_layout(
-        polar=dict(
-            radialaxis=dict(
-                visible=True,
-                range=[0, 100]
-            )),
-        showlegend=False,
-        title="Model Performance Metrics",
-        height=300,
+        render_evaluation_details(evaluation)
+
+    render_feature_importance(preprocessing_info)
+
+    render_drift_status(preprocessing_info)
+
+
+def render_evaluation_details(evaluation: Dict[str, Any]) -> None:
+    """Render per-class metrics, the confusion matrix and calibration curves"""
+    import plotly.graph_objects as go
+
+    class_names = evaluation['class_names']
+    class_colors = {'Graduate': '#9ccfd8', 'Dropout': '#eb6f92', 'Enrolled': '#f6c177'}  # Rose Pine
+
+    with st.expander("📐 Per-class metrics & calibration"):
+        st.dataframe(
+            [{'Class': name, **{k: (round(v, 3) if isinstance(v, float) else v)
+                                for k, v in evaluation['per_class'][name].items()}}
+             for name in class_names],
+            hide_index=True,
+            use_container_width=True
+        )
+
+        fig_confusion = go.Figure(go.Heatmap(
+            z=evaluation['confusion_matrix'],
+            x=class_names,
+            y=class_names,
+            text=evaluation['confusion_matrix'],
+            texttemplate='%{text}',
+            colorscale=[[0, '#1f1d2e'], [1, '#c4a7e7']],
+            showscale=False
+        ))
+        fig_confusion.update_layout(
+            title="Confusion Matrix",
+            xaxis_title="Predicted",
+            yaxis_title="Actual",
+            yaxis_autorange='reversed',
+            height=300,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        st.plotly_chart(fig_confusion, use_container_width=True)
+
+        fig_calibration = go.Figure()
+        fig_calibration.add_trace(go.Scatter(x=[0, 1], y=[0, 1], mode='lines', name='Perfect',
+                                             line=dict(color='#6e6a86', dash='dash')))
+        for name in class_names:
+            curve = evaluation['calibration'][name]
+            fig_calibration.add_trace(go.Scatter(
+                x=curve['mean_predicted'],
+                y=curve['fraction_positive'],
+                mode='lines+markers',
+                name=name,
+                line_color=class_colors.get(name),
+                customdata=curve['count'],
+                hovertemplate='predicted %{x:.0%}, observed %{y:.0%} (%{customdata} students)<extra></extra>'
+            ))
+        fig_calibration.update_layout(
+            title="Calibration (one-vs-rest)",
+            xaxis_title="Mean predicted probability",
+            yaxis_title="Observed frequency",
+            height=320,
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        st.plotly_chart(fig_calibration, use_container_width=True)
+
+
+def render_feature_importance(preprocessing_info: Dict[str, Any], top_k: int = 10) -> None:
+    """Render the global feature importance stored with the model at training time"""
+    import plotly.graph_objects as go
+
+    st.markdown("### 🏆 Feature Importance")
+
+    importance = preprocessing_info.get('feature_importance')
+    if not importance:
+        st.caption("Not available for this model. Retrain it to compute feature importance.")
+        return
+
+    methods = ["Permutation", "Impurity"] if importance.get('impurity') is not None else ["Permutation"]
+    kind = st.radio("Method", methods, horizontal=True, key="importance_method",
+                    help="Permutation: accuracy lost on held-out students when a field is shuffled. "
+                         "Impurity: how much the forest's splits on a field reduce impurity.")
+
+    values = importance['permutation_mean'] if kind == "Permutation" else importance['impurity']
+    order = sorted(range(len(values)), key=lambda i: values[i], reverse=True)[:top_k][::-1]
+
+    error_x = None
+    if kind == "Permutation":
+        error_x = dict(type='data', array=[importance['permutation_std'][i] for i in order], color='#908caa')
+
+    fig = go.Figure(go.Bar(
+        x=[values[i] for i in order],
+        y=[importance['columns'][i] for i in order],
+        orientation='h',
+        error_x=error_x,
+        marker_color='#c4a7e7'  # Rose Pine iris
+    ))
+    fig.update_layout(
+        xaxis_title="Accuracy drop" if kind == "Permutation" else "Mean decrease in impurity",
+        height=60 + 30 * len(order),
+        margin=dict(l=10, r=10, t=10, b=10),
         plot_bgcolor='rgba(0,0,0,0)',
         paper_bgcolor='rgba(0,0,0,0)'
     )
+    st.plotly_chart(fig, use_container_width=True)
+
+    if kind == "Permutation":
+        st.caption(f"Mean of {importance['n_repeats']} shuffles over the held-out set "
+                   f"(baseline accuracy {importance['baseline_accuracy']:.1%}).")
+
+
+def render_drift_status(preprocessing_info: Dict[str, Any], top_k: int = 5) -> None:
+    """Render how far served students' inputs have drifted from the training data"""
+    st.markdown("### 🌊 Input Drift")
+
+    monitor = get_drift_monitor(preprocessing_info)
+    if monitor is None:
+        st.caption("No training reference stored with this model. Retrain it to enable drift monitoring.")
+        return
+
+    report = monitor.report()
+    if report['status'] == 'collecting':
+        st.caption(f"Collecting: {report['observed']}/{DRIFT_MIN_OBSERVATIONS} students predicted "
+                   f"since the app started.")
+    else:
+        summary = f"{report['observed']} students predicted since the app started"
+        if report['status'] == 'drift':
+            st.error(f"🚨 Significant drift from the training data ({summary})")
+        elif report['status'] == 'warning':
+            st.warning(f"⚠️ Moderate drift from the training data ({summary})")
+        else:
+            st.success(f"✅ Inputs match the training data ({summary})")
+
+        st.dataframe(
+            [{'Field': row['field'], 'PSI': round(row['psi'], 3),
+              'KS': '' if row['ks'] is None else f"{row['ks']:.3f}{' *' if row['ks_drift'] else ''}",
+              'Status': row['status'].capitalize()}
+             for row in report['fields'][:top_k]],
+            hide_index=True,
+            use_container_width=True
+        )
+        st.caption("PSI below 0.1 is stable, above 0.25 is significant. "
+                   "* marks a KS statistic above its 5% critical value.")
 
-    st.plotly_chart(fig_perf, use_container_width=True)
+    for field, codes in report['unseen_codes'].items():
+        st.warning(f"⚠️ {field}: codes never seen in training: "
+                   + ", ".join(f"{code:g} ({count}x)" for code, count in sorted(codes.items())))
 
 
 def render_export_section(user_input: Dict[str, Any]) -> None:
@@ -238,6 +588,8 @@ def render_export_section(user_input: Dict[str, Any]) -> None:
             'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
             'prediction': st.session_state['last_prediction']['outcome'],
             'confidence': f"{max(st.session_state['last_prediction']['probabilities']):.1%}",
+            'key_factors': {name: round(value, 4) for name, value in st.session_state['last_prediction'].get('top_factors', [])},
+            'interventions': st.session_state['last_prediction'].get('interventions', []),
             'student_data': user_input
         }
 
@@ -252,8 +604,9 @@ def render_export_section(user_input: Dict[str, Any]) -> None:
         )
 
 
-def render_footer() -> None:
+def render_footer(preprocessing_info: Dict[str, Any]) -> None:
     """Render enhanced footer with project information"""
+    accuracy = preprocessing_info.get('evaluation', {}).get('accuracy')
     st.markdown('<div class="section-divider"></div>', unsafe_allow_html=True)
     col1, col2, col3 = st.columns(3)
 
@@ -263,7 +616,9 @@ def render_footer() -> None:
 
     with col2:
         st.markdown("**🔬 Model Info**")
-        st.caption("Random Forest with 93.84% accuracy")
+        algorithm = MODEL_BACKEND_LABELS[model_backend(preprocessing_info)]
+        st.caption(f"{algorithm} with {accuracy:.2%} test accuracy" if accuracy is not None
+                   else f"{algorithm} classifier")
 
     with col3:
         st.markdown("**🛠️ Built With**")
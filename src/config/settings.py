@@ -0,0 +1,43 @@
+"""
+Runtime settings for the Student Success Predictor
+Tunables for caching and other process-wide services
+"""
+
+import os
+
+# Prediction result cache (shared by all sessions in the process)
+PREDICTION_CACHE_SIZE = 1024
+
+# Prediction audit log (append-only JSONL segments written by a background thread)
+AUDIT_LOG_DIR = "logs/audit"
+AUDIT_LOG_BATCH_SIZE = 64
+AUDIT_LOG_FLUSH_SECONDS = 1.0
+AUDIT_LOG_SEGMENT_BYTES = 16 * 1024 * 1024
+
+# Per-stage latency metrics (set SRP_METRICS=0 to disable the timing hooks)
+METRICS_ENABLED = os.environ.get("SRP_METRICS", "1") != "0"
+METRICS_EXPORT_PATH = "logs/metrics.prom"
+
+# Versioned model registry (models/registry/<version>/ plus a CURRENT pointer file)
+MODEL_REGISTRY_DIR = "models/registry"
+MODEL_REGISTRY_POLL_SECONDS = 5.0
+
+# Per-prediction feature attributions (number of fields shown in the chart)
+EXPLANATION_TOP_K = 8
+
+# Counterfactual interventions (search stops once P(Dropout) is at or below the target)
+COUNTERFACTUAL_TARGET_RISK = 0.4
+COUNTERFACTUAL_MAX_STEPS = 20
+COUNTERFACTUAL_BEAM_WIDTH = 32
+
+# Shadow scoring of a candidate registry version, off the request path
+# (SRP_SHADOW_MODEL=<version> starts it; admins can switch it in the app)
+SHADOW_MODEL_VERSION = os.environ.get("SRP_SHADOW_MODEL") or None
+SHADOW_QUEUE_SIZE = 256
+SHADOW_BATCH_SIZE = 32
+SHADOW_RECENT_DISAGREEMENTS = 20
+
+# Input drift of served students vs the training data (PSI per form field)
+DRIFT_MIN_OBSERVATIONS = 50
+DRIFT_PSI_WARNING = 0.1
+DRIFT_PSI_ALERT = 0.25
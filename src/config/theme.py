@@ -289,10 +289,3 @@ MODEL_FILES = {
     "preprocessing": "preprocessing_info.pkl",
     "features": "feature_names.pkl",
 }
-
-MODEL_METRICS = {
-    "accuracy": 93.84,
-    "precision": 92.6,
-    "recall": 94.02,
-    "f1_score": 93.15,
-}
@@ -0,0 +1,172 @@
+"""
+Append-only audit log of predictions
+Records are queued by the request thread and written in batches by a background thread
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..config.settings import (
+    AUDIT_LOG_DIR,
+    AUDIT_LOG_BATCH_SIZE,
+    AUDIT_LOG_FLUSH_SECONDS,
+    AUDIT_LOG_SEGMENT_BYTES
+)
+from .metrics import metrics
+
+SEGMENT_PREFIX = "predictions-"
+SEGMENT_SUFFIX = ".jsonl"
+
+# Marker returned when the writer wakes up without a new entry
+_TIMEOUT = object()
+
+
+def _json_default(value: Any) -> Any:
+    """Convert numpy arrays/scalars to plain Python for JSON"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class AuditLog:
+    """Batched, append-only JSONL writer with size-based segment rotation"""
+
+    def __init__(self, directory: str = AUDIT_LOG_DIR, batch_size: int = AUDIT_LOG_BATCH_SIZE,
+                 flush_interval: float = AUDIT_LOG_FLUSH_SECONDS, segment_bytes: int = AUDIT_LOG_SEGMENT_BYTES):
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.segment_bytes = segment_bytes
+        self.written = 0
+        self.write_errors = 0
+        self._queue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._segment = None
+        self._segment_size = 0
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """Queue an entry for writing; never blocks on disk I/O"""
+        if self._thread is None:
+            self._start()
+        self._queue.put(entry)
+
+    def close(self) -> None:
+        """Flush everything queued so far and stop the writer thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
+
+    def _start(self) -> None:
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self) -> None:
+        """Collect entries and flush when the batch is full or the interval elapses"""
+        batch: List[Dict[str, Any]] = []
+        deadline = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                entry = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                entry = _TIMEOUT
+
+            if entry is None:
+                self._flush(batch)
+                self._close_segment()
+                return
+
+            if entry is not _TIMEOUT:
+                batch.append(entry)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if len(batch) >= self.batch_size or (deadline is not None and time.monotonic() >= deadline):
+                self._flush(batch)
+                batch = []
+                deadline = None
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        """Append a batch as complete lines and fsync so it survives a crash"""
+        if not batch:
+            return
+
+        data = ''.join(json.dumps(entry, default=_json_default, ensure_ascii=False) + '\n' for entry in batch)
+        data = data.encode('utf-8')
+
+        try:
+            if self._segment is None or self._segment_size + len(data) > self.segment_bytes:
+                self._rotate()
+            self._segment.write(data)
+            self._segment.flush()
+            os.fsync(self._segment.fileno())
+            self._segment_size += len(data)
+            self.written += len(batch)
+        except OSError:
+            # Keep the app serving; the counter surfaces the problem to admins
+            self.write_errors += len(batch)
+            self._close_segment()
+
+    def _rotate(self) -> None:
+        """Close the current segment and open a fresh one"""
+        self._close_segment()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{SEGMENT_PREFIX}{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{time.monotonic_ns():016x}{SEGMENT_SUFFIX}"
+        self._segment = open(self.directory / name, 'ab')
+        self._segment_size = self._segment.tell()
+
+    def _close_segment(self) -> None:
+        if self._segment is not None:
+            try:
+                self._segment.close()
+            except OSError:
+                pass
+            self._segment = None
+            self._segment_size = 0
+
+
+def read_audit_log(directory: str = AUDIT_LOG_DIR) -> Iterator[Dict[str, Any]]:
+    """Yield logged entries in write order, skipping a torn final line after a crash"""
+    for segment in sorted(Path(directory).glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")):
+        with open(segment, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+
+# Shared by all sessions served by this process
+audit_log = AuditLog()
+
+metrics.register_gauge("audit_log_written_total", "Predictions written to the audit log",
+                       lambda: audit_log.written, "counter")
+metrics.register_gauge("audit_log_write_errors_total", "Audit log entries that failed to write",
+                       lambda: audit_log.write_errors, "counter")
+
+
+def log_prediction(username: Optional[str], user_input: Dict[str, Any], model_version: str,
+                   outcome: str, probabilities: Any) -> None:
+    """Record a prediction in the audit log"""
+    audit_log.record({
+        'timestamp': time.time(),
+        'user': username,
+        'model_version': model_version,
+        'inputs': dict(user_input),
+        'outcome': outcome,
+        'probabilities': probabilities,
+    })
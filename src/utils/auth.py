@@ -10,6 +10,8 @@ import os
 from typing import Dict, Optional, Tuple
 from pathlib import Path
 
+from .metrics import timed
+
 # Path to store user credentials (in production, use a proper database)
 USERS_FILE = Path("users.json")
 
@@ -48,6 +50,7 @@ def save_users(users: Dict) -> None:
         json.dump(users, f, indent=2)
 
 
+@timed("auth")
 def verify_credentials(username: str, password: str) -> Tuple[bool, Optional[Dict]]:
     """Verify user credentials"""
     users = load_users()
@@ -0,0 +1,40 @@
+"""
+Probability calibration for the Random Forest
+Random Forest vote fractions are poorly calibrated. At training time an isotonic
+regression is fitted per class (one-vs-rest) on out-of-fold predictions. Only its
+breakpoints are stored in preprocessing_info['calibrator'], and inference applies
+them with np.interp, then renormalizes each row as CalibratedClassifierCV does.
+"""
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+
+def fit_isotonic_calibrator(oof_probabilities, y, classes: Sequence[Any]) -> Dict[str, Any]:
+    """Fit one isotonic curve per class and return its breakpoints"""
+    from sklearn.isotonic import IsotonicRegression
+
+    oof_probabilities = np.asarray(oof_probabilities, dtype=np.float64)
+    y = np.asarray(y)
+    x_points, y_points = [], []
+    for c, label in enumerate(classes):
+        isotonic = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+        isotonic.fit(oof_probabilities[:, c], (y == label).astype(np.float64))
+        x_points.append(np.asarray(isotonic.X_thresholds_, dtype=np.float64))
+        y_points.append(np.asarray(isotonic.y_thresholds_, dtype=np.float64))
+
+    return {'method': 'isotonic', 'x': x_points, 'y': y_points}
+
+
+def apply_calibration(probabilities, calibrator: Dict[str, Any]) -> np.ndarray:
+    """Map raw class probabilities (n_rows, n_classes) to calibrated ones"""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    calibrated = np.empty_like(probabilities)
+    for c, (x_points, y_points) in enumerate(zip(calibrator['x'], calibrator['y'])):
+        # Same piecewise-linear, end-clipped curve IsotonicRegression.predict evaluates
+        calibrated[:, c] = np.interp(probabilities[:, c], x_points, y_points)
+
+    totals = calibrated.sum(axis=1, keepdims=True)
+    n_classes = probabilities.shape[1]
+    return np.divide(calibrated, totals, out=np.full_like(calibrated, 1.0 / n_classes), where=totals > 0)
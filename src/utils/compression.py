@@ -0,0 +1,244 @@
+"""
+Post-training compression of the Random Forest
+Three steps, each optional:
+- depth capping: every node at max_depth becomes a leaf with that node's class distribution
+- tree subset selection: trees are added greedily (each time the one that most lowers the
+  out-of-bag Brier score on the training rows), and the shortest prefix whose out-of-bag
+  accuracy is within a tolerance of the full forest is kept
+- compact storage: the pickled trees keep thresholds as float32 (rounded down, so a
+  float32 input takes the same branch as before) and class distributions as uint16
+
+CompressedRandomForest is a RandomForestClassifier, so the app, explanations and the
+incremental scorer use it unchanged. Only its pickled form is compact; the trees are
+rebuilt as ordinary sklearn trees on load.
+
+Out-of-bag rows are recovered from the forest's bootstrap seeds, so compression needs
+the exact rows the forest was fitted on. Training records their fingerprint. A forest
+grown with --add-trees is refused: its older trees were drawn from a different
+training set, so it needs a full retrain before it can be compressed.
+"""
+
+import copy
+import hashlib
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.tree._tree import NODE_DTYPE, Tree
+
+from .calibration import apply_calibration
+
+# Class distributions are stored as fractions of this
+VALUE_SCALE = np.iinfo(np.uint16).max
+
+
+def _index_dtype(max_value: int, signed: bool = True):
+    return np.int16 if max_value <= np.iinfo(np.int16).max else np.int32 if signed else np.uint32
+
+
+def _kept_nodes(tree: Tree, max_depth: Optional[int]) -> np.ndarray:
+    """Ids of the nodes at depth <= max_depth, in their original (depth-first) order"""
+    if max_depth is None or tree.max_depth <= max_depth:
+        return np.arange(tree.node_count)
+    depth = np.zeros(tree.node_count, dtype=np.intp)
+    for node in range(tree.node_count):  # parents always precede their children
+        if tree.children_left[node] >= 0:
+            depth[tree.children_left[node]] = depth[tree.children_right[node]] = depth[node] + 1
+    return np.flatnonzero(depth <= max_depth)
+
+
+def pack_tree(tree: Tree, max_depth: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Compact arrays for one fitted tree, optionally cut at max_depth"""
+    nodes = tree.__getstate__()['nodes']
+    kept = _kept_nodes(tree, max_depth)
+    new_id = np.full(tree.node_count, -1, dtype=np.intp)
+    new_id[kept] = np.arange(len(kept))
+
+    left, right = nodes['left_child'][kept], nodes['right_child'][kept]
+    is_split = left >= 0
+    is_split[is_split] = new_id[left[is_split]] >= 0  # children cut away: now a leaf
+    index_dtype = _index_dtype(len(kept))
+    children = np.where(is_split, new_id[np.maximum(left, 0)], -1).astype(index_dtype)
+    right_children = np.where(is_split, new_id[np.maximum(right, 0)], -1).astype(index_dtype)
+
+    # Largest float32 at or below each threshold: x <= t32 exactly when x <= t for float32 x
+    thresholds = nodes['threshold'][kept]
+    thresholds32 = thresholds.astype(np.float32)
+    rounded_up = thresholds32 > thresholds
+    thresholds32[rounded_up] = np.nextafter(thresholds32[rounded_up], np.float32(-np.inf))
+
+    values = tree.value[kept, 0, :]
+    values = values / values.sum(axis=1, keepdims=True)
+    weights = nodes['weighted_n_node_samples'][kept]
+
+    return {
+        'left': children,
+        'right': right_children,
+        'feature': np.where(is_split, nodes['feature'][kept], -2).astype(_index_dtype(tree.n_features)),
+        'threshold': np.where(is_split, thresholds32, np.float32(-2)),
+        'values': np.rint(values * VALUE_SCALE).astype(np.uint16),
+        # Bootstrap counts are whole numbers
+        'weights': np.rint(weights).astype(_index_dtype(int(weights.max()), signed=False)),
+        'missing_go_to_left': nodes['missing_go_to_left'][kept],
+    }
+
+
+def unpack_tree(packed: Dict[str, np.ndarray], n_features: int, n_classes: int) -> Tree:
+    """Rebuild an sklearn Tree from pack_tree's arrays"""
+    node_count = len(packed['left'])
+    values = packed['values'].astype(np.float64)
+    values /= values.sum(axis=1, keepdims=True)
+
+    nodes = np.zeros(node_count, dtype=NODE_DTYPE)
+    nodes['left_child'] = packed['left']
+    nodes['right_child'] = packed['right']
+    nodes['feature'] = packed['feature']
+    nodes['threshold'] = packed['threshold']
+    # Gini impurity, recomputed from the stored distribution
+    nodes['impurity'] = 1.0 - np.square(values).sum(axis=1)
+    # Only weighted counts are stored (they feed feature_importances_)
+    nodes['n_node_samples'] = packed['weights']
+    nodes['weighted_n_node_samples'] = packed['weights']
+    nodes['missing_go_to_left'] = packed['missing_go_to_left']
+
+    depth = np.zeros(node_count, dtype=np.intp)
+    for node in range(node_count):
+        if nodes['left_child'][node] >= 0:
+            depth[nodes['left_child'][node]] = depth[nodes['right_child'][node]] = depth[node] + 1
+
+    tree = Tree(n_features, np.array([n_classes], dtype=np.intp), 1)
+    tree.__setstate__({'max_depth': int(depth.max()), 'node_count': node_count, 'nodes': nodes,
+                       'values': values[:, None, :]})
+    return tree
+
+
+class CompressedRandomForest(RandomForestClassifier):
+    """A subset of a fitted forest's trees, optionally depth-capped, pickled in compact form"""
+
+    @classmethod
+    def from_forest(cls, model: RandomForestClassifier, trees: Sequence[int],
+                    max_depth: Optional[int] = None) -> 'CompressedRandomForest':
+        params = model.get_params()
+        params.update(n_estimators=len(trees), warm_start=False)
+        compressed = cls(**params)
+        # Fitted attributes (classes_, feature_names_in_, estimator_, ...)
+        compressed.__dict__.update({key: value for key, value in model.__dict__.items()
+                                    if key.endswith('_') and key != 'estimators_'})
+        compressed._packed_trees = [pack_tree(model.estimators_[t].tree_, max_depth) for t in trees]
+        compressed._estimator_state = [{key: value for key, value in model.estimators_[t].__dict__.items()
+                                        if key != 'tree_'} for t in trees]
+        if max_depth is not None:
+            for state in compressed._estimator_state:
+                state['max_depth'] = max_depth
+        # Serve exactly what a reload would: the quantized trees
+        compressed._rebuild_estimators()
+        return compressed
+
+    def _rebuild_estimators(self) -> None:
+        n_classes = len(self.classes_)
+        self.estimators_ = []
+        for packed, state in zip(self._packed_trees, self._estimator_state):
+            estimator = copy.copy(self.estimator_)
+            estimator.__dict__.update(state)
+            estimator.tree_ = unpack_tree(packed, self.n_features_in_, n_classes)
+            self.estimators_.append(estimator)
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        return {key: value for key, value in state.items() if key != 'estimators_'}
+
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        self._rebuild_estimators()
+
+    @property
+    def node_count(self) -> int:
+        return sum(len(packed['left']) for packed in self._packed_trees)
+
+
+def select_trees(tree_probabilities: np.ndarray, out_of_bag: np.ndarray, y_index: np.ndarray, tolerance: float,
+                 calibrator: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Greedy out-of-bag tree order, and the shortest prefix within tolerance of the full forest
+
+    tree_probabilities has shape (n_trees, n_rows, n_classes) and out_of_bag (n_trees,
+    n_rows) marks the rows each tree never saw. A subset predicts a row from its trees
+    that have the row out of bag (uniform until there is one). Accuracy is measured over
+    covered rows, after calibration when a calibrator is given, as the app serves it.
+    """
+    n_trees, n_rows, n_classes = tree_probabilities.shape
+    target = np.eye(n_classes)[y_index]
+    tree_probabilities = tree_probabilities * out_of_bag[:, :, None]
+
+    def accuracy(total: np.ndarray, votes: np.ndarray) -> float:
+        covered = votes > 0
+        probabilities = total[covered] / votes[covered, None]
+        if calibrator is not None:
+            probabilities = apply_calibration(probabilities, calibrator)
+        return float(np.mean(probabilities.argmax(axis=1) == y_index[covered]))
+
+    full_accuracy = accuracy(tree_probabilities.sum(axis=0), out_of_bag.sum(axis=0))
+    remaining = list(range(n_trees))
+    order, accuracies = [], []
+    total, votes = np.zeros((n_rows, n_classes)), np.zeros(n_rows)
+    for _ in range(n_trees):
+        # Out-of-bag Brier score of every candidate subset one tree larger
+        candidate_votes = votes + out_of_bag[remaining]
+        candidates = (total + tree_probabilities[remaining]) / np.maximum(candidate_votes, 1)[:, :, None]
+        candidates[candidate_votes == 0] = 1 / n_classes
+        brier = np.square(candidates - target).sum(axis=2).mean(axis=1)
+        best = remaining.pop(int(brier.argmin()))
+        order.append(best)
+        total += tree_probabilities[best]
+        votes += out_of_bag[best]
+        accuracies.append(accuracy(total, votes))
+
+    n_selected = next(k for k, value in enumerate(accuracies, start=1) if value >= full_accuracy - tolerance)
+    return {
+        'order': order,
+        'accuracies': accuracies,
+        'full_accuracy': full_accuracy,
+        'n_selected': n_selected,
+    }
+
+
+def training_fingerprint(X_train, y_train) -> str:
+    """SHA-256 of the training rows as the forest saw them (float32 features, then labels)"""
+    digest = hashlib.sha256(np.ascontiguousarray(X_train, dtype=np.float32).tobytes())
+    digest.update(np.ascontiguousarray(y_train, dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def compress_forest(model: RandomForestClassifier, X_train, y_train, tolerance: float = 0.005,
+                    max_depth: Optional[int] = None, calibrator: Optional[Dict[str, Any]] = None,
+                    training_data: Optional[Dict[str, Any]] = None):
+    """Depth-cap and quantize every tree, then keep the smallest greedy subset within tolerance
+
+    X_train and y_train must be the rows the forest was fitted on, in the same order, so
+    each tree's bootstrap sample identifies its out-of-bag rows. With the artifact's
+    training_data record they are checked against its fingerprint. Raises ValueError
+    if the rows cannot be the forest's. Returns the compressed forest and
+    select_trees' details.
+    """
+    n_samples = getattr(model, '_n_samples', len(X_train))
+    if n_samples != len(X_train):
+        raise ValueError(f"the forest was fitted on {n_samples} rows, not the {len(X_train)} given, "
+                         "so its out-of-bag rows cannot be recovered")
+    if training_data is not None:
+        if training_data.get('warm_started'):
+            raise ValueError("the forest was grown with --add-trees and its older trees were bootstrapped "
+                             "from other rows; run a full retrain before compressing")
+        if training_data['sha256'] != training_fingerprint(X_train, y_train):
+            raise ValueError("the training rows differ from the ones the forest was fitted on "
+                             "(data.csv or the encoded cache changed since training)")
+
+    capped = CompressedRandomForest.from_forest(model, range(len(model.estimators_)), max_depth)
+    X = np.ascontiguousarray(X_train, dtype=np.float32)
+    tree_probabilities = np.stack([estimator.predict_proba(X, check_input=False) for estimator in capped.estimators_])
+    out_of_bag = np.ones((len(model.estimators_), len(X)), dtype=bool)
+    for t, in_bag in enumerate(model.estimators_samples_):
+        out_of_bag[t, in_bag] = False
+    y_index = np.searchsorted(model.classes_, np.asarray(y_train))
+
+    selection = select_trees(tree_probabilities, out_of_bag, y_index, tolerance, calibrator)
+    compressed = CompressedRandomForest.from_forest(model, selection['order'][:selection['n_selected']], max_depth)
+    return compressed, selection
@@ -0,0 +1,140 @@
+"""
+Counterfactual interventions for a single student
+Beam search over the fields a student or the institution can actually change (fees,
+scholarship, debt, approved units and grades). Gender, nationality, age and the
+like are never touched. Each level extends the surviving candidates by one step,
+drops infeasible and already-seen variants, and scores the rest in one batch. The
+search stops at the first level where some candidate gets P(outcome) down to the
+target, so the changes found are the smallest ones (in steps).
+"""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from ..config.settings import COUNTERFACTUAL_BEAM_WIDTH, COUNTERFACTUAL_MAX_STEPS, COUNTERFACTUAL_TARGET_RISK
+from .whatif import NUMERIC_SWEEP_RANGES, build_variant_batch, score_batch
+
+# field -> ('set', value) flips once to a helpful value; ('add', step) moves by step per step
+ACTIONABLE_FIELDS = {
+    'Tuition fees up to date': ('set', 1),
+    'Scholarship holder': ('set', 1),
+    'Debtor': ('set', 0),
+    'Curricular units 1st sem (approved)': ('add', 1),
+    'Curricular units 2nd sem (approved)': ('add', 1),
+    'Curricular units 1st sem (grade)': ('add', 1),
+    'Curricular units 2nd sem (grade)': ('add', 1),
+}
+
+# Grade given to a semester whose first unit gets approved (the 0-20 scale's pass mark)
+PASSING_GRADE = 10
+
+
+def _unit_column(semester: str, name: str) -> str:
+    """Form field name of one semester's curricular-unit count or grade"""
+    return f'Curricular units {semester} sem ({name})'
+
+
+def _step_limits(user_input: Dict[str, Any]) -> np.ndarray:
+    """Largest number of steps each action can take for this student"""
+    limits = []
+    for field, (kind, amount) in ACTIONABLE_FIELDS.items():
+        if kind == 'set':
+            limits.append(int(user_input[field] != amount))
+        else:
+            limits.append(int((NUMERIC_SWEEP_RANGES[field][1] - user_input[field]) // amount))
+    return np.array(limits)
+
+
+def _apply_steps(user_input: Dict[str, Any], steps: np.ndarray) -> Dict[str, np.ndarray]:
+    """Field values for each row of step counts, kept consistent like the real data"""
+    values = {}
+    for j, (field, (kind, amount)) in enumerate(ACTIONABLE_FIELDS.items()):
+        base = float(user_input[field])
+        values[field] = np.where(steps[:, j] > 0, float(amount), base) if kind == 'set' else base + amount * steps[:, j]
+
+    for semester in ('1st', '2nd'):
+        column = {name: _unit_column(semester, name) for name in ('enrolled', 'evaluations', 'approved', 'grade')}
+
+        # Approving a unit means enrolling in and being evaluated on it
+        approved = values[column['approved']]
+        values[column['enrolled']] = np.maximum(float(user_input[column['enrolled']]), approved)
+        values[column['evaluations']] = np.maximum(float(user_input[column['evaluations']]), approved)
+
+        # Grades only exist once something is approved; a first approval starts at the pass mark
+        floor = PASSING_GRADE if user_input[column['approved']] == 0 else 0
+        values[column['grade']] = np.where(approved > 0,
+                                           np.minimum(np.maximum(values[column['grade']], floor), 20),
+                                           float(user_input[column['grade']]))
+    return values
+
+
+def _describe(user_input: Dict[str, Any], values: Dict[str, np.ndarray], row: int) -> List[Dict[str, Any]]:
+    return [{'field': field, 'from': user_input[field], 'to': float(column[row])}
+            for field, column in values.items() if column[row] != user_input[field]]
+
+
+def find_interventions(model, preprocessing_info: Dict[str, Any], user_input: Dict[str, Any],
+                       outcome: str = 'Dropout', target_risk: float = COUNTERFACTUAL_TARGET_RISK,
+                       max_steps: int = COUNTERFACTUAL_MAX_STEPS, beam_width: int = COUNTERFACTUAL_BEAM_WIDTH,
+                       n_results: int = 3) -> Dict[str, Any]:
+    """Smallest actionable changes that bring P(outcome) to target_risk or below"""
+    class_index = list(model.classes_).index(preprocessing_info['target_mapping'][outcome])
+    limits = _step_limits(user_input)
+    n_actions = len(ACTIONABLE_FIELDS)
+
+    def score(steps):
+        values = _apply_steps(user_input, steps)
+        batch = build_variant_batch(preprocessing_info, user_input, values)
+        return values, score_batch(model, preprocessing_info, batch)[:, class_index]
+
+    start = np.zeros((1, n_actions), dtype=np.int64)
+    base_values, base_risk = score(start)
+    result = {'outcome': outcome, 'base_risk': float(base_risk[0]), 'target_risk': target_risk,
+              'reached': bool(base_risk[0] <= target_risk), 'interventions': [], 'n_scored': 1}
+    if result['reached']:
+        return result
+
+    def signature(values):
+        return np.column_stack(list(values.values()))
+
+    visited = {signature(base_values)[0].tobytes()}
+    beam = start
+    best = (float(base_risk[0]), None, None)  # lowest risk seen: (risk, values, row)
+    for _ in range(max_steps):
+        # Every beam entry plus one step of every action, within each action's limit
+        children = (beam[:, None, :] + np.eye(n_actions, dtype=np.int64)[None]).reshape(-1, n_actions)
+        children = children[(children <= limits).all(axis=1)]
+        if len(children) == 0:
+            break
+
+        # Different step counts can give the same student (e.g. grade steps with nothing approved)
+        rows = signature(_apply_steps(user_input, children))
+        _, first = np.unique(rows, axis=0, return_index=True)
+        keep = [i for i in np.sort(first) if rows[i].tobytes() not in visited]
+        if not keep:
+            break
+        children = children[keep]
+        visited.update(rows[i].tobytes() for i in keep)
+
+        values, risk = score(children)
+        result['n_scored'] += len(children)
+
+        order = np.argsort(risk, kind='stable')
+        if risk[order[0]] < best[0]:
+            best = (float(risk[order[0]]), values, order[0])
+
+        hits = order[risk[order] <= target_risk]
+        if len(hits):
+            result['reached'] = True
+            result['interventions'] = [
+                {'changes': _describe(user_input, values, i), 'risk': float(risk[i])} for i in hits[:n_results]
+            ]
+            return result
+
+        beam = children[order[:beam_width]]
+
+    # Target out of reach: report the change that lowered the risk the most
+    if best[1] is not None:
+        result['interventions'] = [{'changes': _describe(user_input, best[1], best[2]), 'risk': best[0]}]
+    return result
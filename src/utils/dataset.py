@@ -0,0 +1,127 @@
+"""
+Columnar cache for the training dataset
+data/data.csv is parsed once into an uncompressed Feather (Arrow IPC) file with
+cleaned column names and compact dtypes:
+- categorical codes as pandas categoricals (int8 codes)
+- other integer counts as the smallest integer type that fits
+- grades as float32
+Later loads memory-map that file and read only the requested columns. The cache is
+rebuilt when the CSV's size or modification time changes.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DATA_PATH = PROJECT_ROOT / "data" / "data.csv"
+CACHE_DIR = PROJECT_ROOT / "data" / "cache"
+
+# Stored as categoricals (small int codes plus a dictionary of the real values)
+CATEGORICAL_COLUMNS = (
+    'Marital status', 'Application mode', 'Application order', 'Course',
+    'Daytime/evening attendance', 'Previous qualification', 'Nationality',
+    'Mothers qualification', 'Fathers qualification', 'Mothers occupation',
+    'Fathers occupation', 'Displaced', 'Educational special needs', 'Debtor',
+    'Tuition fees up to date', 'Gender', 'Scholarship holder', 'International',
+    'Target'
+)
+
+# Continuous scores stored as float32. Economic rates stay float64: training one-hot
+# encodes them, and float32 values would change the column names (7.6 -> 7.599999...)
+GRADE_COLUMNS = (
+    'Previous qualification (grade)', 'Admission grade',
+    'Curricular units 1st sem (grade)', 'Curricular units 2nd sem (grade)'
+)
+
+# Same fixes load_and_preprocess_data has always applied
+COLUMN_RENAMES = {'Nacionality': 'Nationality'}
+
+_FINGERPRINT_KEY = b'source_fingerprint'
+
+
+def clean_column_names(columns: Sequence[str]) -> Dict[str, str]:
+    """Mapping for one DataFrame.rename call: fix the typo and drop apostrophes"""
+    renames = {}
+    for column in columns:
+        cleaned = COLUMN_RENAMES.get(column, column).replace("'", "")
+        if cleaned != column:
+            renames[column] = cleaned
+    return renames
+
+
+def compact_dtypes(data):
+    """Downcast a cleaned dataset in place to the cache's compact dtypes"""
+    import pandas as pd
+
+    # Names are matched without stray whitespace (the attendance column ends in a tab)
+    categorical = set(CATEGORICAL_COLUMNS)
+    for column in data.columns:
+        values = data[column]
+        if column.strip() in categorical:
+            data[column] = values.astype('category')
+        elif pd.api.types.is_integer_dtype(values):
+            data[column] = pd.to_numeric(values, downcast='integer')
+        elif column in GRADE_COLUMNS:
+            data[column] = values.astype('float32')
+    return data
+
+
+def read_csv_cleaned(csv_path=DATA_PATH):
+    """Parse the CSV and clean its column names (the slow path the cache replaces)"""
+    import pandas as pd
+
+    data = pd.read_csv(csv_path)
+    return data.rename(columns=clean_column_names(data.columns))
+
+
+def _fingerprint(csv_path: Path) -> bytes:
+    stat = csv_path.stat()
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}".encode()
+
+
+def cache_path_for(csv_path=DATA_PATH) -> Path:
+    return CACHE_DIR / (Path(csv_path).stem + ".feather")
+
+
+def build_cache(csv_path=DATA_PATH, cache_path: Optional[Path] = None) -> Path:
+    """Convert the CSV into the typed columnar cache and return the cache path"""
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    csv_path = Path(csv_path)
+    cache_path = Path(cache_path) if cache_path else cache_path_for(csv_path)
+    fingerprint = _fingerprint(csv_path)
+
+    table = pa.Table.from_pandas(compact_dtypes(read_csv_cleaned(csv_path)), preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _FINGERPRINT_KEY: fingerprint})
+
+    # Write next to the target and rename, so readers never see a partial file.
+    # Uncompressed, so later reads can memory-map the column buffers directly.
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    staging = cache_path.with_suffix('.tmp')
+    feather.write_feather(table, staging, compression='uncompressed')
+    staging.replace(cache_path)
+    return cache_path
+
+
+def _cache_is_fresh(csv_path: Path, cache_path: Path) -> bool:
+    import pyarrow as pa
+
+    if not cache_path.exists():
+        return False
+    with pa.memory_map(str(cache_path)) as source:
+        metadata = pa.ipc.open_file(source).schema.metadata or {}
+    return metadata.get(_FINGERPRINT_KEY) == _fingerprint(csv_path)
+
+
+def load_dataset(columns: Optional[List[str]] = None, csv_path=DATA_PATH, cache_path: Optional[Path] = None):
+    """Load the cleaned, typed dataset (optionally only some columns) from the cache"""
+    import pyarrow.feather as feather
+
+    csv_path = Path(csv_path)
+    cache_path = Path(cache_path) if cache_path else cache_path_for(csv_path)
+    if not _cache_is_fresh(csv_path, cache_path):
+        build_cache(csv_path, cache_path)
+
+    table = feather.read_table(cache_path, columns=columns, memory_map=True)
+    return table.to_pandas()
@@ -0,0 +1,204 @@
+"""
+Streaming input-drift monitor
+Training stores a reference in the artifact: for every form field, fixed bins and the
+training data's counts in them. Numeric fields use decile edges. Coded fields count each
+category seen in training, plus one bucket for codes never seen. Served students update
+the same bins: O(1) per student (a bisect or a dict lookup), vectorized for batches.
+
+Each field is compared with its reference by PSI. Numeric fields also get a binned
+two-sample KS statistic, checked against its 5% critical value. Counts are kept per
+model version and since process start, so memory is fixed by the reference.
+"""
+
+import bisect
+import math
+import threading
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import DRIFT_MIN_OBSERVATIONS, DRIFT_PSI_ALERT, DRIFT_PSI_WARNING
+from .metrics import metrics
+
+# Distinct never-seen codes remembered per field (their counts are all in the unseen bucket anyway)
+MAX_UNSEEN_CODES = 20
+
+# Smallest bin share used in PSI, so empty bins do not make it infinite
+PSI_FLOOR = 1e-4
+
+
+def build_drift_reference(data, categorical_columns, n_bins: int = 10) -> Dict[str, Any]:
+    """Reference bins and counts for every column of data (the raw training fields)"""
+    import numpy as np
+
+    fields = {}
+    for column in data.columns:
+        values = data[column].to_numpy(dtype=np.float64)
+        if column in categorical_columns:
+            codes, counts = np.unique(values, return_counts=True)
+            fields[column] = {'kind': 'categorical', 'values': codes.tolist(), 'counts': counts.tolist() + [0]}
+        else:
+            # Interior decile edges; a bin holds values in (edge[i - 1], edge[i]]
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1)[1:-1]))
+            counts = np.bincount(np.searchsorted(edges, values, side='left'), minlength=len(edges) + 1)
+            fields[column] = {'kind': 'numeric', 'edges': edges.tolist(), 'counts': counts.tolist()}
+    return {'n_rows': len(data), 'fields': fields}
+
+
+def psi(expected: List[float], actual: List[float]) -> float:
+    """Population stability index between two count vectors over the same bins"""
+    n_expected, n_actual = sum(expected), sum(actual)
+    total = 0.0
+    for e, a in zip(expected, actual):
+        e, a = max(e / n_expected, PSI_FLOOR), max(a / n_actual, PSI_FLOOR)
+        total += (a - e) * math.log(a / e)
+    return total
+
+
+def binned_ks(expected: List[float], actual: List[float]) -> float:
+    """Largest gap between the two binned CDFs"""
+    n_expected, n_actual = sum(expected), sum(actual)
+    gap = cdf_expected = cdf_actual = 0.0
+    for e, a in zip(expected, actual):
+        cdf_expected += e / n_expected
+        cdf_actual += a / n_actual
+        gap = max(gap, abs(cdf_actual - cdf_expected))
+    return gap
+
+
+class DriftMonitor:
+    """Served-student counts over one artifact's reference bins"""
+
+    def __init__(self, reference: Dict[str, Any]):
+        self.reference = reference
+        self.observed = 0
+        self._lock = threading.Lock()
+        self._counts = {field: [0] * len(spec['counts']) for field, spec in reference['fields'].items()}
+        self._category_index = {field: {value: i for i, value in enumerate(spec['values'])}
+                                for field, spec in reference['fields'].items() if spec['kind'] == 'categorical'}
+        self._unseen_codes: Dict[str, Dict[Any, int]] = {field: {} for field in self._category_index}
+
+    def _bin(self, field: str, value) -> int:
+        spec = self.reference['fields'][field]
+        if spec['kind'] == 'numeric':
+            return bisect.bisect_left(spec['edges'], value)
+        value = float(value)
+        index = self._category_index[field].get(value)
+        if index is None:
+            unseen = self._unseen_codes[field]
+            if value in unseen or len(unseen) < MAX_UNSEEN_CODES:
+                unseen[value] = unseen.get(value, 0) + 1
+            return len(spec['values'])
+        return index
+
+    def observe(self, user_input: Dict[str, Any]) -> None:
+        """Count one served student"""
+        with self._lock:
+            for field, counts in self._counts.items():
+                if field in user_input:
+                    counts[self._bin(field, user_input[field])] += 1
+            self.observed += 1
+
+    def observe_batch(self, rows) -> None:
+        """Count many students (a DataFrame or a list of user_input dicts) in one vectorized pass"""
+        import numpy as np
+        import pandas as pd
+
+        frame = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        updates = {}
+        for field, spec in self.reference['fields'].items():
+            if field not in frame.columns:
+                continue
+            values = frame[field].to_numpy(dtype=np.float64)
+            if spec['kind'] == 'numeric':
+                bins = np.searchsorted(spec['edges'], values, side='left')
+            else:
+                known = np.asarray(spec['values'], dtype=np.float64)
+                positions = np.searchsorted(known, values).clip(0, max(len(known) - 1, 0))
+                matched = known[positions] == values if len(known) else np.zeros(len(values), dtype=bool)
+                bins = np.where(matched, positions, len(known))
+                for code, count in zip(*np.unique(values[~matched], return_counts=True)):
+                    updates.setdefault(('unseen', field), []).append((code.item(), int(count)))
+            updates[field] = np.bincount(bins, minlength=len(spec['counts'])).tolist()
+
+        with self._lock:
+            for key, update in updates.items():
+                if isinstance(key, tuple):
+                    unseen = self._unseen_codes[key[1]]
+                    for code, count in update:
+                        if code in unseen or len(unseen) < MAX_UNSEEN_CODES:
+                            unseen[code] = unseen.get(code, 0) + count
+                else:
+                    counts = self._counts[key]
+                    for i, count in enumerate(update):
+                        counts[i] += count
+            self.observed += len(frame)
+
+    def report(self) -> Dict[str, Any]:
+        """PSI (and KS for numeric fields) per field, worst first, with an overall status"""
+        with self._lock:
+            observed = self.observed
+            counts = {field: list(values) for field, values in self._counts.items()}
+            unseen_codes = {field: dict(codes) for field, codes in self._unseen_codes.items() if codes}
+
+        if observed < DRIFT_MIN_OBSERVATIONS:
+            return {'status': 'collecting', 'observed': observed, 'fields': [], 'unseen_codes': unseen_codes}
+
+        n_reference = self.reference['n_rows']
+        fields = []
+        for field, spec in self.reference['fields'].items():
+            actual = counts[field]
+            if sum(actual) == 0:
+                continue
+            row = {'field': field, 'psi': psi(spec['counts'], actual), 'ks': None, 'ks_drift': False}
+            if spec['kind'] == 'numeric':
+                row['ks'] = binned_ks(spec['counts'], actual)
+                n_actual = sum(actual)
+                row['ks_drift'] = row['ks'] > 1.36 * math.sqrt((n_reference + n_actual) / (n_reference * n_actual))
+            row['status'] = ('drift' if row['psi'] >= DRIFT_PSI_ALERT else
+                             'warning' if row['psi'] >= DRIFT_PSI_WARNING or row['ks_drift'] else 'stable')
+            fields.append(row)
+        fields.sort(key=lambda row: row['psi'], reverse=True)
+
+        # A few rare unseen codes are normal; they count towards PSI through the unseen bucket
+        statuses = {row['status'] for row in fields}
+        status = 'drift' if 'drift' in statuses else 'warning' if 'warning' in statuses else 'stable'
+        return {'status': status, 'observed': observed, 'fields': fields, 'unseen_codes': unseen_codes}
+
+
+_monitors: Dict[str, DriftMonitor] = {}
+_monitors_lock = threading.Lock()
+_latest: List[Optional[DriftMonitor]] = [None]
+
+
+def get_drift_monitor(preprocessing_info: Dict[str, Any]) -> Optional[DriftMonitor]:
+    """The process-wide monitor for this artifact (None if it has no drift reference)"""
+    reference = preprocessing_info.get('drift_reference')
+    if reference is None:
+        return None
+    model_version = preprocessing_info.get('model_version', 'unversioned')
+    monitor = _monitors.get(model_version)
+    if monitor is None:
+        with _monitors_lock:
+            monitor = _monitors.get(model_version)
+            if monitor is None:
+                # Only the served version is monitored; an older one's counts are dropped
+                _monitors.clear()
+                monitor = _monitors[model_version] = DriftMonitor(reference)
+                _latest[0] = monitor
+    return monitor
+
+
+def observe_prediction(preprocessing_info: Dict[str, Any], user_input: Dict[str, Any]) -> None:
+    """Count one served student against the artifact's reference"""
+    monitor = get_drift_monitor(preprocessing_info)
+    if monitor is not None:
+        monitor.observe(user_input)
+
+
+def _max_psi() -> float:
+    monitor = _latest[0]
+    if monitor is None:
+        return 0.0
+    return max((row['psi'] for row in monitor.report()['fields']), default=0.0)
+
+
+metrics.register_gauge("drift_max_psi", "Largest per-field PSI of served students vs the training data", _max_psi)
@@ -0,0 +1,210 @@
+"""
+Compiled feature encoder
+Maps raw student fields straight into the model's one-hot feature matrix, replacing
+per-request pandas get_dummies/concat with precomputed column indices.
+
+A category value with no one-hot column (a code never seen in training) still encodes
+as an all-zero group. When the serving path asks for it (count_unseen=True), such rows
+are counted per field in a side array that feeds the metrics export. The first few
+distinct codes per field are logged as warnings. Internal re-encodes (what-if sweeps,
+interventions, explanations, warm-up, shadow scoring) are never counted. The count
+costs nothing for known values.
+"""
+
+import logging
+import threading
+import weakref
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Distinct unseen codes logged per field (later ones are only counted)
+MAX_LOGGED_UNSEEN = 20
+
+# Every compiled encoder alive in the process, for the metrics export
+_encoders = weakref.WeakSet()
+
+# Same list preprocess_input has always used; training encodes with the artifact's copy
+DEFAULT_CATEGORICAL_COLUMNS = (
+    'Marital status', 'Application mode', 'Course', 'Daytime/evening attendance',
+    'Previous qualification', 'Nationality', 'Mothers qualification',
+    'Fathers qualification', 'Mothers occupation', 'Fathers occupation',
+    'Gender', 'Displaced', 'Educational special needs', 'Debtor',
+    'Tuition fees up to date', 'Scholarship holder', 'International',
+    'Application order'
+)
+
+
+def _parse_category(text: str):
+    """Turn the suffix of a one-hot column name back into its numeric value"""
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+class CompiledEncoder:
+    """Precomputed column layout for one list of training feature names
+
+    Numeric fields whose name is a training feature are copied through; categorical
+    fields set their `<field>_<value>` column to 1. Anything else (including values
+    never seen in training) leaves zeros, exactly like the original pandas path;
+    rows with a value never seen in training are counted in unseen_counts.
+    """
+
+    def __init__(self, feature_names: Sequence[str], categorical_columns: Sequence[str]):
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        self.categorical_columns = tuple(categorical_columns)
+
+        feature_index = {name: i for i, name in enumerate(self.feature_names)}
+        categorical = set(self.categorical_columns)
+
+        # field -> {category value -> column index}
+        self.onehot_index: Dict[str, Dict[Any, int]] = {column: {} for column in self.categorical_columns}
+        for name, i in feature_index.items():
+            for column in self.categorical_columns:
+                prefix = column + '_'
+                if name.startswith(prefix):
+                    self.onehot_index[column][_parse_category(name[len(prefix):])] = i
+
+        # field -> column index for pass-through numeric fields
+        self.numeric_index: Dict[str, int] = {
+            name: i for name, i in feature_index.items() if name not in categorical
+        }
+
+        # Sorted lookup tables for the vectorized batch path
+        self._onehot_tables: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        for column, mapping in self.onehot_index.items():
+            numeric_items = sorted((v, i) for v, i in mapping.items() if isinstance(v, float))
+            values = np.array([v for v, _ in numeric_items], dtype=np.float64)
+            indices = np.array([i for _, i in numeric_items], dtype=np.intp)
+            self._onehot_tables[column] = (values, indices)
+
+        # Served rows with a value outside each categorical field's one-hot block. Fields
+        # without any one-hot column are not model inputs and are never counted.
+        self._unseen_slot = {column: i for i, column in enumerate(self.categorical_columns)}
+        self.unseen_counts = np.zeros(len(self.categorical_columns), dtype=np.int64)
+        self._unseen_lock = threading.Lock()
+        self._logged_unseen: Dict[str, set] = {column: set() for column in self.categorical_columns}
+        _encoders.add(self)
+
+    def _record_unseen(self, field: str, values, count: int) -> None:
+        """Count rows with unseen codes (the slow path, only taken when there are some)"""
+        with self._unseen_lock:
+            self.unseen_counts[self._unseen_slot[field]] += count
+            logged = self._logged_unseen[field]
+            new_values = [value for value in values if value not in logged][:MAX_LOGGED_UNSEEN - len(logged)]
+            logged.update(new_values)
+        for value in new_values:
+            logger.warning("%s value %r was not seen in training; its one-hot group is left at zero", field, value)
+
+    def unseen_by_field(self) -> Dict[str, int]:
+        """Served rows so far with an unseen value, per categorical field"""
+        with self._unseen_lock:
+            return dict(zip(self.categorical_columns, self.unseen_counts.tolist()))
+
+    def unseen_fields(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """The fields of one user_input whose value has no one-hot column (nothing is counted)"""
+        return {field: value for field, value in row.items()
+                if self.onehot_index.get(field) and value not in self.onehot_index[field]}
+
+    def field_indices(self, field: str) -> np.ndarray:
+        """Feature columns a raw field can set (its one-hot block, or its numeric column)"""
+        if field in self.onehot_index:
+            return np.fromiter(self.onehot_index[field].values(), dtype=np.intp)
+        index = self.numeric_index.get(field)
+        return np.array([] if index is None else [index], dtype=np.intp)
+
+    def encode_one(self, row: Dict[str, Any], count_unseen: bool = False) -> np.ndarray:
+        """Encode a single user_input dict into a (1, n_features) float32 matrix"""
+        encoded = np.zeros((1, self.n_features), dtype=np.float32)
+        for field, value in row.items():
+            mapping = self.onehot_index.get(field)
+            if mapping is not None:
+                index = mapping.get(value)
+                if index is not None:
+                    encoded[0, index] = 1.0
+                elif count_unseen and mapping:
+                    self._record_unseen(field, (value,), 1)
+            else:
+                index = self.numeric_index.get(field)
+                if index is not None:
+                    encoded[0, index] = value
+        return encoded
+
+    def encode_columns(self, columns: Dict[str, Any], n_rows: int, count_unseen: bool = False) -> np.ndarray:
+        """Vectorized encoding of column arrays (e.g. a DataFrame's columns)"""
+        encoded = np.zeros((n_rows, self.n_features), dtype=np.float32)
+        rows = np.arange(n_rows)
+        for field, values in columns.items():
+            if field in self._onehot_tables:
+                known_values, known_indices = self._onehot_tables[field]
+                if len(known_values) == 0:
+                    continue
+                values = np.asarray(values, dtype=np.float64)
+                positions = np.searchsorted(known_values, values).clip(0, len(known_values) - 1)
+                matched = known_values[positions] == values
+                encoded[rows[matched], known_indices[positions[matched]]] = 1.0
+                if count_unseen:
+                    n_unseen = n_rows - int(np.count_nonzero(matched))
+                    if n_unseen:
+                        self._record_unseen(field, np.unique(values[~matched]).tolist(), n_unseen)
+            else:
+                index = self.numeric_index.get(field)
+                if index is not None:
+                    encoded[:, index] = values
+        return encoded
+
+    def encode_records(self, records: List[Dict[str, Any]], count_unseen: bool = False) -> np.ndarray:
+        """Encode a list of user_input dicts"""
+        if len(records) == 1:
+            return self.encode_one(records[0], count_unseen)
+        fields = records[0].keys() if records else ()
+        columns = {field: np.fromiter((record[field] for record in records), dtype=np.float64, count=len(records))
+                   for field in fields}
+        return self.encode_columns(columns, len(records), count_unseen)
+
+    def encode_frame(self, frame, count_unseen: bool = False) -> np.ndarray:
+        """Encode a pandas DataFrame of raw fields"""
+        return self.encode_columns({column: frame[column].to_numpy() for column in frame.columns}, len(frame),
+                                   count_unseen)
+
+
+@lru_cache(maxsize=8)
+def _compile(feature_names: Tuple[str, ...], categorical_columns: Tuple[str, ...]) -> CompiledEncoder:
+    return CompiledEncoder(feature_names, categorical_columns)
+
+
+def get_encoder(preprocessing_info: Dict[str, Any]) -> CompiledEncoder:
+    """Return the (cached) compiled encoder for a model's preprocessing info"""
+    categorical_columns = tuple(preprocessing_info.get('categorical_columns', DEFAULT_CATEGORICAL_COLUMNS))
+    return _compile(tuple(preprocessing_info['feature_names']), categorical_columns)
+
+
+def encoder_cache_info():
+    """Hit/miss stats of the compiled encoder cache"""
+    return _compile.cache_info()
+
+
+def unseen_category_counts() -> Dict[str, int]:
+    """Served rows with an unseen value per field, summed over every live encoder
+
+    Only the serving path counts, so a shadow candidate's encoder adds nothing.
+    """
+    totals: Dict[str, int] = {}
+    for encoder in list(_encoders):
+        for field, count in encoder.unseen_by_field().items():
+            totals[field] = totals.get(field, 0) + count
+    return totals
+
+
+metrics.register_gauge("encoder_unseen_values_total",
+                       "Served rows with a category value that has no one-hot column, per field",
+                       unseen_category_counts, "counter", label="field")
+
@@ -0,0 +1,70 @@
+"""
+Held-out evaluation metrics computed at training time
+Accuracy, per-class precision/recall/F1, the confusion matrix and one-vs-rest
+calibration curves, all derived from one matrix of predicted probabilities with
+bincount. The result is stored in preprocessing_info['evaluation'].
+"""
+
+from typing import Any, Dict, Sequence
+
+import numpy as np
+
+
+def _safe_divide(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros(len(numerator)), where=denominator > 0)
+
+
+def evaluate_predictions(y_true, probabilities, classes: Sequence[Any], class_names: Sequence[str],
+                         n_bins: int = 10) -> Dict[str, Any]:
+    """Compute all display metrics from held-out labels and predict_proba output"""
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    n_rows, n_classes = probabilities.shape
+    true_index = np.searchsorted(classes, np.asarray(y_true))
+    predicted_index = probabilities.argmax(axis=1)
+
+    # Rows are true classes, columns predicted classes
+    confusion = np.bincount(true_index * n_classes + predicted_index,
+                            minlength=n_classes * n_classes).reshape(n_classes, n_classes)
+    true_positives = np.diag(confusion).astype(np.float64)
+    support = confusion.sum(axis=1)
+    precision = _safe_divide(true_positives, confusion.sum(axis=0))
+    recall = _safe_divide(true_positives, support)
+    f1 = _safe_divide(2 * precision * recall, precision + recall)
+
+    # One-vs-rest reliability curves: bin every (row, class) probability at once
+    # (same edges as sklearn.calibration.calibration_curve with strategy='uniform')
+    bins = np.searchsorted(np.linspace(0.0, 1.0, n_bins + 1)[1:-1], probabilities)
+    flat_bins = (np.arange(n_classes) * n_bins + bins).ravel()
+    one_hot = true_index[:, None] == np.arange(n_classes)
+    is_true_class = one_hot.ravel()
+    size = n_classes * n_bins
+    counts = np.bincount(flat_bins, minlength=size).reshape(n_classes, n_bins)
+    predicted_sum = np.bincount(flat_bins, weights=probabilities.ravel(), minlength=size).reshape(n_classes, n_bins)
+    positive_sum = np.bincount(flat_bins, weights=is_true_class, minlength=size).reshape(n_classes, n_bins)
+
+    calibration = {}
+    for c, name in enumerate(class_names):
+        filled = counts[c] > 0
+        calibration[name] = {
+            'mean_predicted': (predicted_sum[c, filled] / counts[c, filled]).tolist(),
+            'fraction_positive': (positive_sum[c, filled] / counts[c, filled]).tolist(),
+            'count': counts[c, filled].tolist(),
+        }
+
+    return {
+        'n_samples': n_rows,
+        'accuracy': float(true_positives.sum() / n_rows),
+        'precision': float(precision.mean()),
+        'recall': float(recall.mean()),
+        'f1_score': float(f1.mean()),
+        'brier_score': float(np.mean(np.sum((probabilities - one_hot) ** 2, axis=1))),
+        'per_class': {
+            name: {'precision': float(precision[c]), 'recall': float(recall[c]), 'f1_score': float(f1[c]),
+                   'support': int(support[c])}
+            for c, name in enumerate(class_names)
+        },
+        'class_names': list(class_names),
+        'confusion_matrix': confusion.tolist(),
+        'calibration': calibration,
+        'calibration_bins': n_bins,
+    }
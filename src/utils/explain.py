@@ -0,0 +1,153 @@
+"""
+Per-prediction feature attributions for the Random Forest
+Saabas path decomposition: every split on a student's path through a tree moves the
+class distribution from the parent node to the child, and that change is credited to
+the split feature. Averaged over the forest, bias + contributions == predict_proba.
+
+The per-node changes are precomputed once per model into a sparse matrix (already
+summed from one-hot columns to the original form fields). Explaining a batch finds
+the leaves, walks the flattened parent arrays back to the roots level by level, and
+does one sparse matrix product.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+
+def group_features(feature_names: Sequence[str], original_columns: Sequence[str]) -> Tuple[List[str], np.ndarray]:
+    """Map each model feature to the original field it was derived from
+
+    One-hot columns are named `<field>_<value>`; the longest matching field wins. Features
+    that match no field keep their own name. Returns the field names and, per feature,
+    the index of its field.
+    """
+    by_length = sorted(original_columns, key=len, reverse=True)
+    groups = list(original_columns)
+    group_index = {name: i for i, name in enumerate(groups)}
+    feature_groups = np.empty(len(feature_names), dtype=np.intp)
+
+    for i, name in enumerate(feature_names):
+        # Some training columns carry stray whitespace (e.g. a trailing tab)
+        clean = name.replace('\t', '')
+        field = next((c for c in by_length if clean == c or clean.startswith(c + '_')), None)
+        if field is None:
+            field = name
+            group_index[field] = len(groups)
+            groups.append(field)
+        feature_groups[i] = group_index[field]
+
+    return groups, feature_groups
+
+
+class TreeExplainer:
+    """Saabas attributions for a fitted RandomForestClassifier, grouped by original field"""
+
+    def __init__(self, model, feature_names: Sequence[str], original_columns: Sequence[str]):
+        self.model = model
+        self.columns, feature_groups = group_features(feature_names, original_columns)
+        self.classes = model.classes_
+        n_classes = len(self.classes)
+        n_groups = len(self.columns)
+
+        rows, cols, data = [], [], []
+        roots, parents_all, offsets = [], [], []
+        offset = 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            # Class distribution at every node (normalized, as predict_proba does)
+            values = tree.value[:, 0, :]
+            values = values / values.sum(axis=1, keepdims=True)
+            roots.append(values[0])
+
+            is_split = tree.children_left >= 0
+            split_nodes = np.flatnonzero(is_split)
+            parent = np.full(tree.node_count, -1, dtype=np.intp)
+            parent[tree.children_left[split_nodes]] = split_nodes
+            parent[tree.children_right[split_nodes]] = split_nodes
+
+            parents_all.append(np.where(parent >= 0, parent + offset, -1))
+            offsets.append(offset)
+
+            children = np.flatnonzero(parent >= 0)
+            parents = parent[children]
+            deltas = values[children] - values[parents]
+            group = feature_groups[tree.feature[parents]]
+
+            rows.append(np.repeat(offset + children, n_classes))
+            cols.append((group[:, None] * n_classes + np.arange(n_classes)).ravel())
+            data.append(deltas.ravel())
+            offset += tree.node_count
+
+        n_trees = len(model.estimators_)
+        self.bias = np.mean(roots, axis=0)
+        # Global node id -> global parent id (-1 at the roots), and each tree's first id
+        self._parents = np.concatenate(parents_all)
+        self._offsets = np.array(offsets, dtype=np.intp)
+        # Duplicate (node, field) entries cannot occur: each node has one parent split
+        self._node_contributions = sparse.csr_matrix(
+            (np.concatenate(data) / n_trees, (np.concatenate(rows), np.concatenate(cols))),
+            shape=(offset, n_groups * n_classes)
+        )
+
+    def explain(self, processed) -> np.ndarray:
+        """Contributions for encoded rows, shape (n_rows, n_fields, n_classes)"""
+        # Straight to the compiled trees: forest.decision_path's per-call joblib
+        # dispatch costs more than the traversal itself for a single student
+        X = np.ascontiguousarray(processed, dtype=np.float32)
+        n_rows = X.shape[0]
+        leaves = np.column_stack([estimator.tree_.apply(X) for estimator in self.model.estimators_])
+
+        nodes = (leaves + self._offsets).ravel()
+        samples = np.repeat(np.arange(n_rows), len(self._offsets))
+        path_rows, path_nodes = [], []
+        while nodes.size:
+            path_rows.append(samples)
+            path_nodes.append(nodes)
+            parents = self._parents[nodes]
+            on_path = parents >= 0
+            nodes, samples = parents[on_path], samples[on_path]
+
+        path_nodes = np.concatenate(path_nodes)
+        indicator = sparse.csr_matrix(
+            (np.ones(len(path_nodes)), (np.concatenate(path_rows), path_nodes)),
+            shape=(n_rows, len(self._parents))
+        )
+        contributions = (indicator @ self._node_contributions).toarray()
+        return contributions.reshape(n_rows, len(self.columns), len(self.classes))
+
+
+@lru_cache(maxsize=2)
+def _build(model, feature_names: Tuple[str, ...], original_columns: Tuple[str, ...]) -> TreeExplainer:
+    return TreeExplainer(model, feature_names, original_columns)
+
+
+def get_explainer(model, preprocessing_info: Dict[str, Any]) -> TreeExplainer:
+    """Return the (cached) explainer for a model and its preprocessing info"""
+    feature_names = tuple(preprocessing_info['feature_names'])
+    original_columns = tuple(preprocessing_info.get('original_columns', feature_names))
+    return _build(model, feature_names, original_columns)
+
+
+def explain_prediction(model, preprocessing_info: Dict[str, Any], user_input: Dict[str, Any]) -> np.ndarray:
+    """Per-field contributions for one student, shape (n_fields, n_classes)"""
+    from .models_utils import preprocess_input
+
+    return get_explainer(model, preprocessing_info).explain(preprocess_input(user_input, preprocessing_info))[0]
+
+
+def explain_batch(model, preprocessing_info: Dict[str, Any], rows) -> np.ndarray:
+    """Per-field contributions for a DataFrame or list of students, shape (n_rows, n_fields, n_classes)"""
+    from .models_utils import preprocess_batch
+
+    return get_explainer(model, preprocessing_info).explain(preprocess_batch(rows, preprocessing_info))
+
+
+def top_contributions(contributions: np.ndarray, columns: Sequence[str], class_index: int,
+                      k: int = 8) -> List[Tuple[str, float]]:
+    """The k fields with the largest absolute contribution to one class"""
+    class_contributions = contributions[:, class_index]
+    order = np.argsort(-np.abs(class_contributions), kind='stable')[:k]
+    return [(columns[i], float(class_contributions[i])) for i in order if class_contributions[i] != 0]
@@ -0,0 +1,142 @@
+"""
+Global feature importance for the Random Forest, computed at training time
+Permutation and impurity importance summed over the original form fields (a field's
+one-hot columns are permuted together). Accuracy is measured on calibrated
+probabilities when a calibrator is given, as the app serves them. The results are
+stored in preprocessing_info, so the app only reads them. Other backends get
+permutation importance only.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from joblib import Parallel, delayed
+
+from .calibration import apply_calibration
+from .explain import group_features
+
+
+def impurity_importance_by_field(model, feature_groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """Mean decrease in impurity, summed over each field's columns"""
+    return np.bincount(feature_groups, weights=model.feature_importances_, minlength=n_groups)
+
+
+def permutation_importance_by_field(model, X, y, feature_names: Sequence[str], original_columns: Sequence[str],
+                                    n_repeats: int = 5, random_state: int = 42, n_jobs: int = -1,
+                                    calibrator: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Drop in held-out accuracy when each original field is shuffled
+
+    Per-tree class probabilities on X are computed once and cached. Shuffling a field
+    can only change the trees that split on it, so only those trees are re-run. Fields
+    are scored in parallel threads (tree traversal releases the GIL).
+    """
+    columns, feature_groups = group_features(feature_names, original_columns)
+    n_groups = len(columns)
+    if not hasattr(model, 'estimators_'):
+        return _model_permutation_importance(model, X, y, columns, feature_groups, n_repeats, random_state, n_jobs,
+                                             calibrator)
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    n_rows = X.shape[0]
+
+    trees = [estimator.tree_ for estimator in model.estimators_]
+    leaf_values = []
+    for tree in trees:
+        values = tree.value[:, 0, :]
+        leaf_values.append(values / values.sum(axis=1, keepdims=True))
+
+    # Cached baseline: each tree's class probabilities for every held-out row
+    tree_proba = np.stack([values[tree.apply(X)] for tree, values in zip(trees, leaf_values)])
+    total_proba = tree_proba.sum(axis=0)
+
+    def accuracy(proba: np.ndarray) -> float:
+        if calibrator is not None:
+            # Summed tree votes -> the forest's mean probabilities -> what the app serves
+            proba = apply_calibration(proba / len(trees), calibrator)
+        return float(np.mean(model.classes_[proba.argmax(axis=1)] == y))
+
+    baseline = accuracy(total_proba)
+
+    # field -> trees with at least one split on it
+    uses = np.zeros((n_groups, len(trees)), dtype=bool)
+    for t, tree in enumerate(trees):
+        split_features = tree.feature[tree.children_left >= 0]
+        uses[np.unique(feature_groups[split_features]), t] = True
+
+    def score_field(group: int, seed: np.random.SeedSequence) -> np.ndarray:
+        used = np.flatnonzero(uses[group])
+        drops = np.zeros(n_repeats)
+        if len(used) == 0:
+            return drops
+
+        columns_of_field = np.flatnonzero(feature_groups == group)
+        unchanged = total_proba - tree_proba[used].sum(axis=0)
+        rng = np.random.default_rng(seed)
+        for repeat in range(n_repeats):
+            shuffled = X.copy()
+            shuffled[:, columns_of_field] = X[np.ix_(rng.permutation(n_rows), columns_of_field)]
+            proba = unchanged.copy()
+            for t in used:
+                proba += leaf_values[t][trees[t].apply(shuffled)]
+            drops[repeat] = baseline - accuracy(proba)
+        return drops
+
+    # One independent stream per field, so results do not depend on scheduling
+    seeds = np.random.SeedSequence(random_state).spawn(n_groups)
+    drops = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(score_field)(group, seed) for group, seed in zip(range(n_groups), seeds)
+    )
+    drops = np.array(drops)
+
+    return {
+        'columns': columns,
+        'permutation_mean': drops.mean(axis=1).tolist(),
+        'permutation_std': drops.std(axis=1).tolist(),
+        'impurity': impurity_importance_by_field(model, feature_groups, n_groups).tolist(),
+        'baseline_accuracy': baseline,
+        'n_repeats': n_repeats,
+    }
+
+
+def _model_permutation_importance(model, X, y, columns: List[str], feature_groups: np.ndarray, n_repeats: int,
+                                  random_state: int, n_jobs: int,
+                                  calibrator: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Permutation importance through model.predict_proba, for models without a tree cache"""
+    import pandas as pd
+
+    feature_names = list(X.columns) if hasattr(X, 'columns') else None
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    n_rows = X.shape[0]
+
+    def accuracy(matrix: np.ndarray) -> float:
+        proba = model.predict_proba(pd.DataFrame(matrix, columns=feature_names, copy=False))
+        if calibrator is not None:
+            proba = apply_calibration(proba, calibrator)
+        return float(np.mean(model.classes_[proba.argmax(axis=1)] == y))
+
+    baseline = accuracy(X)
+
+    def score_field(group: int, seed: np.random.SeedSequence) -> np.ndarray:
+        columns_of_field = np.flatnonzero(feature_groups == group)
+        rng = np.random.default_rng(seed)
+        drops = np.zeros(n_repeats)
+        for repeat in range(n_repeats):
+            shuffled = X.copy()
+            shuffled[:, columns_of_field] = X[np.ix_(rng.permutation(n_rows), columns_of_field)]
+            drops[repeat] = baseline - accuracy(shuffled)
+        return drops
+
+    seeds = np.random.SeedSequence(random_state).spawn(len(columns))
+    drops = np.array(Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(score_field)(group, seed) for group, seed in zip(range(len(columns)), seeds)
+    ))
+
+    return {
+        'columns': columns,
+        'permutation_mean': drops.mean(axis=1).tolist(),
+        'permutation_std': drops.std(axis=1).tolist(),
+        'impurity': None,
+        'baseline_accuracy': baseline,
+        'n_repeats': n_repeats,
+    }
@@ -0,0 +1,104 @@
+"""
+Incremental re-scoring for interactive edits
+A session keeps, for every tree of the forest, the leaf its student reached and the
+features tested on the way there. When the student changes, only the trees whose
+cached path tested one of the changed encoded columns are walked again. No other
+tree's leaf can move. Probabilities are then the mean of the cached leaves' class
+distributions, which is what predict_proba computes.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, MutableMapping, Tuple
+
+import numpy as np
+
+from .encoding import get_encoder
+
+SESSION_KEY = '_incremental_scorer'
+
+
+class CompiledForest:
+    """Plain-list copies of each tree's arrays, for cheap single-row traversal"""
+
+    def __init__(self, model):
+        self.classes = model.classes_
+        self.trees: List[Tuple[list, list, list, list]] = []
+        values, offsets, offset = [], [], 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            self.trees.append((tree.children_left.tolist(), tree.children_right.tolist(),
+                               tree.feature.tolist(), tree.threshold.tolist()))
+            # Class distribution at every node, normalized as predict_proba does
+            node_values = tree.value[:, 0, :]
+            values.append(node_values / node_values.sum(axis=1, keepdims=True))
+            offsets.append(offset)
+            offset += tree.node_count
+
+        self.values = np.concatenate(values)
+        self.offsets = np.array(offsets, dtype=np.intp)
+        self.n_trees = len(self.trees)
+
+    def descend(self, tree_index: int, x: List[float]) -> Tuple[int, List[int]]:
+        """Leaf reached by x in one tree, and the features tested on the way"""
+        left, right, feature, threshold = self.trees[tree_index]
+        node, tested = 0, []
+        while left[node] >= 0:
+            f = feature[node]
+            tested.append(f)
+            # x holds float32 values, compared against float64 thresholds as sklearn does
+            node = left[node] if x[f] <= threshold[node] else right[node]
+        return node, tested
+
+    def probabilities(self, leaves: np.ndarray) -> np.ndarray:
+        return self.values[self.offsets + leaves].mean(axis=0)
+
+
+@lru_cache(maxsize=2)
+def get_compiled_forest(model) -> CompiledForest:
+    """Return the (cached) compiled copy of a fitted forest"""
+    return CompiledForest(model)
+
+
+class IncrementalScorer:
+    """One student's cached leaves and path features, updated edit by edit"""
+
+    def __init__(self, model, preprocessing_info: Dict[str, Any]):
+        self.forest = get_compiled_forest(model)
+        self.encoder = get_encoder(preprocessing_info)
+        self.x = None
+        self.leaves = np.zeros(self.forest.n_trees, dtype=np.intp)
+        # path_features[t, f]: tree t's cached path tests encoded column f
+        self.path_features = np.zeros((self.forest.n_trees, self.encoder.n_features), dtype=bool)
+        self.last_retraversed = 0
+
+    def _walk(self, trees, x: np.ndarray) -> None:
+        values = x.tolist()
+        for t in trees:
+            leaf, tested = self.forest.descend(t, values)
+            self.leaves[t] = leaf
+            self.path_features[t] = False
+            self.path_features[t, tested] = True
+
+    def score(self, user_input: Dict[str, Any], count_unseen: bool = False) -> np.ndarray:
+        """Raw (uncalibrated) class probabilities, re-walking only the affected trees"""
+        x = self.encoder.encode_one(user_input, count_unseen)[0]
+        if self.x is None:
+            trees = range(self.forest.n_trees)
+        else:
+            changed = np.flatnonzero(x != self.x)
+            trees = np.flatnonzero(self.path_features[:, changed].any(axis=1)).tolist()
+
+        self._walk(trees, x)
+        self.x = x
+        self.last_retraversed = len(trees)
+        return self.forest.probabilities(self.leaves)
+
+
+def get_session_scorer(model, preprocessing_info: Dict[str, Any], state: MutableMapping) -> IncrementalScorer:
+    """The scorer kept in a session's state, replaced when the model version changes"""
+    model_version = preprocessing_info.get('model_version', 'unversioned')
+    cached = state.get(SESSION_KEY)
+    if cached is None or cached[0] != model_version or cached[1].forest is not get_compiled_forest(model):
+        cached = (model_version, IncrementalScorer(model, preprocessing_info))
+        state[SESSION_KEY] = cached
+    return cached[1]
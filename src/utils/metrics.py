@@ -0,0 +1,206 @@
+"""
+Process-wide latency metrics for the Student Success Predictor
+Fixed-bucket histograms per stage, exportable in Prometheus text format
+"""
+
+import bisect
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..config.settings import METRICS_ENABLED, METRICS_EXPORT_PATH
+
+# Upper bounds in seconds (1-2-5 series from 10µs to 10s); the last bucket is +Inf
+LATENCY_BUCKETS = tuple(
+    mantissa * 10.0 ** exponent
+    for exponent in range(-5, 1)
+    for mantissa in (1, 2, 5)
+) + (10.0,)
+
+METRIC_PREFIX = "srp"
+
+
+class Histogram:
+    """Thread-safe fixed-bucket latency histogram"""
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        """Record one observation"""
+        index = bisect.bisect_left(self.bounds, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.total += seconds
+            self.count += 1
+
+    def reset(self) -> None:
+        """Zero all observations, keeping this object (decorated stages hold a reference)"""
+        with self._lock:
+            self.counts = [0] * (len(self.bounds) + 1)
+            self.total = 0.0
+            self.count = 0
+
+    def snapshot(self) -> Tuple[List[int], float, int]:
+        """Return a consistent copy of (bucket counts, sum, count)"""
+        with self._lock:
+            return list(self.counts), self.total, self.count
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of the bucket that contains it"""
+        counts, _, count = self.snapshot()
+        if count == 0:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.bounds[index] if index < len(self.bounds) else float('inf')
+        return float('inf')
+
+
+class MetricsRegistry:
+    """Holds every stage histogram and gauge callback in the process"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._histograms: Dict[str, Histogram] = {}
+        self._gauges: Dict[str, Tuple[str, str, Callable, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, stage: str) -> Histogram:
+        """Return the histogram for a stage, creating it on first use"""
+        with self._lock:
+            if stage not in self._histograms:
+                self._histograms[stage] = Histogram()
+            return self._histograms[stage]
+
+    def register_gauge(self, name: str, help_text: str, callback: Callable, metric_type: str = "gauge",
+                       label: Optional[str] = None) -> None:
+        """Expose a value computed at export time (e.g. cache hit counters)
+
+        With a label, the callback returns {label value: value} and each entry is one sample.
+        """
+        with self._lock:
+            self._gauges[name] = (help_text, metric_type, callback, label)
+
+    def reset(self) -> None:
+        """Drop all recorded observations"""
+        with self._lock:
+            histograms = list(self._histograms.values())
+        for histogram in histograms:
+            histogram.reset()
+
+    def summary(self) -> List[Dict[str, float]]:
+        """Per-stage count, mean and estimated percentiles (in milliseconds)"""
+        with self._lock:
+            histograms = dict(self._histograms)
+
+        rows = []
+        for stage, histogram in sorted(histograms.items()):
+            _, total, count = histogram.snapshot()
+            rows.append({
+                'stage': stage,
+                'count': count,
+                'mean_ms': (total / count * 1000) if count else 0.0,
+                'p50_ms': histogram.quantile(0.50) * 1000,
+                'p95_ms': histogram.quantile(0.95) * 1000,
+                'p99_ms': histogram.quantile(0.99) * 1000,
+            })
+        return rows
+
+    def gauges(self) -> Dict[str, Any]:
+        """Evaluate every registered gauge"""
+        with self._lock:
+            gauges = dict(self._gauges)
+        return {name: callback() for name, (_, _, callback, _) in gauges.items()}
+
+    def export_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        with self._lock:
+            histograms = dict(self._histograms)
+            gauges = dict(self._gauges)
+
+        name = f"{METRIC_PREFIX}_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Latency of instrumented app stages",
+            f"# TYPE {name} histogram",
+        ]
+        for stage, histogram in sorted(histograms.items()):
+            counts, total, count = histogram.snapshot()
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.bounds, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total:.9f}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        for gauge_name, (help_text, metric_type, callback, label) in sorted(gauges.items()):
+            full_name = f"{METRIC_PREFIX}_{gauge_name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            if label is None:
+                lines.append(f"{full_name} {callback():g}")
+            else:
+                for key, value in sorted(callback().items()):
+                    escaped = str(key).replace('\\', '\\\\').replace('"', '\\"')
+                    lines.append(f'{full_name}{{{label}="{escaped}"}} {value:g}')
+
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus_file(self, path: str = METRICS_EXPORT_PATH) -> Path:
+        """Atomically write the export (suitable for a node_exporter textfile collector)"""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        tmp.write_text(self.export_prometheus())
+        os.replace(tmp, target)
+        return target
+
+
+# Aggregated across all sessions served by this process
+metrics = MetricsRegistry()
+
+
+def timed(stage: str):
+    """Decorator that records the wrapped function's latency under a stage name"""
+
+    def decorator(func):
+        histogram = metrics.histogram(stage)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Context manager form of `timed` for inline blocks"""
+    if not metrics.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.histogram(stage).observe(time.perf_counter() - start)
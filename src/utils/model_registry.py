@@ -0,0 +1,226 @@
+"""
+Local model registry with versioned artifacts and hot-swap
+Each version directory holds the model, preprocessing info, feature names and a manifest
+with checksums; a CURRENT file names the version to serve.
+
+Usage:
+    python -m src.utils.model_registry list
+    python -m src.utils.model_registry promote <version>
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import pickle
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from ..config.settings import MODEL_REGISTRY_DIR, MODEL_REGISTRY_POLL_SECONDS
+from ..config.theme import MODEL_FILES
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+
+
+class ModelBundle(NamedTuple):
+    """Everything needed to serve one model version"""
+    version: str
+    model: Any
+    preprocessing_info: Dict[str, Any]
+    feature_names: List[str]
+
+
+class RegistryError(Exception):
+    """Raised when a version is missing or fails verification"""
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(text)
+    os.replace(tmp, path)
+
+
+def publish_version(model, preprocessing_info: Dict[str, Any], feature_names: List[str],
+                    registry_dir: str = MODEL_REGISTRY_DIR, version: Optional[str] = None,
+                    make_current: bool = True, extra_manifest: Optional[Dict[str, Any]] = None) -> str:
+    """Write a new version directory (atomically) and optionally point CURRENT at it
+
+    If the version ID is taken (e.g. two publishes within one second), a numeric
+    suffix is added; the version actually written is returned.
+    """
+    registry = Path(registry_dir)
+    registry.mkdir(parents=True, exist_ok=True)
+    base_version = version or time.strftime('%Y%m%d-%H%M%S')
+
+    staging = registry / f".{base_version}.{os.getpid()}.staging"
+    if staging.exists():
+        shutil.rmtree(staging)
+    staging.mkdir()
+
+    artifacts = {
+        MODEL_FILES['model']: model,
+        MODEL_FILES['preprocessing']: preprocessing_info,
+        MODEL_FILES['features']: feature_names,
+    }
+    for filename, obj in artifacts.items():
+        with open(staging / filename, 'wb') as f:
+            pickle.dump(obj, f)
+    checksums = {filename: _sha256(staging / filename) for filename in artifacts}
+
+    for attempt in itertools.count(1):
+        version = base_version if attempt == 1 else f"{base_version}-{attempt}"
+        target = registry / version
+        if target.exists():
+            continue
+        manifest = {
+            'version': version,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'files': checksums,
+            **(extra_manifest or {}),
+        }
+        (staging / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2))
+
+        # Readers only ever see complete version directories
+        try:
+            os.rename(staging, target)
+            break
+        except OSError:
+            if not target.exists():
+                raise
+            # Another publish took this ID between the check and the rename
+
+    if make_current:
+        set_current_version(version, registry_dir)
+    return version
+
+
+def set_current_version(version: str, registry_dir: str = MODEL_REGISTRY_DIR) -> None:
+    """Point CURRENT at an existing version"""
+    registry = Path(registry_dir)
+    if not (registry / version / MANIFEST_FILE).exists():
+        raise RegistryError(f"Unknown model version '{version}'")
+    _write_atomic(registry / CURRENT_FILE, version + '\n')
+
+
+def read_current_version(registry_dir: str = MODEL_REGISTRY_DIR) -> Optional[str]:
+    """Return the version named by CURRENT, or None if there is no registry"""
+    try:
+        return (Path(registry_dir) / CURRENT_FILE).read_text().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def list_versions(registry_dir: str = MODEL_REGISTRY_DIR) -> List[Dict[str, Any]]:
+    """Return the manifests of all published versions, oldest first"""
+    manifests = []
+    for manifest_path in sorted(Path(registry_dir).glob(f"*/{MANIFEST_FILE}")):
+        if manifest_path.parent.name.startswith('.'):
+            continue  # staging directory
+        manifests.append(json.loads(manifest_path.read_text()))
+    return manifests
+
+
+def load_version(version: str, registry_dir: str = MODEL_REGISTRY_DIR) -> ModelBundle:
+    """Load and checksum-verify one version"""
+    version_dir = Path(registry_dir) / version
+    try:
+        manifest = json.loads((version_dir / MANIFEST_FILE).read_text())
+    except FileNotFoundError:
+        raise RegistryError(f"Unknown model version '{version}'")
+
+    for filename, expected in manifest['files'].items():
+        if _sha256(version_dir / filename) != expected:
+            raise RegistryError(f"Checksum mismatch for {filename} in version '{version}'")
+
+    loaded = {}
+    for key, filename in MODEL_FILES.items():
+        with open(version_dir / filename, 'rb') as f:
+            loaded[key] = pickle.load(f)
+
+    preprocessing_info = loaded['preprocessing']
+    preprocessing_info['model_version'] = version
+    return ModelBundle(version, loaded['model'], preprocessing_info, loaded['features'])
+
+
+class ModelRegistry:
+    """Serves the CURRENT version and hot-swaps to new ones loaded in the background"""
+
+    def __init__(self, registry_dir: str = MODEL_REGISTRY_DIR, poll_interval: float = MODEL_REGISTRY_POLL_SECONDS):
+        self.registry_dir = registry_dir
+        self.poll_interval = poll_interval
+        self.last_error: Optional[str] = None
+        self._bundle: Optional[ModelBundle] = None
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+
+    def current(self) -> Optional[ModelBundle]:
+        """Return the bundle to serve, or None when no registry version exists"""
+        bundle = self._bundle
+        if bundle is None:
+            with self._lock:
+                if self._bundle is None:
+                    self._refresh()
+                    self._start_watcher()
+                bundle = self._bundle
+        return bundle
+
+    def _refresh(self) -> None:
+        """Load CURRENT if it differs from the served version, then swap it in"""
+        version = read_current_version(self.registry_dir)
+        if version is None or (self._bundle is not None and self._bundle.version == version):
+            return
+        try:
+            bundle = load_version(version, self.registry_dir)
+        except (RegistryError, OSError, pickle.UnpicklingError) as e:
+            # Keep serving the previous version
+            self.last_error = f"{version}: {e}"
+            return
+        # A single reference assignment: each rerun reads one complete bundle
+        self._bundle = bundle
+        self.last_error = None
+
+    def _start_watcher(self) -> None:
+        if self._watcher is None:
+            self._watcher = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+            self._watcher.start()
+
+    def _watch(self) -> None:
+        while True:
+            time.sleep(self.poll_interval)
+            self._refresh()
+
+
+# Shared by all sessions served by this process
+model_registry = ModelRegistry()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Manage the local model registry")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List published versions")
+    promote_parser = subparsers.add_parser("promote", help="Make a version current")
+    promote_parser.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        current = read_current_version()
+        for manifest in list_versions():
+            marker = "*" if manifest['version'] == current else " "
+            print(f"{marker} {manifest['version']}  {manifest['created']}")
+    else:
+        set_current_version(args.version)
+        print(f"CURRENT -> {args.version}")
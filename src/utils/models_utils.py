@@ -3,14 +3,64 @@ Model loading and data preprocessing utilities
 """
 
 import streamlit as st
-import pandas as pd
 import pickle
-from typing import Dict, Any, List
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Any, List, Tuple
 
+from ..config.theme import MODEL_FILES
+from .metrics import timed, stage_timer
+from .model_registry import model_registry
+from .prediction_cache import prediction_cache
 
-@st.cache_data
+if TYPE_CHECKING:
+    import pandas as pd
+
+MODELS_DIR = Path('./models')
+
+# preprocessing_info['model_backend'] -> display name
+MODEL_BACKEND_LABELS = {
+    'random_forest': "Random Forest",
+    'hist_gradient_boosting': "Histogram Gradient Boosting",
+}
+
+
+def get_model_version() -> str:
+    """Fingerprint the model artifact so caches notice when it is retrained"""
+    stat = (MODELS_DIR / MODEL_FILES['model']).stat()
+    return f"{stat.st_mtime_ns:x}-{stat.st_size:x}"
+
+
+def model_backend(preprocessing_info: Dict[str, Any]) -> str:
+    """The artifact's model backend (artifacts without one are Random Forests)"""
+    return preprocessing_info.get('model_backend', 'random_forest')
+
+
+def uses_forest(preprocessing_info: Dict[str, Any]) -> bool:
+    """Whether tree-level features (attributions, incremental scoring) apply to this model"""
+    return model_backend(preprocessing_info) == 'random_forest'
+
+
+@timed("load_model")
 def load_model_and_info():
     """Load the trained model and preprocessing information"""
+    # Prefer the registry's CURRENT version; it is hot-swapped in the background
+    bundle = model_registry.current()
+    if bundle is not None:
+        return bundle.model, bundle.preprocessing_info, bundle.feature_names
+
+    # Fall back to the flat files in ./models
+    try:
+        model_version = get_model_version()
+    except FileNotFoundError:
+        st.error("❌ Model files not found! Please run 'train_and_save_model.py' first.")
+        st.stop()
+
+    return _load_model_artifacts(model_version)
+
+
+@st.cache_resource(max_entries=1)
+def _load_model_artifacts(model_version: str):
+    """Load the artifacts for one model version (re-run when the version changes)"""
     try:
         with open('./models/random_forest_model.pkl', 'rb') as f:
             model = pickle.load(f)
@@ -21,50 +71,95 @@ def load_model_and_info():
         with open('./models/feature_names.pkl', 'rb') as f:
             feature_names = pickle.load(f)
 
+        preprocessing_info['model_version'] = model_version
+
         return model, preprocessing_info, feature_names
     except FileNotFoundError:
         st.error("❌ Model files not found! Please run 'train_and_save_model.py' first.")
         st.stop()
 
 
-def preprocess_input(user_input: Dict[str, Any], preprocessing_info: Dict[str, Any]) -> pd.DataFrame:
+@timed("preprocess")
+def preprocess_input(user_input: Dict[str, Any], preprocessing_info: Dict[str, Any],
+                     count_unseen: bool = False) -> "pd.DataFrame":
     """Preprocess user input to match the training data format"""
-
-    # Create a DataFrame with the user input
-    input_df = pd.DataFrame([user_input])
-
-    # Get categorical columns that need one-hot encoding
-    categorical_columns = [
-        'Marital status', 'Application mode', 'Course', 'Daytime/evening attendance',
-        'Previous qualification', 'Nationality', 'Mothers qualification',
-        'Fathers qualification', 'Mothers occupation', 'Fathers occupation',
-        'Gender', 'Displaced', 'Educational special needs', 'Debtor',
-        'Tuition fees up to date', 'Scholarship holder', 'International',
-        'Application order'
-    ]
-
-    # Perform one-hot encoding for categorical columns
-    for column in categorical_columns:
-        if column in input_df.columns:
-            # Get dummies with prefix
-            dummies = pd.get_dummies(input_df[column], prefix=column)
-            # Concatenate with original data
-            input_df = pd.concat([input_df, dummies], axis=1)
-            # Drop original column
-            input_df.drop(columns=[column], inplace=True)
-
-    # Ensure all training features are present
-    feature_names = preprocessing_info['feature_names']
-
-    # Add missing columns with 0 values
-    for feature in feature_names:
-        if feature not in input_df.columns:
-            input_df[feature] = 0
-
-    # Select only the features used in training and in the same order
-    input_df = input_df[feature_names]
-
-    return input_df
+    # Imported here so the login page does not pay for pandas/numpy
+    import pandas as pd
+    from .encoding import get_encoder
+
+    # One-hot encode categorical fields into the training feature layout;
+    # missing or unseen categories stay 0 as with the old get_dummies path
+    # (unseen ones are counted when serving)
+    encoder = get_encoder(preprocessing_info)
+    return pd.DataFrame(encoder.encode_one(user_input, count_unseen), columns=encoder.feature_names, copy=False)
+
+
+def preprocess_batch(rows, preprocessing_info: Dict[str, Any], count_unseen: bool = False) -> "pd.DataFrame":
+    """Preprocess a DataFrame or list of user_input dicts in one vectorized pass"""
+    import pandas as pd
+    from .encoding import get_encoder
+
+    encoder = get_encoder(preprocessing_info)
+    if isinstance(rows, pd.DataFrame):
+        encoded = encoder.encode_frame(rows, count_unseen)
+    else:
+        encoded = encoder.encode_records(list(rows), count_unseen)
+    return pd.DataFrame(encoded, columns=encoder.feature_names, copy=False)
+
+
+def predict_probabilities(model, preprocessing_info: Dict[str, Any], processed) -> Any:
+    """Class probabilities for encoded rows, calibrated when the artifact has a calibrator"""
+    with stage_timer("predict_proba"):
+        probabilities = model.predict_proba(processed)
+    return calibrate_probabilities(preprocessing_info, probabilities)
+
+
+def calibrate_probabilities(preprocessing_info: Dict[str, Any], probabilities) -> Any:
+    """Apply the artifact's calibrator (if any) to raw forest probabilities"""
+    calibrator = preprocessing_info.get('calibrator')
+    if calibrator is not None:
+        from .calibration import apply_calibration
+        with stage_timer("calibrate"):
+            probabilities = apply_calibration(probabilities, calibrator)
+    return probabilities
+
+
+def predict_batch(model, preprocessing_info: Dict[str, Any], rows, count_unseen: bool = True) -> Tuple[List[str], Any]:
+    """Score many students at once; returns outcome labels and the probability matrix
+
+    count_unseen=False keeps non-served scoring (e.g. warm-up) out of the unseen-category counts.
+    """
+    processed = preprocess_batch(rows, preprocessing_info, count_unseen)
+    probabilities = predict_probabilities(model, preprocessing_info, processed)
+    target_reverse_mapping = preprocessing_info['target_reverse_mapping']
+    labels = [target_reverse_mapping[label] for label in model.classes_[probabilities.argmax(axis=1)]]
+    return labels, probabilities
+
+
+def predict_outcome(model, preprocessing_info: Dict[str, Any], user_input: Dict[str, Any],
+                    scorer=None, count_unseen: bool = True) -> Tuple[str, Any]:
+    """Predict the outcome label and class probabilities, reusing cached results
+
+    With a session's IncrementalScorer, only the trees affected by the fields that
+    changed since its last student are re-traversed. count_unseen=False keeps
+    non-served scoring (e.g. warm-up) out of the unseen-category counts.
+    """
+    model_version = preprocessing_info.get('model_version', 'unversioned')
+
+    def compute():
+        if scorer is not None:
+            with stage_timer("predict_incremental"):
+                raw_proba = scorer.score(user_input, count_unseen)
+            prediction_proba = calibrate_probabilities(preprocessing_info, raw_proba[None, :])[0]
+        else:
+            processed_input = preprocess_input(user_input, preprocessing_info, count_unseen)
+            prediction_proba = predict_probabilities(model, preprocessing_info, processed_input)[0]
+        # Most probable (calibrated) class, without a second pass over the forest
+        prediction = model.classes_[prediction_proba.argmax()]
+        prediction_proba.flags.writeable = False
+        return preprocessing_info['target_reverse_mapping'][prediction], prediction_proba
+
+    return prediction_cache.get_or_compute(user_input, model_version, compute)
 
 
 def validate_input(user_input: Dict[str, Any]) -> List[str]:
@@ -84,6 +179,14 @@ def validate_input(user_input: Dict[str, Any]) -> List[str]:
     return validation_issues
 
 
+def unseen_categories(user_input: Dict[str, Any], preprocessing_info: Dict[str, Any]) -> List[str]:
+    """Warnings for fields whose value was never seen in training (the model reads them as all-zero)"""
+    from .encoding import get_encoder
+
+    return [f"⚠️ {field} code {value} was not seen in training; the model treats it as none of the known values"
+            for field, value in get_encoder(preprocessing_info).unseen_fields(user_input).items()]
+
+
 def generate_recommendations(predicted_outcome: str, user_input: Dict[str, Any]) -> List[str]:
     """Generate personalized recommendations based on prediction and input"""
     recommendations = []
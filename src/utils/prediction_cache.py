@@ -0,0 +1,112 @@
+"""
+Process-wide LRU cache for prediction results
+Identical inputs scored by the same model version skip preprocessing and inference
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from ..config.settings import PREDICTION_CACHE_SIZE
+from .metrics import metrics
+
+
+def _json_default(value: Any) -> Any:
+    """Convert numpy scalars and other non-JSON values to plain Python"""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def make_cache_key(user_input: Dict[str, Any], model_version: str) -> str:
+    """Build a stable hash of the normalized input and the model version"""
+    # Keys are sorted so field order does not matter; int vs float stays distinct
+    # because the one-hot column names depend on it.
+    canonical = json.dumps(
+        {'model_version': model_version, 'input': user_input},
+        sort_keys=True,
+        separators=(',', ':'),
+        default=_json_default
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class PredictionCache:
+    """Bounded, thread-safe LRU cache invalidated when the model version changes"""
+
+    def __init__(self, maxsize: int = PREDICTION_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._model_version: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _check_version(self, model_version: str) -> None:
+        """Drop every entry when a different model version shows up"""
+        if model_version != self._model_version:
+            self._entries.clear()
+            self._model_version = model_version
+
+    def get(self, key: str, model_version: str) -> Optional[Any]:
+        """Return the cached value for a key, or None on a miss"""
+        with self._lock:
+            self._check_version(model_version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, model_version: str, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full"""
+        with self._lock:
+            self._check_version(model_version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, user_input: Dict[str, Any], model_version: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached result for this input, computing it on a miss"""
+        key = make_cache_key(user_input, model_version)
+        value = self.get(key, model_version)
+        if value is None:
+            value = compute()
+            self.put(key, model_version, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'model_version': self._model_version,
+            }
+
+
+# Shared across all Streamlit sessions served by this process
+prediction_cache = PredictionCache()
+
+metrics.register_gauge("prediction_cache_hits_total", "Prediction cache hits",
+                       lambda: prediction_cache.hits, "counter")
+metrics.register_gauge("prediction_cache_misses_total", "Prediction cache misses",
+                       lambda: prediction_cache.misses, "counter")
+metrics.register_gauge("prediction_cache_entries", "Entries held in the prediction cache",
+                       lambda: prediction_cache.stats()['size'])
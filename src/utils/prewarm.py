@@ -0,0 +1,39 @@
+"""
+Background pre-warming of heavy modules
+pandas, plotly.express and scikit-learn are imported lazily; once a user is past
+the login page they are loaded in a background thread before they are needed.
+"""
+
+import importlib
+import threading
+
+HEAVY_MODULES = (
+    "numpy",
+    "pandas",
+    "plotly.express",
+    "plotly.graph_objects",
+    "sklearn.ensemble",
+)
+
+_started = False
+_lock = threading.Lock()
+
+
+def _import_all() -> None:
+    for module_name in HEAVY_MODULES:
+        try:
+            importlib.import_module(module_name)
+        except ImportError:
+            # The first real use will surface the error in context
+            pass
+
+
+def prewarm_heavy_modules() -> None:
+    """Start importing heavy modules in a daemon thread (once per process)"""
+    global _started
+    if _started:
+        return
+    with _lock:
+        if not _started:
+            threading.Thread(target=_import_all, name="module-prewarm", daemon=True).start()
+            _started = True
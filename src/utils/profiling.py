@@ -0,0 +1,144 @@
+"""
+Single-rerun profiling for admins
+Samples only the calling session's script thread, so other users' sessions are never profiled
+"""
+
+import functools
+import marshal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import streamlit as st
+
+from .auth import check_role_permission
+
+# cProfile on Python 3.12+ hooks the whole interpreter (sys.monitoring) and would
+# record every session's thread, so a per-thread stack sampler is used instead.
+SAMPLE_INTERVAL = 0.001
+
+FunctionKey = Tuple[str, int, str]
+
+
+class ThreadSampler:
+    """Periodically samples the Python stack of a single thread"""
+
+    def __init__(self, thread_id: int, interval: float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rerun-profiler", daemon=True)
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._started
+        return False
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            if stack:
+                # Stored root first
+                self.stacks[tuple(reversed(stack))] += 1
+
+    @property
+    def seconds_per_sample(self) -> float:
+        total = sum(self.stacks.values())
+        return self.duration / total if total else 0.0
+
+    def function_stats(self) -> Dict[FunctionKey, Dict[str, Any]]:
+        """Aggregate samples into self/cumulative counts and caller edges per function"""
+        stats: Dict[FunctionKey, Dict[str, Any]] = {}
+        for stack, count in self.stacks.items():
+            for key in set(stack):
+                entry = stats.setdefault(key, {'self': 0, 'cumulative': 0, 'callers': Counter()})
+                entry['cumulative'] += count
+            stats[stack[-1]]['self'] += count
+            for caller, callee in zip(stack, stack[1:]):
+                stats[callee]['callers'][caller] += count
+        return stats
+
+    def top_functions(self, limit: int = 25) -> List[Dict[str, Any]]:
+        """Functions ordered by cumulative sampled time"""
+        dt = self.seconds_per_sample
+        rows = [
+            {
+                'function': name,
+                'location': f"{filename}:{lineno}",
+                'cumulative_ms': entry['cumulative'] * dt * 1000,
+                'self_ms': entry['self'] * dt * 1000,
+                'samples': entry['cumulative'],
+            }
+            for (filename, lineno, name), entry in self.function_stats().items()
+        ]
+        rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+        return rows[:limit]
+
+    def to_pstats(self) -> bytes:
+        """Serialize as a marshal'd pstats dict (loadable by pstats/snakeviz)"""
+        dt = self.seconds_per_sample
+        raw = {}
+        for key, entry in self.function_stats().items():
+            callers = {
+                caller: (count, count, 0.0, count * dt)
+                for caller, count in entry['callers'].items()
+            }
+            raw[key] = (entry['cumulative'], entry['cumulative'], entry['self'] * dt,
+                        entry['cumulative'] * dt, callers)
+        return marshal.dumps(raw)
+
+    def to_folded(self) -> str:
+        """Collapsed stacks for flamegraph.pl / speedscope"""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            frames = ';'.join(f"{name} ({filename.rsplit('/', 1)[-1]}:{lineno})" for filename, lineno, name in stack)
+            lines.append(f"{frames} {count}")
+        return '\n'.join(lines) + '\n'
+
+
+def request_profile() -> None:
+    """Ask for the next rerun of this session to be profiled (admin only)"""
+    if check_role_permission("admin"):
+        st.session_state['profile_next_run'] = True
+
+
+def profile_if_requested(func):
+    """Decorator that profiles one call when this admin session asked for it"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        requested = st.session_state.pop('profile_next_run', False)
+        if not (requested and check_role_permission("admin")):
+            return func(*args, **kwargs)
+
+        sampler = ThreadSampler(threading.get_ident())
+        try:
+            with sampler:
+                return func(*args, **kwargs)
+        finally:
+            st.session_state['last_profile'] = {
+                'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'duration': sampler.duration,
+                'samples': sum(sampler.stacks.values()),
+                'top_functions': sampler.top_functions(),
+                'pstats': sampler.to_pstats(),
+                'folded': sampler.to_folded(),
+            }
+            st.toast("⏱️ Rerun profiled - open the Profiling panel to view it")
+
+    return wrapper
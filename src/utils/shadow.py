@@ -0,0 +1,202 @@
+"""
+Shadow scoring of a candidate model on live traffic
+After a prediction has been shown, the student is queued for a background thread that
+scores it with a candidate registry version, calibrated as the app would serve it.
+Agreement with production and the probability deltas are aggregated in fixed-size
+counters plus a short list of recent disagreements, so memory stays bounded however
+long it runs. A full queue drops work rather than blocking the request.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import (
+    SHADOW_BATCH_SIZE,
+    SHADOW_MODEL_VERSION,
+    SHADOW_QUEUE_SIZE,
+    SHADOW_RECENT_DISAGREEMENTS
+)
+from .metrics import metrics
+
+# Upper edges of the max-|delta| histogram buckets
+DELTA_BUCKETS = (0.01, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+
+class ShadowStats:
+    """Bounded running comparison of production and candidate predictions"""
+
+    def __init__(self, classes: List[str], recent: int = SHADOW_RECENT_DISAGREEMENTS):
+        self.classes = list(classes)
+        n_classes = len(self.classes)
+        self.scored = 0
+        self.agreed = 0
+        # confusion[production][candidate]
+        self.confusion = [[0] * n_classes for _ in range(n_classes)]
+        self.delta_sum = [0.0] * n_classes
+        self.abs_delta_sum = [0.0] * n_classes
+        self.max_abs_delta = 0.0
+        self.delta_histogram = [0] * len(DELTA_BUCKETS)
+        self.recent = deque(maxlen=recent)
+
+    def update(self, production: List[float], candidate: List[float]) -> None:
+        production_index = max(range(len(production)), key=production.__getitem__)
+        candidate_index = max(range(len(candidate)), key=candidate.__getitem__)
+        deltas = [c - p for p, c in zip(production, candidate)]
+        largest = max(abs(delta) for delta in deltas)
+
+        self.scored += 1
+        self.agreed += production_index == candidate_index
+        self.confusion[production_index][candidate_index] += 1
+        for i, delta in enumerate(deltas):
+            self.delta_sum[i] += delta
+            self.abs_delta_sum[i] += abs(delta)
+        self.max_abs_delta = max(self.max_abs_delta, largest)
+        self.delta_histogram[next(i for i, edge in enumerate(DELTA_BUCKETS) if largest <= edge)] += 1
+
+        if production_index != candidate_index:
+            self.recent.append({
+                'time': time.strftime('%H:%M:%S'),
+                'production': self.classes[production_index],
+                'candidate': self.classes[candidate_index],
+                'production_p': production[production_index],
+                'candidate_p': candidate[candidate_index],
+            })
+
+    def snapshot(self) -> Dict[str, Any]:
+        n = max(self.scored, 1)
+        return {
+            'classes': self.classes,
+            'scored': self.scored,
+            'agreement': self.agreed / n if self.scored else None,
+            'confusion': [row[:] for row in self.confusion],
+            'mean_delta': [value / n for value in self.delta_sum],
+            'mean_abs_delta': [value / n for value in self.abs_delta_sum],
+            'max_abs_delta': self.max_abs_delta,
+            'delta_histogram': list(zip(DELTA_BUCKETS, self.delta_histogram)),
+            'recent_disagreements': list(self.recent),
+        }
+
+
+class ShadowScorer:
+    """Queues served predictions and scores them with a candidate model in the background"""
+
+    def __init__(self, candidate_version: Optional[str] = SHADOW_MODEL_VERSION, queue_size: int = SHADOW_QUEUE_SIZE,
+                 batch_size: int = SHADOW_BATCH_SIZE):
+        self.candidate_version = candidate_version
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.last_error: Optional[str] = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._stats: Optional[ShadowStats] = None
+        self._stats_key = None
+        self._candidate = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.candidate_version is not None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def set_candidate(self, version: Optional[str]) -> None:
+        """Shadow a different registry version (None turns shadow mode off); resets the stats"""
+        with self._lock:
+            self.candidate_version = version
+            self._stats = None
+            self._stats_key = None
+            self.last_error = None
+
+    def submit(self, user_input: Dict[str, Any], preprocessing_info: Dict[str, Any], probabilities: Any) -> None:
+        """Queue one served prediction; returns immediately and drops it if the queue is full"""
+        if self.candidate_version is None:
+            return
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait((dict(user_input), preprocessing_info.get('model_version', 'unversioned'),
+                                    preprocessing_info['target_reverse_mapping'], [float(p) for p in probabilities]))
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self) -> Optional[Dict[str, Any]]:
+        """Snapshot of the current comparison (None before anything was scored)"""
+        with self._lock:
+            if self._stats is None:
+                return None
+            snapshot = self._stats.snapshot()
+            snapshot['production_version'], snapshot['candidate_version'] = self._stats_key
+            return snapshot
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._score(batch)
+            except Exception as e:  # a broken candidate must never take the app down
+                self.last_error = f"{type(e).__name__}: {e}"
+
+    def _load_candidate(self, version: str):
+        """The candidate bundle, loaded (and checksum-verified) on this thread"""
+        if self._candidate is None or self._candidate.version != version:
+            from .model_registry import load_version
+            self._candidate = load_version(version)
+        return self._candidate
+
+    def _score(self, batch) -> None:
+        import pandas as pd
+        from .calibration import apply_calibration
+        from .encoding import get_encoder
+
+        version = self.candidate_version
+        if version is None:
+            return
+        candidate = self._load_candidate(version)
+        info = candidate.preprocessing_info
+
+        encoder = get_encoder(info)
+        processed = pd.DataFrame(encoder.encode_records([entry[0] for entry in batch]),
+                                 columns=encoder.feature_names, copy=False)
+        probabilities = candidate.model.predict_proba(processed)
+        if info.get('calibrator') is not None:
+            probabilities = apply_calibration(probabilities, info['calibrator'])
+        candidate_outcomes = [info['target_reverse_mapping'][label] for label in candidate.model.classes_]
+
+        with self._lock:
+            if version != self.candidate_version:
+                return  # switched while scoring
+            for (_, production_version, reverse_mapping, production), row in zip(batch, probabilities):
+                key = (production_version, version)
+                if key != self._stats_key:
+                    # A new production or candidate version starts a fresh comparison
+                    self._stats = ShadowStats([reverse_mapping[label] for label in sorted(reverse_mapping)])
+                    self._stats_key = key
+                by_outcome = dict(zip(candidate_outcomes, row.tolist()))
+                self._stats.update(production, [by_outcome[outcome] for outcome in self._stats.classes])
+
+
+# Shared by all sessions served by this process
+shadow_scorer = ShadowScorer()
+
+metrics.register_gauge("shadow_scored_total", "Predictions re-scored by the shadow candidate",
+                       lambda: (shadow_scorer.stats() or {}).get('scored', 0), "counter")
+metrics.register_gauge("shadow_dropped_total", "Shadow requests dropped because the queue was full",
+                       lambda: shadow_scorer.dropped, "counter")
+metrics.register_gauge("shadow_agreement_ratio", "Share of shadow-scored predictions with the same label",
+                       lambda: (shadow_scorer.stats() or {}).get('agreement') or 0.0)
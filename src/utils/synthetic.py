@@ -0,0 +1,373 @@
+"""
+Synthetic student records for scale testing
+Learns per-class statistics from data/data.csv and samples new rows from them. No real
+record is ever copied. The model stores:
+- class priors
+- smoothed frequencies over the code domains in src/config/mappings.py
+- conditional tables (attendance given course, international given nationality)
+- the joint distribution of the yearly economic indicators
+- a Gaussian copula (rank correlations plus 201-point quantile grids) over the
+  grades, age and curricular-unit counts
+Sampled rows are then fixed up so the curricular units stay consistent.
+
+Rows are produced in chunks. Chunk i always uses the i-th child of the seed's
+SeedSequence, so the output depends only on the seed and the chunk size, never on the
+number of worker processes.
+
+Usage (from the project root):
+    python -m src.utils.synthetic --rows 10000000 --out data/synthetic.csv --seed 42 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.mappings import create_feature_mappings
+from .dataset import DATA_PATH, clean_column_names, load_dataset
+
+# Categorical fields sampled from smoothed class-conditional frequencies over their
+# code domain (mapping keys plus any code seen in the data)
+CODE_DOMAINS = {
+    'Marital status': 'marital_status',
+    'Application mode': 'application_mode',
+    'Course': 'course',
+    'Previous qualification': 'qualification',
+    'Mothers qualification': 'qualification',
+    'Fathers qualification': 'qualification',
+    'Mothers occupation': 'occupation',
+    'Fathers occupation': 'occupation',
+    'Nationality': 'nationality',
+}
+OBSERVED_CATEGORICALS = (
+    'Application order', 'Gender', 'Displaced', 'Educational special needs', 'Debtor',
+    'Tuition fees up to date', 'Scholarship holder',
+)
+
+# child field -> parent field it is sampled conditionally on
+CONDITIONAL_FIELDS = {
+    'Daytime/evening attendance': 'Course',
+    'International': 'Nationality',
+}
+
+# One value per academic year in the source data, so sampled as whole triples
+ECONOMIC_FIELDS = ('Unemployment rate', 'Inflation rate', 'GDP')
+
+SEMESTERS = ('1st', '2nd')
+CURRICULAR_COUNTS = ('credited', 'enrolled', 'evaluations', 'approved', 'without evaluations')
+
+
+def _unit_column(semester: str, name: str) -> str:
+    """Form field name of one semester's curricular-unit count or grade"""
+    return f'Curricular units {semester} sem ({name})'
+
+
+# Gaussian-copula fields; `discrete` ones map back to observed values, the rest interpolate
+COPULA_FIELDS = (
+    ('Previous qualification (grade)', False),
+    ('Admission grade', False),
+    ('Age at enrollment', True),
+    *((_unit_column(s, count), True) for s in SEMESTERS for count in CURRICULAR_COUNTS),
+    *((_unit_column(s, 'grade'), False) for s in SEMESTERS),
+)
+
+QUANTILE_POINTS = 201
+
+
+def _frequencies(values: np.ndarray, domain: Optional[np.ndarray], alpha: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Observed frequencies, additively smoothed over the domain when one is given"""
+    observed, counts = np.unique(values, return_counts=True)
+    if domain is None:
+        return observed, counts / counts.sum()
+
+    support = np.union1d(domain, observed)
+    weights = np.full(len(support), alpha, dtype=np.float64)
+    weights[np.searchsorted(support, observed)] += counts
+    return support, weights / weights.sum()
+
+
+def _choice(rng: np.random.Generator, table: Tuple[np.ndarray, np.ndarray], size: int) -> np.ndarray:
+    values, probabilities = table
+    return values[np.searchsorted(np.cumsum(probabilities), rng.random(size), side='right').clip(0, len(values) - 1)]
+
+
+def _normal_scores(values: np.ndarray) -> np.ndarray:
+    """Map a column to standard-normal scores through its mid-ranks"""
+    from scipy.special import ndtri
+    from scipy.stats import rankdata
+
+    return ndtri((rankdata(values) - 0.5) / len(values))
+
+
+class SyntheticModel:
+    """Per-class statistics of the dataset and a vectorized sampler"""
+
+    def __init__(self, columns, classes, class_probabilities, per_class, conditionals):
+        self.columns = columns                          # original CSV header names, in order
+        self.classes = classes
+        self.class_probabilities = class_probabilities
+        self.per_class = per_class
+        self.conditionals = conditionals
+
+    @classmethod
+    def fit(cls, data, alpha: float = 0.1, header: Optional[List[str]] = None) -> "SyntheticModel":
+        """Learn the statistics from a DataFrame loaded with load_dataset (cleaned names)"""
+        import pandas as pd
+
+        # Work on stripped names; remember how they map back to the CSV header
+        renames = {column: column.strip() for column in data.columns}
+        data = data.rename(columns=renames)
+        data = data.apply(lambda column: column.astype(column.cat.categories.dtype)
+                          if isinstance(column.dtype, pd.CategoricalDtype) else column)
+
+        mappings = create_feature_mappings()
+        classes, class_counts = np.unique(data['Target'].to_numpy(), return_counts=True)
+
+        per_class = {}
+        for label in classes:
+            subset = data[data['Target'] == label]
+            categorical = {
+                field: _frequencies(subset[field].to_numpy(), np.array(sorted(mappings[key])), alpha)
+                for field, key in CODE_DOMAINS.items()
+            }
+            categorical.update({field: _frequencies(subset[field].to_numpy(), None, alpha)
+                                for field in OBSERVED_CATEGORICALS})
+
+            economic = subset[list(ECONOMIC_FIELDS)].value_counts(normalize=True, sort=False)
+
+            copula_values = subset[[field for field, _ in COPULA_FIELDS]].to_numpy(dtype=np.float64)
+            scores = np.column_stack([_normal_scores(column) for column in copula_values.T])
+            correlation = np.corrcoef(scores, rowvar=False)
+            correlation = np.nan_to_num(correlation, nan=0.0)
+            np.fill_diagonal(correlation, 1.0)
+            # Nearest positive-definite matrix, so the Cholesky factor exists
+            eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+            correlation = (eigenvectors * np.clip(eigenvalues, 1e-6, None)) @ eigenvectors.T
+            scale = np.sqrt(np.diag(correlation))
+            correlation = correlation / np.outer(scale, scale)
+
+            points = np.linspace(0.0, 1.0, QUANTILE_POINTS)
+            grids = np.empty((len(COPULA_FIELDS), QUANTILE_POINTS))
+            for j, (field, discrete) in enumerate(COPULA_FIELDS):
+                grids[j] = np.quantile(copula_values[:, j], points, method='inverted_cdf' if discrete else 'linear')
+
+            # Grades are 0 exactly when nothing was approved; keep the positive part separately
+            positive_grades = {}
+            for semester in SEMESTERS:
+                grades = subset[_unit_column(semester, 'grade')].to_numpy(dtype=np.float64)
+                grades = grades[grades > 0]
+                positive_grades[semester] = np.quantile(grades, points) if len(grades) else np.zeros(QUANTILE_POINTS)
+
+            per_class[label] = {
+                'categorical': categorical,
+                'economic': (np.array(economic.index.tolist()), economic.to_numpy()),
+                'copula_cholesky': np.linalg.cholesky(correlation),
+                'copula_grids': grids,
+                'positive_grades': positive_grades,
+            }
+
+        # child -> (table per parent value, pooled table for parent values never observed)
+        conditionals = {}
+        for child, parent in CONDITIONAL_FIELDS.items():
+            by_parent = {
+                parent_value: _frequencies(group.to_numpy(), None, alpha)
+                for parent_value, group in data.groupby(parent, observed=True)[child]
+            }
+            conditionals[child] = (by_parent, _frequencies(data[child].to_numpy(), None, alpha))
+
+        # Pair every field with its name in the CSV header, so output matches data.csv
+        inverse = {stripped: original for original, stripped in renames.items()}
+        header = header if header is not None else _csv_header()
+        cleaned_to_csv = {cleaned: raw for raw, cleaned in clean_column_names(header).items()}
+        columns = [(cleaned_to_csv.get(inverse[c], inverse[c]), c) for c in data.columns]
+        return cls(columns, classes, class_counts / class_counts.sum(), per_class, conditionals)
+
+    def sample(self, n_rows: int, rng: np.random.Generator):
+        """Draw n_rows synthetic rows as a DataFrame with the CSV's header"""
+        import pandas as pd
+        from scipy.special import ndtr
+
+        labels = _choice(rng, (np.arange(len(self.classes)), self.class_probabilities), n_rows)
+        columns: Dict[str, np.ndarray] = {field: np.zeros(n_rows, dtype=np.int64)
+                                          for field in (*CODE_DOMAINS, *OBSERVED_CATEGORICALS)}
+        columns.update({field: np.zeros(n_rows) for field in ECONOMIC_FIELDS})
+        columns.update({field: np.zeros(n_rows) for field, _ in COPULA_FIELDS})
+        # Copula position of each semester's grade, reused for the positive-grade draw
+        grade_positions = {semester: np.zeros(n_rows) for semester in SEMESTERS}
+
+        for c, label in enumerate(self.classes):
+            rows = np.flatnonzero(labels == c)
+            if len(rows) == 0:
+                continue
+            params = self.per_class[label]
+
+            for field, table in params['categorical'].items():
+                columns[field][rows] = _choice(rng, table, len(rows))
+
+            triples, probabilities = params['economic']
+            picked = triples[_choice(rng, (np.arange(len(triples)), probabilities), len(rows))]
+            for j, field in enumerate(ECONOMIC_FIELDS):
+                columns[field][rows] = picked[:, j]
+
+            # Correlated uniforms from the copula, mapped through each field's quantile grid
+            normals = rng.standard_normal((len(rows), len(COPULA_FIELDS))) @ params['copula_cholesky'].T
+            positions = ndtr(normals) * (QUANTILE_POINTS - 1)
+            for j, (field, discrete) in enumerate(COPULA_FIELDS):
+                grid = params['copula_grids'][j]
+                if discrete:
+                    columns[field][rows] = grid[np.rint(positions[:, j]).astype(np.intp)]
+                else:
+                    columns[field][rows] = np.interp(positions[:, j], np.arange(QUANTILE_POINTS), grid)
+
+            for semester in SEMESTERS:
+                j = [field for field, _ in COPULA_FIELDS].index(_unit_column(semester, 'grade'))
+                grade_positions[semester][rows] = positions[:, j]
+
+        for child, parent in CONDITIONAL_FIELDS.items():
+            tables, pooled = self.conditionals[child]
+            parents = columns[parent]
+            values = np.zeros(n_rows, dtype=np.int64)
+            for parent_value in np.unique(parents):
+                rows = np.flatnonzero(parents == parent_value)
+                # Codes only reachable through smoothing fall back to the child's overall mix
+                table = tables.get(parent_value, pooled)
+                values[rows] = _choice(rng, table, len(rows))
+            columns[child] = values
+
+        self._apply_constraints(columns, labels, grade_positions)
+
+        columns['Target'] = self.classes[labels]
+        return pd.DataFrame({csv_name: columns[field] for csv_name, field in self.columns})
+
+    def _apply_constraints(self, columns: Dict[str, np.ndarray], labels: np.ndarray,
+                           grade_positions: Dict[str, np.ndarray]) -> None:
+        """Make the curricular units internally consistent, as they are in the real data"""
+        for semester in SEMESTERS:
+            column = {name: _unit_column(semester, name) for name in (*CURRICULAR_COUNTS, 'grade')}
+
+            enrolled = np.maximum(columns[column['enrolled']], columns[column['credited']])
+            approved = np.minimum(columns[column['approved']], enrolled)
+            evaluations = np.where(enrolled > 0, np.maximum(columns[column['evaluations']], approved), 0)
+            columns[column['enrolled']] = enrolled
+            columns[column['approved']] = approved
+            columns[column['evaluations']] = evaluations
+            columns[column['without evaluations']] = np.minimum(columns[column['without evaluations']], enrolled)
+
+            # Grade is 0 exactly when nothing was approved; otherwise from the positive grades
+            grade = np.zeros(len(labels))
+            for c, label in enumerate(self.classes):
+                rows = np.flatnonzero((labels == c) & (approved > 0))
+                grid = self.per_class[label]['positive_grades'][semester]
+                grade[rows] = np.interp(grade_positions[semester][rows], np.arange(QUANTILE_POINTS), grid)
+            columns[column['grade']] = np.round(grade, 6)
+
+        for name in ('Previous qualification (grade)', 'Admission grade'):
+            columns[name] = np.round(columns[name], 1)
+        for name, discrete in COPULA_FIELDS:
+            if discrete:
+                columns[name] = columns[name].astype(np.int64)
+
+
+def _csv_header(csv_path=DATA_PATH):
+    import pandas as pd
+    return list(pd.read_csv(csv_path, nrows=0).columns)
+
+
+def fit_from_csv(csv_path=DATA_PATH, alpha: float = 0.1) -> SyntheticModel:
+    """Fit the generator on the (cached, typed) dataset"""
+    return SyntheticModel.fit(load_dataset(csv_path=csv_path), alpha=alpha, header=_csv_header(csv_path))
+
+
+# ----------------------------------------------------------------------- chunked sampling
+
+_worker_model: Optional[SyntheticModel] = None
+
+
+def _init_worker(model: SyntheticModel) -> None:
+    global _worker_model
+    _worker_model = model
+
+
+def _sample_chunk(size: int, seed: np.random.SeedSequence, as_csv: bool):
+    frame = _worker_model.sample(size, np.random.default_rng(seed))
+    if not as_csv:
+        return frame
+
+    # Arrow's CSV writer is several times faster than DataFrame.to_csv, which dominates otherwise
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    sink = pa.BufferOutputStream()
+    pa_csv.write_csv(pa.Table.from_pandas(frame, preserve_index=False), sink,
+                     pa_csv.WriteOptions(include_header=False, quoting_style='none'))
+    return sink.getvalue().to_pybytes()
+
+
+def _chunk_plan(n_rows: int, seed: int, chunk_size: int):
+    n_chunks = max(1, -(-n_rows // chunk_size))
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    sizes = [min(chunk_size, n_rows - i * chunk_size) for i in range(n_chunks)]
+    return list(zip(sizes, seeds))
+
+
+def _iter_chunks(model: SyntheticModel, n_rows: int, seed: int, chunk_size: int, workers: int, as_csv: bool):
+    plan = _chunk_plan(n_rows, seed, chunk_size)
+    if workers <= 1:
+        _init_worker(model)
+        for size, child in plan:
+            yield _sample_chunk(size, child, as_csv)
+        return
+
+    # Ordered results with a bounded number of chunks in flight
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as executor:
+        pending = deque()
+        for size, child in plan:
+            pending.append(executor.submit(_sample_chunk, size, child, as_csv))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def iter_synthetic_chunks(n_rows: int, seed: int = 0, chunk_size: int = 100_000, workers: int = 1,
+                          model: Optional[SyntheticModel] = None) -> Iterator[Any]:
+    """Yield DataFrames of synthetic rows (CSV column names) totalling n_rows"""
+    model = model or fit_from_csv()
+    yield from _iter_chunks(model, n_rows, seed, chunk_size, workers, as_csv=False)
+
+
+def write_synthetic_csv(path, n_rows: int, seed: int = 0, chunk_size: int = 100_000, workers: int = 1,
+                        model: Optional[SyntheticModel] = None, csv_path=DATA_PATH) -> None:
+    """Stream n_rows synthetic rows to a CSV with the source CSV's header (formatting runs in the workers)"""
+    model = model or fit_from_csv(csv_path)
+    with open(csv_path, 'rb') as source:
+        header = source.readline().removeprefix(b'\xef\xbb\xbf')
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        for block in _iter_chunks(model, n_rows, seed, chunk_size, workers, as_csv=True):
+            f.write(block)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic student records shaped like data/data.csv")
+    parser.add_argument("--rows", type=int, required=True, help="Number of rows to generate")
+    parser.add_argument("--out", required=True, help="Output CSV path")
+    parser.add_argument("--seed", type=int, default=0, help="Seed (output depends only on seed and chunk size)")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="Rows per chunk")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    write_synthetic_csv(args.out, args.rows, seed=args.seed, chunk_size=args.chunk_size, workers=args.workers)
+    elapsed = time.perf_counter() - start
+    print(f"Wrote {args.rows:,} rows to {args.out} in {elapsed:.1f}s ({args.rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Model warm-up at server start
+Loads the model artifacts, compiles the encoder and scores the preset students so the
+first real request pays for neither unpickling nor first-call overheads.
+"""
+
+import logging
+import time
+from typing import Any, Dict, List
+
+from ..config.mappings import ACADEMIC_DEFAULTS, PRESET_CONFIGURATIONS
+from .model_registry import model_registry
+
+logger = logging.getLogger(__name__)
+
+# Form defaults for the fields the presets do not set (see form_components)
+FORM_DEFAULTS = {
+    'Nationality': 1,
+    'Application order': 1,
+    'Daytime/evening attendance': 0,
+    'Previous qualification': 1,
+    'Unemployment rate': 10.8,
+    'Inflation rate': 1.4,
+    'GDP': 1.74,
+}
+
+
+def preset_user_input(preset: str) -> Dict[str, Any]:
+    """Build the user_input dict the sidebar form produces for a preset"""
+    defaults = PRESET_CONFIGURATIONS[preset]
+    academic = ACADEMIC_DEFAULTS[preset]
+
+    user_input = {
+        **FORM_DEFAULTS,
+        'Marital status': defaults['marital'],
+        'Gender': defaults['gender'],
+        'Age at enrollment': defaults['age'],
+        'Application mode': defaults['app_mode'],
+        'Course': defaults['course'],
+        'Previous qualification (grade)': defaults['prev_grade'],
+        'Admission grade': defaults['adm_grade'],
+        'Mothers qualification': defaults['mothers_qualification'],
+        'Fathers qualification': defaults['fathers_qualification'],
+        'Mothers occupation': defaults['mothers_occupation'],
+        'Fathers occupation': defaults['fathers_occupation'],
+        'Displaced': defaults['displaced'],
+        'Educational special needs': defaults['educational_special_needs'],
+        'Debtor': defaults['debtor'],
+        'Tuition fees up to date': defaults['tuition_fees_up_to_date'],
+        'Scholarship holder': defaults['scholarship_holder'],
+        'International': defaults['international'],
+    }
+    for semester, label in (('1st_sem', '1st sem'), ('2nd_sem', '2nd sem')):
+        for key, field in (('credited', 'credited'), ('enrolled', 'enrolled'), ('evaluations', 'evaluations'),
+                           ('approved', 'approved'), ('grade', 'grade'), ('without', 'without evaluations')):
+            user_input[f'Curricular units {label} ({field})'] = academic[semester][key]
+    return user_input
+
+
+def preset_inputs() -> List[Dict[str, Any]]:
+    """user_input dicts for every preset, in selector order"""
+    return [preset_user_input(preset) for preset in PRESET_CONFIGURATIONS]
+
+
+def _load_artifacts():
+    """Load through the same holders load_model_and_info uses, without st.error/st.stop"""
+    bundle = model_registry.current()
+    if bundle is not None:
+        return bundle.model, bundle.preprocessing_info
+
+    from .models_utils import _load_model_artifacts, get_model_version
+    model, preprocessing_info, _ = _load_model_artifacts(get_model_version())
+    return model, preprocessing_info
+
+
+def warm_up() -> Dict[str, float]:
+    """Load the model and run a warm-up batch; returns stage timings in milliseconds"""
+    from .encoding import get_encoder
+    from .models_utils import predict_batch, predict_outcome
+
+    timings = {}
+    start = time.perf_counter()
+
+    model, preprocessing_info = _load_artifacts()
+    timings['load_ms'] = (time.perf_counter() - start) * 1000
+
+    stage = time.perf_counter()
+    get_encoder(preprocessing_info)
+    timings['encoder_ms'] = (time.perf_counter() - stage) * 1000
+
+    stage = time.perf_counter()
+    inputs = preset_inputs()
+    # Not served students, so kept out of the unseen-category counts
+    predict_batch(model, preprocessing_info, inputs, count_unseen=False)
+    # Single-row path too; this also seeds the prediction cache with the presets
+    for user_input in inputs:
+        predict_outcome(model, preprocessing_info, user_input, count_unseen=False)
+    timings['predict_ms'] = (time.perf_counter() - stage) * 1000
+
+    timings['total_ms'] = (time.perf_counter() - start) * 1000
+    logger.info(
+        "Model warm-up finished in %.1f ms (load %.1f ms, encoder %.1f ms, %d preset predictions %.1f ms), version %s",
+        timings['total_ms'], timings['load_ms'], timings['encoder_ms'], len(inputs), timings['predict_ms'],
+        preprocessing_info.get('model_version', 'unversioned')
+    )
+    return timings
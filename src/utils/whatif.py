@@ -0,0 +1,128 @@
+"""
+What-if sensitivity sweeps for a single student
+Varies one or two fields of a user_input over a grid of values. The student is
+encoded once, the row is copied for every variant, and only the swept fields'
+columns are rewritten. All variants are then scored with one predict_proba call.
+"""
+
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from .encoding import get_encoder
+
+# Numeric form fields and their input bounds (as in form_components)
+NUMERIC_SWEEP_RANGES = {
+    'Age at enrollment': (17, 70),
+    'Previous qualification (grade)': (95, 190),
+    'Admission grade': (95, 190),
+    'Curricular units 1st sem (enrolled)': (0, 26),
+    'Curricular units 1st sem (approved)': (0, 26),
+    'Curricular units 1st sem (credited)': (0, 26),
+    'Curricular units 1st sem (evaluations)': (0, 45),
+    'Curricular units 1st sem (grade)': (0, 20),
+    'Curricular units 1st sem (without evaluations)': (0, 14),
+    'Curricular units 2nd sem (enrolled)': (0, 23),
+    'Curricular units 2nd sem (approved)': (0, 20),
+    'Curricular units 2nd sem (credited)': (0, 20),
+    'Curricular units 2nd sem (evaluations)': (0, 33),
+    'Curricular units 2nd sem (grade)': (0, 20),
+    'Curricular units 2nd sem (without evaluations)': (0, 12),
+}
+
+# Coded fields whose labels come from create_feature_mappings()
+CODED_FIELDS = {
+    'Marital status': 'marital_status',
+    'Application mode': 'application_mode',
+    'Course': 'course',
+    'Previous qualification': 'qualification',
+    'Nationality': 'nationality',
+    'Mothers qualification': 'qualification',
+    'Fathers qualification': 'qualification',
+    'Mothers occupation': 'occupation',
+    'Fathers occupation': 'occupation',
+}
+
+FLAG_LABELS = {0: "No", 1: "Yes"}
+GENDER_LABELS = {0: "Female", 1: "Male"}
+
+
+def sweepable_fields(preprocessing_info: Dict[str, Any]) -> List[str]:
+    """Form fields whose value actually changes the model's input"""
+    encoder = get_encoder(preprocessing_info)
+    fields = [field for field in NUMERIC_SWEEP_RANGES if field in encoder.numeric_index]
+    fields += [field for field, mapping in encoder.onehot_index.items() if mapping]
+    # Backends that split on raw codes list the categories seen in training instead
+    fields += [field for field in preprocessing_info.get('category_values', {}) if field in encoder.numeric_index]
+    return fields
+
+
+def sweep_values(field: str, preprocessing_info: Dict[str, Any], n_points: int = 20) -> np.ndarray:
+    """Default grid for a field: up to n_points integer steps, or every category seen in training"""
+    if field in NUMERIC_SWEEP_RANGES:
+        low, high = NUMERIC_SWEEP_RANGES[field]
+        return np.unique(np.rint(np.linspace(low, high, n_points)))
+
+    category_values = preprocessing_info.get('category_values', {})
+    if field in category_values:
+        return np.array(category_values[field])
+    mapping = get_encoder(preprocessing_info).onehot_index.get(field, {})
+    return np.array(sorted(value for value in mapping if isinstance(value, float)))
+
+
+def format_value(field: str, value: Any, feature_maps: Dict[str, Dict[int, str]]) -> str:
+    """Human-readable label for a swept value"""
+    code = int(value) if float(value).is_integer() else value
+    if field in CODED_FIELDS:
+        return feature_maps[CODED_FIELDS[field]].get(code, str(code))
+    if field == 'Gender':
+        return GENDER_LABELS.get(code, str(code))
+    if field not in NUMERIC_SWEEP_RANGES and code in FLAG_LABELS:
+        return FLAG_LABELS[code]
+    return str(code)
+
+
+def build_variant_batch(preprocessing_info: Dict[str, Any], user_input: Dict[str, Any],
+                        changes: Dict[str, np.ndarray]) -> np.ndarray:
+    """Encode copies of one student where each changed field takes its per-variant value"""
+    encoder = get_encoder(preprocessing_info)
+    n_variants = len(next(iter(changes.values())))
+
+    batch = np.repeat(encoder.encode_one(user_input), n_variants, axis=0)
+    for field, values in changes.items():
+        batch[:, encoder.field_indices(field)] = 0.0
+        batch += encoder.encode_columns({field: values}, n_variants)
+    return batch
+
+
+def build_sweep_batch(preprocessing_info: Dict[str, Any], user_input: Dict[str, Any],
+                      grid: Dict[str, Sequence[float]]) -> np.ndarray:
+    """Encode every combination of the grid's values as one (n_variants, n_features) matrix"""
+    axes = [np.asarray(values, dtype=np.float64) for values in grid.values()]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    return build_variant_batch(preprocessing_info, user_input,
+                               {field: values.ravel() for field, values in zip(grid, mesh)})
+
+
+def score_batch(model, preprocessing_info: Dict[str, Any], batch: np.ndarray) -> np.ndarray:
+    """Calibrated class probabilities for an encoded variant batch, in one predict_proba call"""
+    import pandas as pd
+    from .models_utils import predict_probabilities
+
+    feature_names = get_encoder(preprocessing_info).feature_names
+    return predict_probabilities(model, preprocessing_info, pd.DataFrame(batch, columns=feature_names, copy=False))
+
+
+def run_sweep(model, preprocessing_info: Dict[str, Any], user_input: Dict[str, Any],
+              grid: Dict[str, Sequence[float]]) -> Dict[str, Any]:
+    """Score every grid variant in one call; probabilities have shape (*grid_shape, n_classes)"""
+    probabilities = score_batch(model, preprocessing_info, build_sweep_batch(preprocessing_info, user_input, grid))
+
+    target_reverse_mapping = preprocessing_info['target_reverse_mapping']
+    shape = tuple(len(values) for values in grid.values())
+    return {
+        'fields': list(grid),
+        'values': [np.asarray(values, dtype=np.float64) for values in grid.values()],
+        'class_names': [target_reverse_mapping[label] for label in model.classes_],
+        'probabilities': probabilities.reshape(*shape, len(model.classes_)),
+    }
@@ -0,0 +1,46 @@
+"""
+Forest compression: tree selection needs the rows the forest was fitted on
+"""
+
+import unittest
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from src.utils.compression import compress_forest, training_fingerprint
+
+
+class CompressForestTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        X, y = make_classification(n_samples=300, n_features=8, n_informative=5, n_classes=3, random_state=0)
+        cls.X, cls.y = X.astype(np.float32), y
+        cls.model = RandomForestClassifier(n_estimators=20, random_state=0).fit(cls.X, cls.y)
+        cls.training_data = {'sha256': training_fingerprint(cls.X, cls.y), 'n_rows': len(cls.X),
+                             'warm_started': False}
+
+    def test_compresses_on_the_training_rows(self):
+        compressed, selection = compress_forest(self.model, self.X, self.y, tolerance=0.02, max_depth=6,
+                                                training_data=self.training_data)
+
+        self.assertEqual(len(compressed.estimators_), selection['n_selected'])
+        self.assertLessEqual(selection['n_selected'], 20)
+        self.assertEqual(compressed.predict_proba(self.X).shape, (300, 3))
+
+    def test_refuses_a_different_number_of_rows(self):
+        with self.assertRaises(ValueError):
+            compress_forest(self.model, self.X[:-1], self.y[:-1])
+
+    def test_refuses_rows_that_do_not_match_the_fingerprint(self):
+        order = np.random.default_rng(0).permutation(len(self.X))
+        with self.assertRaises(ValueError):
+            compress_forest(self.model, self.X[order], self.y[order], training_data=self.training_data)
+
+    def test_refuses_a_warm_started_forest(self):
+        with self.assertRaises(ValueError):
+            compress_forest(self.model, self.X, self.y, training_data={**self.training_data, 'warm_started': True})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""
+Compiled encoder: unseen category codes are counted on the serving path only
+"""
+
+import threading
+import unittest
+
+import numpy as np
+
+from src.utils.encoding import CompiledEncoder, unseen_category_counts
+
+FEATURE_NAMES = ['Course_1', 'Course_2', 'Gender_0', 'Gender_1', 'Age at enrollment']
+CATEGORICAL_COLUMNS = ('Course', 'Gender', 'Daytime/evening attendance')
+
+
+class UnseenCountTest(unittest.TestCase):
+    def setUp(self):
+        self.encoder = CompiledEncoder(FEATURE_NAMES, CATEGORICAL_COLUMNS)
+
+    def counts(self):
+        return self.encoder.unseen_by_field()
+
+    def test_unseen_code_encodes_as_zeros_and_is_counted_when_serving(self):
+        row = {'Course': 9, 'Gender': 1, 'Age at enrollment': 20, 'Daytime/evening attendance': 1}
+        with self.assertLogs('src.utils.encoding', level='WARNING'):
+            encoded = self.encoder.encode_one(row, count_unseen=True)
+
+        np.testing.assert_array_equal(encoded, [[0, 0, 0, 1, 20]])
+        # Attendance has no one-hot columns at all, so it is not a model input
+        self.assertEqual(self.counts(), {'Course': 1, 'Gender': 0, 'Daytime/evening attendance': 0})
+        self.assertGreaterEqual(unseen_category_counts()['Course'], 1)
+
+    def test_internal_encodes_are_not_counted(self):
+        rows = [{'Course': 9, 'Gender': 3, 'Age at enrollment': 20}] * 3
+        self.encoder.encode_one(rows[0])
+        self.encoder.encode_records(rows)
+        self.encoder.encode_columns({'Course': np.array([7.0, 1.0])}, 2)
+
+        self.assertEqual(sum(self.counts().values()), 0)
+
+    def test_batch_counts_match_single_rows(self):
+        rows = [{'Course': course, 'Gender': 0, 'Age at enrollment': 20} for course in (1, 5, 5, 2, 8)]
+        batch = self.encoder.encode_records(rows, count_unseen=True)
+        for row in rows:
+            self.encoder.encode_one(row, count_unseen=True)
+
+        np.testing.assert_array_equal(batch, np.vstack([self.encoder.encode_one(row) for row in rows]))
+        self.assertEqual(self.counts()['Course'], 6)
+
+    def test_concurrent_counts_are_not_lost(self):
+        row = {'Course': 9, 'Gender': 0}
+
+        def serve():
+            for _ in range(2000):
+                self.encoder.encode_one(row, count_unseen=True)
+
+        threads = [threading.Thread(target=serve) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.counts()['Course'], 8000)
+
+
+if __name__ == "__main__":
+    unittest.main()
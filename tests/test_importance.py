@@ -0,0 +1,42 @@
+"""
+Permutation importance is measured on the probabilities the app serves
+"""
+
+import unittest
+
+import numpy as np
+from sklearn.datasets import make_classification
+from sklearn.ensemble import RandomForestClassifier
+
+from src.utils.calibration import apply_calibration, fit_isotonic_calibrator
+from src.utils.importance import permutation_importance_by_field
+
+
+class PermutationImportanceTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        X, y = make_classification(n_samples=600, n_features=6, n_informative=4, n_classes=3, random_state=1)
+        X = X.astype(np.float32)
+        cls.X_train, cls.y_train, cls.X_test, cls.y_test = X[:400], y[:400], X[400:], y[400:]
+        cls.model = RandomForestClassifier(n_estimators=25, min_samples_leaf=5, random_state=0)
+        cls.model.fit(cls.X_train, cls.y_train)
+        cls.calibrator = fit_isotonic_calibrator(cls.model.predict_proba(cls.X_train), cls.y_train,
+                                                 cls.model.classes_)
+        cls.feature_names = [f"f{i}" for i in range(6)]
+
+    def importance(self, calibrator):
+        return permutation_importance_by_field(self.model, self.X_test, self.y_test, self.feature_names,
+                                               self.feature_names, n_jobs=1, calibrator=calibrator)
+
+    def test_baseline_is_the_served_accuracy(self):
+        served = apply_calibration(self.model.predict_proba(self.X_test), self.calibrator)
+        expected = np.mean(self.model.classes_[served.argmax(axis=1)] == self.y_test)
+
+        self.assertAlmostEqual(self.importance(self.calibrator)['baseline_accuracy'], expected)
+
+    def test_baseline_without_calibrator_is_the_raw_accuracy(self):
+        self.assertAlmostEqual(self.importance(None)['baseline_accuracy'], self.model.score(self.X_test, self.y_test))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""
+Incremental retraining: appended rows are encoded on top of the cached matrix
+"""
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from models import train_and_save_model as trainer
+from src.utils import dataset
+
+
+class IncrementalEncodingTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.csv = self.tmp / "students.csv"
+        shutil.copy(trainer.DATA_PATH, self.csv)
+        cache_dir = self.tmp / "cache"
+        for patch in (mock.patch.object(trainer, 'CACHE_DIR', cache_dir),
+                      mock.patch.object(trainer, 'CACHE_MANIFEST', cache_dir / "encoded.json"),
+                      mock.patch.object(dataset, 'CACHE_DIR', self.tmp / "data_cache")):
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def append_rows(self, n_rows):
+        last_line = self.csv.read_bytes().rstrip(b'\n').rsplit(b'\n', 1)[1]
+        with open(self.csv, 'ab') as f:
+            f.write((last_line + b'\n') * n_rows)
+
+    def test_single_appended_row_goes_to_train(self):
+        X, _, train_index, test_index = trainer.load_encoded_dataset(incremental=True, data_path=self.csv)
+        self.append_rows(1)
+
+        X_new, y_new, train_new, test_new = trainer.load_encoded_dataset(incremental=True, data_path=self.csv)
+
+        self.assertEqual(len(X_new), len(X) + 1)
+        self.assertEqual(len(y_new), len(X) + 1)
+        self.assertIn(len(X), set(train_new))
+        self.assertEqual(list(test_new), list(test_index))
+        self.assertEqual(list(train_new[:len(train_index)]), list(train_index))
+
+    def test_appended_rows_are_split(self):
+        X, _, train_index, test_index = trainer.load_encoded_dataset(incremental=True, data_path=self.csv)
+        self.append_rows(10)
+
+        X_new, _, train_new, test_new = trainer.load_encoded_dataset(incremental=True, data_path=self.csv)
+
+        self.assertEqual(len(X_new), len(X) + 10)
+        self.assertEqual(len(train_new) + len(test_new), len(X) + 10)
+        self.assertEqual(len(test_new) - len(test_index), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
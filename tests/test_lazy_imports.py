@@ -0,0 +1,70 @@
+"""
+Cold start: the login page must not import the heavy modules, pre-warming must
+"""
+
+import json
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Only loaded once a user is past the login page (`import streamlit` itself already
+# loads plotly.graph_objects for its chart theme, so plotly.express is what is checked)
+HEAVY_PACKAGES = ("pandas", "plotly.express", "sklearn")
+
+LOGIN_PAGE_PROBE = f"""
+import json, logging, sys
+logging.getLogger("streamlit").setLevel(logging.ERROR)
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60)
+at.run()
+print(json.dumps({{
+    "rendered": any("login-header" in m.value for m in at.markdown),
+    "exceptions": [e.message for e in at.exception],
+    "imported": [name for name in {HEAVY_PACKAGES!r} if name in sys.modules],
+}}))
+"""
+
+PREWARM_PROBE = f"""
+import json, sys, threading
+from src.utils.prewarm import prewarm_heavy_modules
+before = [name for name in {HEAVY_PACKAGES!r} if name in sys.modules]
+prewarm_heavy_modules()
+for thread in threading.enumerate():
+    if thread.name == "module-prewarm":
+        thread.join(timeout=120)
+print(json.dumps({{
+    "before": before,
+    "after": [name for name in {HEAVY_PACKAGES!r} if name in sys.modules],
+}}))
+"""
+
+
+def run_probe(code: str) -> dict:
+    """Run a probe in a fresh interpreter (this one may already hold the modules)"""
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True,
+                            timeout=300)
+    if result.returncode != 0:
+        raise AssertionError(f"Probe failed:\n{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class LazyImportTest(unittest.TestCase):
+    def test_login_page_renders_without_heavy_modules(self):
+        login = run_probe(LOGIN_PAGE_PROBE)
+
+        self.assertTrue(login['rendered'])
+        self.assertEqual(login['exceptions'], [])
+        self.assertEqual(login['imported'], [])
+
+    def test_prewarm_imports_heavy_modules(self):
+        prewarm = run_probe(PREWARM_PROBE)
+
+        self.assertEqual(prewarm['before'], [])
+        self.assertEqual(sorted(prewarm['after']), sorted(HEAVY_PACKAGES))
+
+
+if __name__ == "__main__":
+    unittest.main()
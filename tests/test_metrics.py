@@ -0,0 +1,44 @@
+"""
+Latency metrics: stage histograms and reset
+"""
+
+import unittest
+
+from src.utils.metrics import MetricsRegistry, metrics, timed
+
+
+class ResetTest(unittest.TestCase):
+    def test_timed_stage_keeps_recording_after_reset(self):
+        @timed('test_reset_stage')
+        def work():
+            return 1
+
+        def count():
+            return next(row['count'] for row in metrics.summary() if row['stage'] == 'test_reset_stage')
+
+        enabled, metrics.enabled = metrics.enabled, True
+        self.addCleanup(setattr, metrics, 'enabled', enabled)
+
+        work()
+        work()
+        self.assertEqual(count(), 2)
+
+        metrics.reset()
+        self.assertEqual(count(), 0)
+
+        work()
+        self.assertEqual(count(), 1)
+        self.assertIn('srp_stage_latency_seconds_count{stage="test_reset_stage"} 1', metrics.export_prometheus())
+
+    def test_reset_zeroes_sum_and_buckets(self):
+        registry = MetricsRegistry(enabled=True)
+        histogram = registry.histogram('stage')
+        histogram.observe(0.003)
+        registry.reset()
+
+        self.assertIs(registry.histogram('stage'), histogram)
+        self.assertEqual(histogram.snapshot(), ([0] * (len(histogram.bounds) + 1), 0.0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
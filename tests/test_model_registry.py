@@ -0,0 +1,46 @@
+"""
+Model registry: publishing, version IDs and loading
+"""
+
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from src.utils import model_registry
+
+
+class PublishVersionTest(unittest.TestCase):
+    def setUp(self):
+        self.registry_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.registry_dir)
+
+    def publish(self, **kwargs):
+        return model_registry.publish_version({'trees': 1}, {'target_mapping': {}}, ['a', 'b'],
+                                              registry_dir=self.registry_dir, **kwargs)
+
+    def test_publishes_in_the_same_second_get_distinct_versions(self):
+        with mock.patch.object(model_registry.time, 'strftime', return_value='20261019-120000'):
+            first = self.publish()
+            second = self.publish()
+            third = self.publish()
+
+        self.assertEqual([first, second, third], ['20261019-120000', '20261019-120000-2', '20261019-120000-3'])
+        self.assertEqual(model_registry.read_current_version(self.registry_dir), third)
+        for version in (first, second, third):
+            bundle = model_registry.load_version(version, self.registry_dir)
+            self.assertEqual(bundle.version, version)
+            self.assertEqual(bundle.feature_names, ['a', 'b'])
+
+    def test_explicit_version_is_suffixed_when_taken(self):
+        self.publish(version='candidate')
+        version = self.publish(version='candidate', make_current=False)
+
+        self.assertEqual(version, 'candidate-2')
+        self.assertEqual(model_registry.read_current_version(self.registry_dir), 'candidate')
+        self.assertEqual([manifest['version'] for manifest in model_registry.list_versions(self.registry_dir)],
+                         ['candidate', 'candidate-2'])
+
+
+if __name__ == "__main__":
+    unittest.main()